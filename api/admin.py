@@ -1,7 +1,17 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import Report, Profile, Mission, UserMission, Notice
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from .models import Report, ReportArchive, Profile, Mission, UserMission, Notice, StatusEvent, ThrottleHit, Hotspot, RequestProfile
+from . import history, moderation, profiling
+import logging
+
+logger = logging.getLogger(__name__)
 
 # 1. "Inline" admin view for Profile
 class ProfileInline(admin.StackedInline):
@@ -17,6 +27,7 @@ class UserAdmin(BaseUserAdmin):
     inlines = (ProfileInline,)
     
     list_display = ('username', 'email', 'get_level', 'get_points', 'is_staff')
+    list_select_related = ('profile',)
 
     def get_level(self, instance):
         return instance.profile.level
@@ -36,44 +47,200 @@ admin.site.register(User, UserAdmin)
 class ReportAdmin(admin.ModelAdmin):
     # This adds the time to the main table list!
     list_display = ('title', 'user', 'status', 'created_at')
+    list_select_related = ('user',)
+    list_filter = ('status',)
+    actions = ('mark_verified', 'mark_rejected', 'mark_resolved')
 
     # This forces the time to show up on the detailed view page
     readonly_fields = ('created_at', 'ai_analysis', 'ai_confidence')
 
     def save_model(self, request, obj, form, change):
-        # Existing report being edited
-        if change:
-            previous = Report.objects.get(pk=obj.pk)
-
-            if (
-                previous.status != "verified"
-                and obj.status == "verified"
-                and not obj.xp_awarded
-            ):
-                profile = obj.user.profile
-                profile.points += 10
-                profile.save()
-
-                obj.xp_awarded = True
-
-                print(f"✅ Admin awarded +10 XP to {obj.user.username}")
-
-        super().save_model(request, obj, form, change)
+        # The save and the XP award commit together, like bulk_set_status
+        with transaction.atomic(), history.acting('admin', request.user):
+            # Existing report being edited
+            if change:
+                # Lock the row so a bulk action or a second admin tab cannot
+                # award the same report again in between
+                current = Report.objects.select_for_update().values('status', 'xp_awarded').get(pk=obj.pk)
+                # A form loaded before the award must not clear the flag
+                obj.xp_awarded = obj.xp_awarded or current['xp_awarded']
+
+                if (
+                    current['status'] != "verified"
+                    and obj.status == "verified"
+                    and not current['xp_awarded']
+                ):
+                    moderation.award_xp({obj.user_id: moderation.REPORT_XP})
+
+                    obj.xp_awarded = True
+
+                    logger.info("xp_awarded", extra={"user_id": obj.user_id, "report_id": obj.pk, "points": moderation.REPORT_XP, "actor": "admin"})
+
+            super().save_model(request, obj, form, change)
+
+    # Bulk actions: one transaction and a fixed number of queries per batch
+    def _bulk_status(self, request, queryset, status):
+        changed, awarded = moderation.bulk_set_status(queryset, status, actor=request.user)
+        message = f"{changed} report(s) marked {status}."
+        if awarded:
+            message += f" XP awarded for {awarded}."
+        self.message_user(request, message)
+
+    @admin.action(description="Mark selected reports as verified (awards XP)")
+    def mark_verified(self, request, queryset):
+        self._bulk_status(request, queryset, 'verified')
+
+    @admin.action(description="Mark selected reports as rejected")
+    def mark_rejected(self, request, queryset):
+        self._bulk_status(request, queryset, 'rejected')
+
+    @admin.action(description="Mark selected reports as resolved")
+    def mark_resolved(self, request, queryset):
+        self._bulk_status(request, queryset, 'resolved')
 
 # 5. Custom Admin for User Missions
 class UserMissionAdmin(admin.ModelAdmin):
     # This adds the time to the main table list!
     list_display = ('user', 'mission', 'status', 'submitted_at')
+    list_select_related = ('user', 'mission')
     
     # This forces the time to show up on the detailed view page
     readonly_fields = ('submitted_at', 'ai_analysis')
 
+    def save_model(self, request, obj, form, change):
+        with history.acting('admin', request.user):
+            super().save_model(request, obj, form, change)
+
+
+# 6. Archived reports (read-only; filled by manage.py archive_reports)
+class ReportArchiveAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'status', 'created_at', 'archived_at')
+    list_select_related = ('user',)
+    list_filter = ('status', 'category')
+    search_fields = ('title', 'description', 'location')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# 7. Status history (append-only)
+class StatusEventAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'old_status', 'new_status', 'source', 'actor', 'confidence', 'created_at')
+    list_select_related = ('actor',)
+    list_filter = ('kind', 'source', 'new_status')
+    search_fields = ('=object_id',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+# Clients hitting the rate limits (api/throttling.py); delete a row to reset its tally
+class ThrottleHitAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'ident', 'user', 'hits', 'first_seen', 'last_seen')
+    list_select_related = ('user',)
+    list_filter = ('scope',)
+    search_fields = ('ident', 'user__username')
+    ordering = ('-last_seen',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# Latest manage.py detect_hotspots results (api/hotspots.py)
+class HotspotAdmin(admin.ModelAdmin):
+    list_display = ('window_days', 'category', 'x', 'y', 'count', 'baseline', 'score', 'rising', 'computed_at')
+    list_filter = ('window_days', 'rising', 'category')
+    ordering = ('window_days', '-score')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# Staff request profiles (X-Profile header, api/profiling.py)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'method', 'path', 'status_code', 'mode', 'duration_ms', 'query_count', 'query_ms', 'user')
+    list_select_related = ('user',)
+    list_filter = ('mode', 'method', 'view_name')
+    search_fields = ('path', 'view_name')
+    ordering = ('-created_at',)
+    exclude = ('folded', 'queries', 'external_calls')
+    readonly_fields = ('flamegraph', 'top_frames', 'sql', 'external')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/folded/', self.admin_site.admin_view(self.folded_view), name='api_requestprofile_folded'),
+            *super().get_urls(),
+        ]
+
+    def folded_view(self, request, pk):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = HttpResponse(profile.folded + '\n', content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile.pk}.folded"'
+        return response
+
+    @admin.display(description='Flame graph')
+    def flamegraph(self, obj):
+        return format_html(
+            '<a href="{}">Download collapsed stacks</a> ({} {}) for flamegraph.pl or speedscope.app',
+            reverse('admin:api_requestprofile_folded', args=[obj.pk]),
+            obj.weight, 'samples' if obj.mode == 'sample' else 'traced µs',
+        )
+
+    @admin.display(description='Hottest frames (self time)')
+    def top_frames(self, obj):
+        return format_html('<table>{}</table>', format_html_join(
+            '', '<tr><td>{}</td><td>{}</td></tr>',
+            ((f"{share:.1%}", frame) for frame, _, share in profiling.top_frames(obj.folded)),
+        ))
+
+    @admin.display(description='SQL')
+    def sql(self, obj):
+        return format_html('<table>{}</table>', format_html_join(
+            '', '<tr><td>{} ms</td><td><code>{}</code></td></tr>',
+            ((query['ms'], query['sql']) for query in obj.queries),
+        ))
+
+    @admin.display(description='External calls')
+    def external(self, obj):
+        return format_html('<table>{}</table>', format_html_join(
+            '', '<tr><td>{} ms</td><td>{}</td><td>{}</td></tr>',
+            ((call['ms'], call['service'], call['outcome']) for call in obj.external_calls),
+        ))
+
 
 # REGISTER MODELS
 
 # Register with our new custom admin classes
 admin.site.register(Report, ReportAdmin)
 admin.site.register(UserMission, UserMissionAdmin)
+admin.site.register(ReportArchive, ReportArchiveAdmin)
+admin.site.register(StatusEvent, StatusEventAdmin)
+admin.site.register(ThrottleHit, ThrottleHitAdmin)
+admin.site.register(Hotspot, HotspotAdmin)
+admin.site.register(RequestProfile, RequestProfileAdmin)
 
 # Register the rest normally
 admin.site.register(Mission)
@@ -0,0 +1,225 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from . import metrics, throttling
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  AI WORK SCHEDULER
+# ==========================================
+# Every Gemini call (report and proof checks, chat, the fallback sweeper)
+# goes through gemini.generate(), which holds one of AI_MAX_CONCURRENCY slots
+# of this per-process scheduler for the length of the call. While all slots
+# are busy, waiting calls are let in by deficit round robin: first across
+# priority classes in proportion to their weight (AI_SCHEDULER_CLASSES), then
+# evenly across users within a class. A chat flood or one busy reporter only
+# slows down their own share. Anonymous chat counts as a single user.
+#
+# Callers say what the work is with `with ai_scheduler.job('report', user_id)`.
+# Each job has a deadline (the class default unless given); a call still
+# waiting when it passes raises DeadlineExceeded, and the caller falls back:
+# reports and proofs to manual review (reverify_fallbacks picks them up
+# later), chat to "overloaded".
+
+DEFAULT_PRIORITY = 'background'
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class DRR:
+    """Deficit round robin over flows; every item costs 1.
+
+    A flow with quantum 2 gets twice the turns of a flow with quantum 1 while
+    both have items waiting. Empty flows are dropped, so idle flows cannot bank
+    credit."""
+
+    def __init__(self):
+        self.flows = OrderedDict()  # key -> [quantum, deficit, deque of items]
+
+    def __len__(self):
+        return len(self.flows)
+
+    def push(self, key, item, quantum=1):
+        flow = self.flows.get(key)
+        if flow is None:
+            flow = self.flows[key] = [quantum, quantum, deque()]
+        flow[2].append(item)
+
+    def pop(self):
+        """(key, item) of the next item to serve."""
+        while True:
+            key, flow = next(iter(self.flows.items()))
+            if flow[1] >= 1:
+                flow[1] -= 1
+                item = flow[2].popleft()
+                if not flow[2]:
+                    del self.flows[key]
+                return key, item
+            flow[1] += flow[0]
+            self.flows.move_to_end(key)
+
+    def remove(self, key, item):
+        flow = self.flows[key]
+        flow[2].remove(item)
+        if not flow[2]:
+            del self.flows[key]
+
+
+class _Ticket:
+    __slots__ = ('priority', 'user', 'deadline', 'event', 'state')
+
+    def __init__(self, priority, user, deadline):
+        self.priority = priority
+        self.user = user
+        self.deadline = deadline
+        self.event = threading.Event()
+        self.state = 'waiting'
+
+
+class Scheduler:
+    def __init__(self, capacity, classes):
+        self.capacity = capacity
+        self.classes = classes
+        self.running = 0
+        self.waiting = 0
+        self._lock = threading.Lock()
+        # Class-level turns hold one placeholder per waiting ticket; the
+        # tickets themselves wait in per-class, per-user queues
+        self._by_class = DRR()
+        self._by_user = {priority: DRR() for priority in classes}
+
+    def acquire(self, priority, user=None, deadline=None):
+        """Block until a slot is free. `deadline` is a time.monotonic() value."""
+        started = time.monotonic()
+        with self._lock:
+            if self.running < self.capacity and not self.waiting:
+                self.running += 1
+                metrics.AI_QUEUE_WAIT.observe(0, priority=priority, outcome='granted')
+                return
+            ticket = _Ticket(priority, user, deadline)
+            self._by_class.push(priority, None, self.classes[priority]['weight'])
+            self._by_user[priority].push(user, ticket)
+            self.waiting += 1
+
+        ticket.event.wait(None if deadline is None else max(0, deadline - started))
+        with self._lock:
+            if ticket.state == 'waiting':
+                self._by_class.remove(priority, None)
+                self._by_user[priority].remove(user, ticket)
+                self.waiting -= 1
+                ticket.state = 'expired'
+        waited = time.monotonic() - started
+        metrics.AI_QUEUE_WAIT.observe(waited, priority=priority, outcome=ticket.state)
+        if ticket.state == 'expired':
+            raise DeadlineExceeded(f"{priority} AI call waited {waited:.1f}s for a slot")
+
+    def release(self):
+        with self._lock:
+            self.running -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while self.running < self.capacity and self.waiting:
+            priority, _ = self._by_class.pop()
+            _, ticket = self._by_user[priority].pop()
+            self.waiting -= 1
+            if ticket.deadline is not None and ticket.deadline <= now:
+                # Too late to be worth a slot; its caller falls back
+                ticket.state = 'expired'
+            else:
+                ticket.state = 'granted'
+                self.running += 1
+            ticket.event.set()
+
+    @contextmanager
+    def slot(self, priority, user=None, deadline=None):
+        self.acquire(priority, user, deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_current_job = ContextVar('pulse_ai_job', default=None)
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = Scheduler(settings.AI_MAX_CONCURRENCY, settings.AI_SCHEDULER_CLASSES)
+    return _scheduler
+
+
+@contextmanager
+def job(priority, user=None, deadline_seconds=None):
+    """Tag the Gemini calls made inside this block (retries included, all
+    sharing one deadline)."""
+    if deadline_seconds is None:
+        deadline_seconds = settings.AI_SCHEDULER_CLASSES[priority]['deadline']
+    token = _current_job.set((priority, user, time.monotonic() + deadline_seconds))
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+# ==========================================
+#  SHARED GEMINI QUOTA
+# ==========================================
+# The slots above are per process. AI_QUOTA_RATE ("60/min") is the Gemini
+# quota of the whole deployment, kept as one token bucket in the shared cache
+# (api/throttling.py; set REDIS_URL so every worker and cron job sees the
+# same bucket). Every call takes a token before its slot. Calls with a user
+# waiting go ahead even when the bucket is empty (Gemini may refuse them, and
+# they fall back as usual); background calls (reverify_fallbacks,
+# verify_ingested_reports) wait for a token until their deadline, so they
+# only ever use what live traffic leaves over.
+
+QUOTA_KEY = 'ai:quota'
+
+
+def take_quota(priority, deadline):
+    if not settings.AI_QUOTA_RATE:
+        return
+    num, period = throttling.parse_rate(settings.AI_QUOTA_RATE)
+    while True:
+        try:
+            wait = throttling.consume(QUOTA_KEY, num, period)
+        except Exception as e:
+            # Same as the throttles: never fail AI work on a cache outage
+            logger.error("ai_quota_cache_error", extra={"error": str(e)})
+            return
+        if not wait or priority != DEFAULT_PRIORITY:
+            return
+        if time.monotonic() + wait > deadline:
+            metrics.AI_QUEUE_WAIT.observe(0, priority=priority, outcome='expired')
+            raise DeadlineExceeded(f"shared AI quota ({settings.AI_QUOTA_RATE}) is used up")
+        time.sleep(wait)
+
+
+@contextmanager
+def slot():
+    """A quota token and one scheduler slot for the current job (untagged calls
+    run as background)."""
+    current = _current_job.get()
+    if current is None:
+        deadline = settings.AI_SCHEDULER_CLASSES[DEFAULT_PRIORITY]['deadline']
+        current = (DEFAULT_PRIORITY, None, time.monotonic() + deadline)
+    priority, _, deadline = current
+    take_quota(priority, deadline)
+    with get_scheduler().slot(*current):
+        yield
@@ -0,0 +1,66 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+
+from . import counters, mapgrid, sync
+from .models import Report, ReportArchive
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  REPORT ARCHIVAL
+# ==========================================
+# Resolved/rejected reports older than the cutoff are copied into
+# ReportArchive and deleted from Report, one small batch per transaction.
+# Progress is just "what is left in Report", so a run can be stopped at any
+# point and resumed; a batch is either fully moved or not at all.
+
+TERMINAL_STATUSES = ('resolved', 'rejected')
+
+
+def archivable(cutoff):
+    return Report.objects.filter(status__in=TERMINAL_STATUSES, created_at__lt=cutoff)
+
+
+def archive_batch(cutoff, after_id=0, batch_size=500):
+    """Move one batch. Returns (moved, last_id); moved == 0 means done."""
+    with transaction.atomic():
+        # Lock the batch; rows another transaction holds are picked up next run
+        rows = list(
+            archivable(cutoff).filter(id__gt=after_id)
+            .select_for_update(skip_locked=True)
+            .order_by('id')
+            .values(*ReportArchive.COPIED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0, after_id
+        ids = [row['id'] for row in rows]
+        # ignore_conflicts keeps a re-run idempotent if a copy already exists
+        ReportArchive.objects.bulk_create([ReportArchive(**row) for row in rows], ignore_conflicts=True)
+        # Re-check the state at delete time: a report edited back to an
+        # active status since we read it stays live (its copy is removed).
+        # keep_on_delete: archived reports still count on the owner's dashboard.
+        # They do leave the feed (and the map), so synced clients get (batched)
+        # tombstones and the map grid one write per batch.
+        with counters.keep_on_delete(), sync.batched(), mapgrid.batched():
+            deleted = archivable(cutoff).filter(id__in=ids).delete()[1].get('api.Report', 0)
+        if deleted != len(ids):
+            live = Report.objects.filter(id__in=ids).values_list('id', flat=True)
+            ReportArchive.objects.filter(id__in=live).delete()
+    return deleted, ids[-1]
+
+
+def search(q=None, user=None, category=None, status=None, before_id=None, limit=50):
+    qs = ReportArchive.objects.select_related('user').order_by('-id')
+    if q:
+        qs = qs.filter(Q(title__icontains=q) | Q(description__icontains=q) | Q(location__icontains=q))
+    if user is not None:
+        qs = qs.filter(user=user)
+    if category:
+        qs = qs.filter(category=category)
+    if status:
+        qs = qs.filter(status=status)
+    if before_id:
+        qs = qs.filter(id__lt=before_id)
+    return qs[:limit]
@@ -0,0 +1,171 @@
+import bisect
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, F, Func, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+# ==========================================
+#  PROFILE COUNTERS
+# ==========================================
+# Report / mission counts on Profile for the dashboard. history.py hands
+# every batch of status events to apply_events(), so counters move in the
+# same transaction as the transition, with one grouped UPDATE per batch:
+# Report.save() / UserMission.save() open that transaction around the row
+# and its post_save signal, and the bulk paths run inside their own atomic
+# blocks. recompute() (manage.py recompute_counters) rebuilds them from the
+# tables if they ever drift anyway, e.g. after manual SQL.
+
+REPORT_STATUS_FIELDS = {
+    'pending': 'reports_pending',
+    'verified': 'reports_verified',
+    'rejected': 'reports_rejected',
+    'resolved': 'reports_resolved',
+}
+
+_keep_on_delete = ContextVar('counters_keep_on_delete', default=False)
+
+
+def _deltas(event):
+    """Counter changes implied by one StatusEvent."""
+    changes = defaultdict(int)
+    if event.kind == 'report':
+        if event.old_status is None:
+            changes['reports_total'] += 1
+        elif event.old_status in REPORT_STATUS_FIELDS:
+            changes[REPORT_STATUS_FIELDS[event.old_status]] -= 1
+        if event.new_status in REPORT_STATUS_FIELDS:
+            changes[REPORT_STATUS_FIELDS[event.new_status]] += 1
+    else:
+        if event.old_status is None:
+            changes['missions_joined'] += 1
+        if event.old_status == 'completed':
+            changes['missions_completed'] -= 1
+        if event.new_status == 'completed':
+            changes['missions_completed'] += 1
+    return changes
+
+
+def apply_deltas(per_user):
+    """per_user: {user_id: {field: delta}} -> one UPDATE for all users."""
+    from .models import Profile
+
+    per_user = {uid: {f: d for f, d in fields.items() if d} for uid, fields in per_user.items()}
+    per_user = {uid: fields for uid, fields in per_user.items() if fields}
+    if not per_user:
+        return
+    if len(per_user) == 1:
+        ((user_id, fields),) = per_user.items()
+        Profile.objects.filter(user_id=user_id).update(**{f: F(f) + d for f, d in fields.items()})
+        return
+    updates = {}
+    for field in {f for fields in per_user.values() for f in fields}:
+        whens = [When(user_id=uid, then=F(field) + Value(fields[field]))
+                 for uid, fields in per_user.items() if field in fields]
+        updates[field] = Case(*whens, default=F(field))
+    Profile.objects.filter(user_id__in=per_user).update(**updates)
+
+
+def apply_events(events):
+    per_user = defaultdict(lambda: defaultdict(int))
+    for event in events:
+        for field, delta in _deltas(event).items():
+            per_user[event.user_id][field] += delta
+    apply_deltas(per_user)
+
+
+@contextmanager
+def keep_on_delete():
+    """Deleting reports inside this block leaves the counters alone (archival)."""
+    token = _keep_on_delete.set(True)
+    try:
+        yield
+    finally:
+        _keep_on_delete.reset(token)
+
+
+def report_deleted(report):
+    if _keep_on_delete.get():
+        return
+    changes = {'reports_total': -1}
+    if report.status in REPORT_STATUS_FIELDS:
+        changes[REPORT_STATUS_FIELDS[report.status]] = -1
+    apply_deltas({report.user_id: changes})
+
+
+def proof_deleted(user_mission):
+    changes = {'missions_joined': -1}
+    if user_mission.status == 'completed':
+        changes['missions_completed'] = -1
+    apply_deltas({user_mission.user_id: changes})
+
+
+def _count_subquery(queryset):
+    # COUNT(*) as a correlated subquery; Func keeps Django from adding GROUP BY
+    return Coalesce(Subquery(
+        queryset.order_by().annotate(n=Func(F('pk'), function='COUNT')).values('n'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+def _count(model, **filters):
+    return _count_subquery(model.objects.filter(user=OuterRef('user'), **filters))
+
+
+def expected_counters():
+    """Counter field -> expression computing it from the tables.
+    Archived reports still count towards a user's totals."""
+    from .models import ReportArchive, Report, UserMission
+
+    expected = {
+        'reports_total': _count(Report) + _count(ReportArchive),
+        'missions_joined': _count(UserMission),
+        'missions_completed': _count(UserMission, status='completed'),
+    }
+    for status, field in REPORT_STATUS_FIELDS.items():
+        expected[field] = _count(Report, status=status) + _count(ReportArchive, status=status)
+    return expected
+
+
+def recompute(profiles):
+    """Rebuild every counter for the given Profile queryset with one UPDATE."""
+    return profiles.update(**expected_counters())
+
+
+# ==========================================
+#  LEADERBOARD RANK
+# ==========================================
+# A rank is 1 + the non-staff profiles with more points. Counting them per
+# dashboard read costs O(rank) rows, so the points distribution is cached
+# instead: one GROUP BY points every RANK_CACHE_SECONDS, as (negated points
+# ascending, profiles above each). A rank is then a bisect. Ranks can lag
+# point changes by up to RANK_CACHE_SECONDS.
+
+RANK_CACHE_KEY = 'counters:rank_table'
+
+
+def _rank_table():
+    from .models import Profile
+
+    table = cache.get(RANK_CACHE_KEY)
+    if table is None:
+        rows = (Profile.objects.filter(user__is_staff=False)
+                .values_list('points').annotate(n=Count('id')).order_by('-points'))
+        keys, above, total = [], [], 0
+        for points, n in rows:
+            keys.append(-points)
+            above.append(total)
+            total += n
+        table = (keys, above, total)
+        cache.set(RANK_CACHE_KEY, table, settings.RANK_CACHE_SECONDS)
+    return table
+
+
+def rank_for(points):
+    """Leaderboard rank for a point total (1 = top)."""
+    keys, above, total = _rank_table()
+    i = bisect.bisect_left(keys, -points)
+    return 1 + (above[i] if i < len(keys) else total)
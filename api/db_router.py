@@ -0,0 +1,87 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+# ==========================================
+#  READ REPLICA ROUTING
+# ==========================================
+# Writes always go to "default". Reads go to a replica only inside
+# use_replica() (entered by ReplicaReadMixin for safe-method requests), so
+# everything else - auth, signals, admin, management commands - keeps reading
+# from the primary. With no replicas configured this is a no-op.
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+@contextmanager
+def use_replica(enabled=True):
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get():
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get their schema through replication
+        return db == 'default'
+
+
+# ==========================================
+#  READ-YOUR-WRITES PINNING
+# ==========================================
+# After a user's successful write, their reads stay on the primary for
+# REPLICA_PIN_SECONDS so they see it despite replication lag. The pin lives
+# in the Django cache, which must be shared between workers in production.
+
+def _pin_key(user_id):
+    return f'db:pin:{user_id}'
+
+
+def pin_to_primary(user):
+    if user is not None and user.is_authenticated and replica_aliases():
+        cache.set(_pin_key(user.pk), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    return user is not None and user.is_authenticated and cache.get(_pin_key(user.pk)) is not None
+
+
+class ReplicaReadMixin:
+    """Serve safe-method requests from a replica unless the user just wrote."""
+
+    def initial(self, request, *args, **kwargs):
+        # Runs after authentication, so request.user is the JWT user here
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replica_aliases() and not is_pinned(request.user):
+            self._replica_token = _read_from_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_from_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
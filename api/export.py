@@ -0,0 +1,137 @@
+import csv
+import io
+from datetime import datetime, time, timedelta
+
+import orjson
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Report
+
+# ==========================================
+#  REPORT EXPORT (CSV / NDJSON)
+# ==========================================
+# Shared by GET /api/reports/export/ (staff) and `manage.py export_reports`.
+# Rows come straight from one values_list() query read with
+# iterator(chunk_size) (a server-side cursor on Postgres) and are written out
+# a chunk at a time, so memory stays flat however many reports there are.
+#
+# Incremental exports: every export is cut off at `until` (now minus
+# SYNC_LAG_SECONDS unless given), and rows are those with
+# since < updated_at <= until, in (updated_at, id) order on report_sync_idx.
+# Feed `until` back as the next `since`.
+
+FIELDS = {
+    'id': 'id',
+    'user': 'user__username',
+    'external_id': 'external_id',
+    'title': 'title',
+    'description': 'description',
+    'category': 'category',
+    'status': 'status',
+    'ai_confidence': 'ai_confidence',
+    'location': 'location',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+DATETIME_COLUMNS = [i for i, name in enumerate(FIELDS) if name in ('created_at', 'updated_at')]
+FORMATS = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+CHUNK_SIZE = 2000
+
+
+def parse_time(value, end_of_day=False):
+    """ISO datetime or date (a date means its start, or its end for upper bounds)."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"'{value}' is not an ISO 8601 date or datetime")
+        parsed = datetime.combine(day + timedelta(days=1) if end_of_day else day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_filters(params):
+    """Query params / command options -> filter kwargs for export_rows()."""
+    filters = {}
+    if params.get('status'):
+        filters['statuses'] = [s.strip() for s in params['status'].split(',') if s.strip()]
+        unknown = set(filters['statuses']) - {value for value, _ in Report.STATUS_CHOICES}
+        if unknown:
+            raise ValueError(f"unknown status: {', '.join(sorted(unknown))}")
+    if params.get('category'):
+        filters['category'] = params['category']
+    for name, end_of_day in (('since', False), ('until', False),
+                             ('created_from', False), ('created_to', True)):
+        if params.get(name):
+            filters[name] = parse_time(params[name], end_of_day)
+    filters.setdefault('until', default_until())
+    return filters
+
+
+def default_until():
+    # Rows committed in the last few seconds may still show up with an older
+    # updated_at; leave them for the next run (same lag as /api/sync/)
+    return timezone.now() - timedelta(seconds=settings.SYNC_LAG_SECONDS)
+
+
+def export_rows(until, statuses=None, category=None, since=None, created_from=None, created_to=None):
+    qs = Report.objects.filter(updated_at__lte=until)
+    if since:
+        qs = qs.filter(updated_at__gt=since)
+    if statuses:
+        qs = qs.filter(status__in=statuses)
+    if category:
+        qs = qs.filter(category=category)
+    if created_from:
+        qs = qs.filter(created_at__gte=created_from)
+    if created_to:
+        qs = qs.filter(created_at__lt=created_to)
+    return qs.order_by('updated_at', 'id').values_list(*FIELDS.values())
+
+
+def _rows(queryset):
+    tz = timezone.get_current_timezone()
+    for row in queryset.iterator(chunk_size=CHUNK_SIZE):
+        row = list(row)
+        for i in DATETIME_COLUMNS:
+            row[i] = row[i].astimezone(tz).isoformat()
+        yield row
+
+
+def _chunked(rows, size=500):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def csv_chunks(queryset):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for chunk in _chunked(_rows(queryset)):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # header only
+        yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(queryset):
+    names = list(FIELDS)
+    for chunk in _chunked(_rows(queryset)):
+        yield b''.join(orjson.dumps(dict(zip(names, row))) + b'\n' for row in chunk)
+
+
+def chunks(queryset, fmt):
+    return csv_chunks(queryset) if fmt == 'csv' else ndjson_chunks(queryset)
@@ -0,0 +1,138 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .export import parse_time
+from .models import Report
+
+# ==========================================
+#  REPORT FILTERS & FACET COUNTS
+# ==========================================
+# GET /api/reports/ takes ?status=, ?category= (comma-separated), ?user=
+# (an id, or "me") and ?created_from= / ?created_to= (ISO dates or
+# datetimes; a created_to date includes that day). Each filter has an index
+# (report_*_created_idx) ending in the feed's created_at order.
+#
+# GET /api/reports/facets/ takes the same filters and answers with the
+# report count per status and per category. As usual for facets, each one
+# is counted with every filter except its own, so the UI can show how many
+# reports ticking another box would add. That is two GROUP BY queries. The
+# (status, category) and (category, status) indexes answer them without
+# reading the table, but they still go through every index entry the other
+# filters match (all of them without filters), so results are cached per filter
+# set: fresh for FACET_CACHE_SECONDS, then kept FACET_STALE_SECONDS longer.
+# A stale entry is recomputed by one request (a cache.add lock) while the
+# others keep getting the stale counts, so a popular filter set is not
+# rescanned by every worker at once. With REDIS_URL the cache is shared.
+#
+# Counts can lag report changes by up to FACET_CACHE_SECONDS. Any filter
+# combination is allowed (user and date ranges included), which is why this
+# is a cache rather than counters kept up to date on every write.
+
+STATUSES = [value for value, _ in Report.STATUS_CHOICES]
+# Partner ingest accepts any category; the long tail is cut off here
+MAX_CATEGORIES = 50
+
+
+def _split(value):
+    return sorted({part.strip() for part in value.split(',') if part.strip()})
+
+
+def parse_filters(params, user=None):
+    """Query params -> filter dict for apply() and counts(). Raises ValueError."""
+    filters = {}
+    if params.get('status'):
+        filters['statuses'] = _split(params['status'])
+        unknown = set(filters['statuses']) - set(STATUSES)
+        if unknown:
+            raise ValueError(f"unknown status: {', '.join(sorted(unknown))}")
+    if params.get('category'):
+        filters['categories'] = _split(params['category'])
+    if params.get('user'):
+        if params['user'] == 'me':
+            if user is None or not user.is_authenticated:
+                raise ValueError("sign in to filter by user=me")
+            filters['user'] = user.pk
+        else:
+            try:
+                filters['user'] = int(params['user'])
+            except ValueError:
+                raise ValueError("user must be a user id or 'me'")
+    for name, end_of_day in (('created_from', False), ('created_to', True)):
+        if params.get(name):
+            filters[name] = parse_time(params[name], end_of_day)
+    return filters
+
+
+def apply(queryset, filters, skip=None):
+    """Filter a Report queryset; `skip` leaves one filter out (for its own facet)."""
+    if filters.get('statuses') and skip != 'statuses':
+        queryset = queryset.filter(status__in=filters['statuses'])
+    if filters.get('categories') and skip != 'categories':
+        queryset = queryset.filter(category__in=filters['categories'])
+    if 'user' in filters:
+        queryset = queryset.filter(user_id=filters['user'])
+    if filters.get('created_from'):
+        queryset = queryset.filter(created_at__gte=filters['created_from'])
+    if filters.get('created_to'):
+        queryset = queryset.filter(created_at__lt=filters['created_to'])
+    return queryset
+
+
+def compute(filters):
+    """Facet counts straight from the database (no cache)."""
+    by_status = dict(
+        apply(Report.objects.all(), filters, skip='statuses')
+        .values_list('status').annotate(n=Count('id')).order_by()
+    )
+    by_category = list(
+        apply(Report.objects.all(), filters, skip='categories')
+        .values_list('category').annotate(n=Count('id')).order_by('-n', 'category')
+    )
+    # Selected categories are always listed, even past the cut-off or at 0
+    selected = set(filters.get('categories', ()))
+    shown, hidden = by_category[:MAX_CATEGORIES], []
+    for category, n in by_category[MAX_CATEGORIES:]:
+        (shown if category in selected else hidden).append((category, n))
+    shown += [(c, 0) for c in sorted(selected - {c for c, _ in by_category})]
+    return {
+        'total': sum(n for s, n in by_status.items() if s in filters.get('statuses', STATUSES)),
+        'status': [{'value': s, 'count': by_status.get(s, 0)} for s in STATUSES],
+        'category': [{'value': c, 'count': n} for c, n in shown],
+        # Categories left out of the list above
+        'other_categories': len(hidden),
+        'computed_at': timezone.now(),
+    }
+
+
+def _key(filters):
+    parts = sorted((name, value.isoformat() if hasattr(value, 'isoformat') else value)
+                   for name, value in filters.items())
+    return 'facets:' + hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def counts(filters):
+    """Facet counts for a filter set, from the cache when fresh enough."""
+    key = _key(filters)
+    entry = cache.get(key)
+    locked = False
+    if entry is not None:
+        if entry['fresh_until'] > time.time():
+            return entry['facets']
+        locked = cache.add(f'{key}:lock', 1, settings.FACET_CACHE_SECONDS)
+        if not locked:
+            # Another request is already recomputing it
+            return entry['facets']
+
+    try:
+        facets = compute(filters)
+        cache.set(key, {'facets': facets, 'fresh_until': time.time() + settings.FACET_CACHE_SECONDS},
+                  settings.FACET_CACHE_SECONDS + settings.FACET_STALE_SECONDS)
+    finally:
+        if locked:
+            cache.delete(f'{key}:lock')
+    return facets
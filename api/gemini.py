@@ -0,0 +1,51 @@
+import threading
+
+from decouple import config
+
+from . import ai_scheduler, metrics
+
+# ==========================================
+#  GEMINI ADAPTER (lazy SDK import)
+# ==========================================
+# google.genai pulls in pydantic, httpx and friends, which is most of our
+# cold start. It is imported on first use (or by the background warm-up),
+# never at module load.
+
+DEFAULT_MODEL = 'gemini-flash-latest'
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_client(api_key):
+    client = _clients.get(api_key)
+    if client is None:
+        with _lock:
+            client = _clients.get(api_key)
+            if client is None:
+                from google import genai
+
+                # GEMINI_BASE_URL points the SDK at a fake server for benchmarks
+                base_url = config('GEMINI_BASE_URL', default=None)
+                if base_url:
+                    client = genai.Client(api_key=api_key, http_options={'base_url': base_url})
+                else:
+                    client = genai.Client(api_key=api_key)
+                _clients[api_key] = client
+    return client
+
+
+def generate(api_key, contents, model=DEFAULT_MODEL):
+    """Raises ai_scheduler.DeadlineExceeded if the current job's deadline passes
+    while waiting for a slot."""
+    client = get_client(api_key)
+    with ai_scheduler.slot(), metrics.external_call('gemini'):
+        return client.models.generate_content(model=model, contents=contents)
+
+
+def warm():
+    api_key = config('GEMINI_API_KEY', default=None)
+    if api_key:
+        get_client(api_key)
+    else:
+        from google import genai  # noqa: F401
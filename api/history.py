@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters
+
+# ==========================================
+#  STATUS HISTORY
+# ==========================================
+# record_transition() appends a StatusEvent for every report / proof status
+# change. Who caused it comes from the surrounding acting() block (views mark
+# AI decisions, the admin marks moderator edits); anything else is "system".
+# Inside batched() events are buffered and written with one bulk INSERT when
+# the block exits, in the caller's transaction, together with the matching
+# Profile counter updates (api/counters.py). Single saves get theirs from
+# Report.save() / UserMission.save(), which wrap the row and post_save in
+# one transaction.
+
+_source = ContextVar('history_source', default=('system', None))
+_batch = ContextVar('history_batch', default=None)
+
+
+@contextmanager
+def acting(source, user=None):
+    token = _source.set((source, user))
+    try:
+        yield
+    finally:
+        _source.reset(token)
+
+
+@contextmanager
+def batched():
+    if _batch.get() is not None:
+        # Already inside a batch; the outer block writes everything
+        yield
+        return
+    events = []
+    token = _batch.set(events)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    _write(events)
+
+
+def _write(events):
+    from .models import StatusEvent
+
+    # A savepoint when the caller already has a transaction
+    with transaction.atomic():
+        if len(events) == 1:
+            events[0].save(force_insert=True)
+        elif events:
+            StatusEvent.objects.bulk_create(events)
+        # Dashboard counters move with the history, one UPDATE per batch
+        counters.apply_events(events)
+
+
+def record_transition(kind, object_id, user_id, old_status, new_status, confidence=None, source=None, actor=None):
+    from .models import StatusEvent
+
+    if source is None:
+        source, actor = _source.get()
+    event = StatusEvent(
+        kind=kind,
+        object_id=object_id,
+        user_id=user_id,
+        old_status=old_status,
+        new_status=new_status,
+        source=source,
+        actor_id=getattr(actor, 'pk', actor),
+        confidence=confidence,
+        created_at=timezone.now(),
+    )
+    batch = _batch.get()
+    if batch is None:
+        _write([event])
+    else:
+        batch.append(event)
+    return event
+
+
+# ==========================================
+#  QUERIES
+# ==========================================
+
+def for_object(kind, object_id):
+    from .models import StatusEvent
+
+    return StatusEvent.objects.filter(kind=kind, object_id=object_id).order_by('id')
+
+
+def since(since_id=0, since_time=None, user=None, kind=None, limit=100):
+    """Events after since_id (the cursor) and/or since_time, oldest first."""
+    from .models import StatusEvent
+
+    qs = StatusEvent.objects.filter(id__gt=since_id or 0)
+    if since_time is not None:
+        qs = qs.filter(created_at__gte=since_time)
+    if user is not None:
+        qs = qs.filter(user=user)
+    if kind:
+        qs = qs.filter(kind=kind)
+    return qs.order_by('id')[:limit]
@@ -0,0 +1,206 @@
+import logging
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import FloatField, Func
+from django.utils import timezone
+
+from . import mapgrid
+from .models import Hotspot, Report
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  HOTSPOT DETECTION
+# ==========================================
+# manage.py detect_hotspots (cron) finds where reports are piling up. Recent
+# reports are loaded once into NumPy arrays (coordinates, category codes,
+# creation time), binned into map grid cells (api/mapgrid.py) at
+# HOTSPOT_GRID_ZOOM, and counted per cell for each window in
+# HOTSPOT_WINDOWS_DAYS. For each window, the current period's count is
+# compared with the HOTSPOT_BASELINE_PERIODS windows before it:
+#
+#     score = (current - mean) / sqrt(max(variance, mean) + 1)
+#
+# which is a z-score that falls back to Poisson noise for quiet cells. A
+# cell is rising when it has at least HOTSPOT_MIN_REPORTS reports and a
+# score of at least HOTSPOT_MIN_SCORE. The same is done per category, so a
+# pothole spike still shows up in an area full of garbage reports.
+#
+# Each window keeps its HOTSPOT_TOP_CELLS densest cells plus every rising
+# one (overall), and the rising cells per category, as Hotspot rows read by
+# GET /api/hotspots/. Everything per report is array arithmetic; Python only
+# loops over distinct categories and the cells that are kept.
+
+FETCH_SIZE = 100_000
+
+
+class EpochSeconds(Func):
+    """Seconds since 1970 computed by the database, so no datetimes are built per row."""
+    output_field = FloatField()
+    template = 'CAST(EXTRACT(EPOCH FROM %(expressions)s) AS double precision)'
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='((julianday(%(expressions)s) - 2440587.5) * 86400.0)',
+                           **extra_context)
+
+
+class Reports:
+    """Column arrays for the loaded reports; category[i] indexes categories."""
+
+    def __init__(self, lat, lng, ts, category, categories):
+        self.lat, self.lng, self.ts, self.category, self.categories = lat, lng, ts, category, categories
+
+    def __len__(self):
+        return len(self.ts)
+
+
+def load(since):
+    """Reports with coordinates created since `since`, read with one raw
+    cursor a block at a time (no model instances or row tuples in Python)."""
+    qs = (Report.objects.filter(created_at__gte=since, latitude__isnull=False, longitude__isnull=False)
+          .annotate(ts=EpochSeconds('created_at'))
+          .values_list('latitude', 'longitude', 'ts', 'category'))
+    sql, params = qs.query.sql_with_params()
+    lat, lng, ts, category, codes = [], [], [], [], {}
+    with connections[qs.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(FETCH_SIZE):
+            block = np.array(rows, dtype=object)
+            lat.append(block[:, 0].astype(np.float64))
+            lng.append(block[:, 1].astype(np.float64))
+            ts.append(block[:, 2].astype(np.float64))
+            names, inverse = np.unique(block[:, 3], return_inverse=True)
+            # One lookup per distinct category in the block, not per row
+            block_codes = np.array([codes.setdefault(name, len(codes)) for name in names], dtype=np.int64)
+            category.append(block_codes[inverse])
+
+    def joined(parts, dtype):
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    return Reports(joined(lat, np.float64), joined(lng, np.float64), joined(ts, np.float64),
+                   joined(category, np.int64), list(codes))
+
+
+def cell_xy(lat, lng, level):
+    """Vectorized mapgrid.tile(): tile x, y arrays at `level`."""
+    n = 1 << level
+    lat = np.radians(np.clip(lat, -mapgrid.MAX_LAT, mapgrid.MAX_LAT))
+    x = ((lng + 180.0) / 360.0 * n).astype(np.int64)
+    y = ((1.0 - np.arcsinh(np.tan(lat)) / np.pi) / 2.0 * n).astype(np.int64)
+    return np.clip(x, 0, n - 1), np.clip(y, 0, n - 1)
+
+
+def score(keys, period, periods):
+    """keys: group per report; period: 0 = current window, 1..periods = baseline.
+    Returns (distinct keys, index of each report's key, current counts, baseline mean, score)."""
+    distinct, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse * (periods + 1) + period, minlength=len(distinct) * (periods + 1))
+    counts = counts.reshape(len(distinct), periods + 1)
+    current = counts[:, 0]
+    if periods:
+        mean = counts[:, 1:].mean(axis=1)
+        spread = np.maximum(counts[:, 1:].var(axis=1), mean)
+        scores = (current - mean) / np.sqrt(spread + 1.0)
+    else:
+        # No history yet: nothing can be called rising
+        mean = np.zeros(len(distinct))
+        scores = np.zeros(len(distinct))
+    return distinct, inverse, current, mean, scores
+
+
+def _keep(current, rising):
+    """Indexes to store: the densest cells and every rising one."""
+    top = settings.HOTSPOT_TOP_CELLS
+    occupied = np.flatnonzero(current)
+    if len(occupied) > top:
+        occupied = occupied[np.argpartition(current[occupied], -top)[-top:]]
+    return np.union1d(occupied, np.flatnonzero(rising))
+
+
+def _window(data, cell, level, now_ts, days, computed_at):
+    span = days * 86400.0
+    # Clock skew can put a report slightly in the future; count it as current
+    period = np.maximum(((now_ts - data.ts) // span).astype(np.int64), 0)
+    # Baseline windows the data actually covers (a new deployment has little history)
+    oldest = now_ts - data.ts.min()
+    periods = max(0, min(settings.HOTSPOT_BASELINE_PERIODS, int(oldest // span) - 1))
+    selected = period <= periods
+    cell, period, category = cell[selected], period[selected], data.category[selected]
+    lat, lng = data.lat[selected], data.lng[selected]
+    ncat = max(len(data.categories), 1)
+    current_rows = period == 0
+
+    hotspots = []
+    # Overall (key = cell), then per category (key = cell * ncat + category)
+    for per_category, keys in ((False, cell), (True, cell * ncat + category)):
+        distinct, inverse, current, mean, scores = score(keys, period, periods)
+        rising = (current >= max(settings.HOTSPOT_MIN_REPORTS, 1)) & (scores >= settings.HOTSPOT_MIN_SCORE)
+        keep = np.flatnonzero(rising) if per_category else _keep(current, rising)
+        if not len(keep):
+            continue
+
+        # Centroids and category mix of the current window, for the kept keys only
+        slot = np.full(len(distinct), -1)
+        slot[keep] = np.arange(len(keep))
+        mine = current_rows & (slot[inverse] >= 0)
+        at = slot[inverse[mine]]
+        lat_sum = np.bincount(at, weights=lat[mine], minlength=len(keep))
+        lng_sum = np.bincount(at, weights=lng[mine], minlength=len(keep))
+        mix = np.bincount(at * ncat + category[mine], minlength=len(keep) * ncat).reshape(len(keep), ncat)
+
+        cell_keys = distinct[keep] // ncat if per_category else distinct[keep]
+        for i, index in enumerate(keep):
+            x, y = divmod(int(cell_keys[i]), 1 << level)
+            west, south, east, north = mapgrid.tile_bounds(x, y, level)
+            n = int(current[index])
+            order = np.argsort(-mix[i])
+            hotspots.append(Hotspot(
+                window_days=days,
+                category=data.categories[int(distinct[index] % ncat)] if per_category else '',
+                zoom=settings.HOTSPOT_GRID_ZOOM, x=x, y=y,
+                west=west, south=south, east=east, north=north,
+                latitude=float(lat_sum[i] / n),
+                longitude=float(lng_sum[i] / n),
+                count=n,
+                baseline=round(float(mean[index]), 3),
+                score=round(float(scores[index]), 3),
+                rising=bool(rising[index]),
+                categories={data.categories[c]: int(mix[i][c]) for c in order if mix[i][c]},
+                computed_at=computed_at,
+            ))
+    return hotspots
+
+
+def detect(now=None):
+    """Hotspot rows (unsaved) for every window, from the reports as of `now`."""
+    now = now or timezone.now()
+    windows = sorted(set(settings.HOTSPOT_WINDOWS_DAYS))
+    started = time.perf_counter()
+    data = load(now - timedelta(days=max(windows) * (settings.HOTSPOT_BASELINE_PERIODS + 1)))
+    loaded = time.perf_counter()
+    if not len(data):
+        return []
+
+    level = settings.HOTSPOT_GRID_ZOOM + settings.MAP_GRID_CELL_BITS
+    x, y = cell_xy(data.lat, data.lng, level)
+    cell = x * (1 << level) + y
+    hotspots = []
+    for days in windows:
+        hotspots += _window(data, cell, level, now.timestamp(), days, now)
+
+    logger.info("hotspots_detected", extra={
+        "reports": len(data), "hotspots": len(hotspots), "rising": sum(h.rising for h in hotspots),
+        "load_seconds": round(loaded - started, 2), "analyze_seconds": round(time.perf_counter() - loaded, 2),
+    })
+    return hotspots
+
+
+def replace(hotspots):
+    """Swap in a new run's results in one transaction."""
+    with transaction.atomic():
+        Hotspot.objects.all().delete()
+        Hotspot.objects.bulk_create(hotspots, batch_size=1000)
@@ -0,0 +1,147 @@
+import functools
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  IDEMPOTENCY KEYS
+# ==========================================
+# Clients send "Idempotency-Key: <uuid>" on POSTs they may retry. The first
+# request with a key inserts an in_progress IdempotencyRecord, runs the view
+# and stores its response; later requests with the same key (same user) get
+# that stored response back without running the view again, so no second AI
+# call, upload, SMS or XP award. A duplicate that arrives while the first is
+# still running waits for it (up to IDEMPOTENCY_WAIT_SECONDS) and then
+# replays its result.
+#
+# Only successful responses are stored. Errors are dropped so the client's
+# retry runs for real, whether the view returned them (a 4xx or 5xx
+# Response) or raised them (a ValidationError, a crash). A client that fixes
+# its request can reuse the key. Records expire after IDEMPOTENCY_TTL_HOURS
+# (manage.py purge_idempotency_keys removes them).
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(request):
+    return f"{request.method} {request.path}"[:300]
+
+
+def _claim(user, key, fingerprint):
+    """Insert the in_progress record. Returns (record, created)."""
+    from .models import IdempotencyRecord
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            record = IdempotencyRecord.objects.create(
+                user=user, key=key, fingerprint=fingerprint,
+                created_at=now, expires_at=now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+            )
+        return record, True
+    except IntegrityError:
+        pass
+
+    record = IdempotencyRecord.objects.filter(user=user, key=key).first()
+    if record is None:
+        # Purged between our INSERT and SELECT; try once more
+        return _claim(user, key, fingerprint)
+
+    # Expired records count as absent, and an in_progress record whose worker
+    # died (older than the lock timeout) is taken over. Compare-and-set on the
+    # old created_at so only one duplicate wins the takeover.
+    stale = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+    if record.expires_at <= now or (record.state == 'in_progress' and record.created_at <= stale):
+        taken = IdempotencyRecord.objects.filter(pk=record.pk, created_at=record.created_at).update(
+            fingerprint=fingerprint, state='in_progress', response_status=None, response_body=None,
+            created_at=now, expires_at=now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+        )
+        if taken:
+            record.refresh_from_db()
+            return record, True
+        record.refresh_from_db()
+    return record, False
+
+
+def _wait(record):
+    """Poll an in_progress record until it completes, is dropped or we give up."""
+    from .models import IdempotencyRecord
+
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+        record = IdempotencyRecord.objects.filter(pk=record.pk).first()
+        if record is None or record.state == 'completed':
+            return record
+    return record
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.response_status)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotent(view_method):
+    """Decorator for DRF view methods (self, request, *args, **kwargs)."""
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(HEADER, '').strip()
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'error': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters.'}, status=400)
+
+        fingerprint = _fingerprint(request)
+        record, created = _claim(request.user, key, fingerprint)
+
+        while not created:
+            if record.fingerprint != fingerprint:
+                return Response(
+                    {'error': 'This Idempotency-Key was already used for a different request.'},
+                    status=422,
+                )
+            if record.state == 'completed':
+                logger.info("idempotent_replay", extra={"user_id": request.user.id, "fingerprint": fingerprint})
+                return _replay(record)
+
+            record = _wait(record)
+            if record is None:
+                # The original failed and dropped its record: run it ourselves
+                record, created = _claim(request.user, key, fingerprint)
+            elif record.state != 'completed':
+                response = Response(
+                    {'error': 'A request with this Idempotency-Key is still being processed.'},
+                    status=409,
+                )
+                response['Retry-After'] = '2'
+                return response
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 400:
+            record.delete()
+        else:
+            record.state = 'completed'
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['state', 'response_status', 'response_body'])
+        return response
+
+    return wrapper
@@ -0,0 +1,17 @@
+# ==========================================
+#  IMAGE ADAPTER (lazy Pillow import)
+# ==========================================
+
+
+def open_rgb(image):
+    import PIL.Image
+
+    img = PIL.Image.open(image)
+    # Force image to RGB (Gemini crashes on RGBA/transparent images)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img
+
+
+def warm():
+    import PIL.Image  # noqa: F401
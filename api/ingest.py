@@ -0,0 +1,142 @@
+import logging
+from collections import Counter
+
+import orjson
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from . import history, mapgrid
+from .models import Report
+from .serializers import BulkReportSerializer
+from .utils import AI_QUEUED_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  PARTNER BULK INGEST
+# ==========================================
+# POST /api/reports/bulk/ takes NDJSON, one report per line. Lines are
+# validated and inserted BULK_INGEST_BATCH_SIZE at a time: one bulk INSERT
+# plus one history/counters write per batch, each batch in its own
+# transaction. A result line per input line is streamed back as each batch
+# commits, so a failure part way through leaves the earlier batches stored.
+#
+# Rows with an external_id are deduplicated per partner, so resending a file
+# is safe. Nothing slow happens here. Rows with an image_url are stored as
+# pending with AI_QUEUED_MESSAGE, and `manage.py verify_ingested_reports`
+# fetches, verifies and stores their images later. That command also texts
+# the admin a summary instead of one SMS per row. Partner reports never earn
+# XP.
+
+CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/json-lines')
+
+
+def _parse(lines):
+    """[(line number, bytes)] -> [(line number, dict or None if not JSON)]."""
+    parsed = []
+    for number, line in lines:
+        try:
+            parsed.append((number, orjson.loads(line)))
+        except orjson.JSONDecodeError:
+            parsed.append((number, None))
+    return parsed
+
+
+def _new_report(user, data):
+    image_url = data.get('image_url')
+    return Report(
+        user=user,
+        title=data['title'],
+        description=data['description'],
+        category=data['category'],
+        location=data['location'],
+        latitude=data.get('latitude'),
+        longitude=data.get('longitude'),
+        external_id=data.get('external_id'),
+        source_image_url=image_url,
+        status='pending',
+        ai_confidence=0,
+        ai_analysis=AI_QUEUED_MESSAGE if image_url else "No image provided.",
+        xp_awarded=True,
+    )
+
+
+def _insert(user, rows):
+    """rows: [(line, validated data)]. Returns {line: (status, report id)}."""
+    external_ids = [data['external_id'] for _, data in rows if data.get('external_id')]
+    existing = dict(
+        Report.objects.filter(user=user, external_id__in=external_ids).values_list('external_id', 'id')
+    ) if external_ids else {}
+
+    results, new, first_line, repeats = {}, [], {}, {}
+    for line, data in rows:
+        external_id = data.get('external_id')
+        if external_id in existing:
+            results[line] = ('duplicate', existing[external_id])
+        elif external_id and external_id in first_line:
+            # Repeated within this batch: a duplicate of the first copy
+            repeats[line] = first_line[external_id]
+        else:
+            if external_id:
+                first_line[external_id] = line
+            new.append((line, _new_report(user, data)))
+
+    with transaction.atomic(), history.acting('user', user), history.batched():
+        created = Report.objects.bulk_create([report for _, report in new])
+        for report in created:
+            history.record_transition('report', report.id, user.id, None, 'pending', confidence=0)
+        mapgrid.reports_created(created)
+
+    for (line, _), report in zip(new, created):
+        results[line] = ('created', report.id)
+    for line, first in repeats.items():
+        results[line] = ('duplicate', results[first][1])
+    return results
+
+
+def _process(user, batch, validator):
+    parsed = _parse(batch)
+    valid, results = [], {}
+    for number, data in parsed:
+        if data is None:
+            results[number] = {'status': 'invalid', 'errors': {'line': ['Not valid JSON.']}}
+            continue
+        try:
+            valid.append((number, validator.run_validation(data)))
+        except serializers.ValidationError as e:
+            results[number] = {'status': 'invalid', 'errors': e.detail}
+
+    if valid:
+        try:
+            inserted = _insert(user, valid)
+        except IntegrityError:
+            # Lost a race with a concurrent upload of the same external_id;
+            # the re-read inside _insert now sees its rows as duplicates
+            inserted = _insert(user, valid)
+        for number, (status, report_id) in inserted.items():
+            results[number] = {'status': status, 'id': report_id}
+
+    external_ids = {number: data.get('external_id') for number, data in parsed if isinstance(data, dict)}
+    for number, _ in batch:
+        yield {'line': number, 'external_id': external_ids.get(number), **results[number]}
+
+
+def stream(user, body):
+    """NDJSON results for an NDJSON body: one line per input line, then a summary line."""
+    batch_size = settings.BULK_INGEST_BATCH_SIZE
+    validator = BulkReportSerializer()
+    totals = Counter()
+    lines = [(number, line) for number, line in enumerate(body.splitlines(), 1) if line.strip()]
+    for start in range(0, len(lines), batch_size):
+        # One chunk per batch, so the response flushes as each batch commits
+        chunk = []
+        for result in _process(user, lines[start:start + batch_size], validator):
+            totals[result['status']] += 1
+            chunk.append(orjson.dumps(result))
+        yield b'\n'.join(chunk) + b'\n'
+
+    summary = {status: totals[status] for status in ('created', 'duplicate', 'invalid')}
+    # "created" is a LogRecord attribute, so the counts need their own names
+    logger.info("bulk_ingest", extra={"user_id": user.id, **{f"rows_{status}": n for status, n in summary.items()}})
+    yield orjson.dumps({'summary': summary}) + b'\n'
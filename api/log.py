@@ -0,0 +1,66 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+from . import metrics
+
+# Attributes every LogRecord has; anything else was passed through extra={}
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, event and extras."""
+
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to a background thread that does the actual writing.
+
+    The queue is bounded; when the writer falls behind, new records are
+    dropped (and counted in pulse_log_records_dropped_total) instead of
+    blocking the request that logged them.
+    """
+
+    def __init__(self, maxsize=10000, stream=None):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        target = logging.StreamHandler(stream or sys.stdout)
+        target.setFormatter(JSONFormatter())
+        self.listener = QueueListener(self.queue, target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def prepare(self, record):
+        # Keep structured fields intact; the listener thread formats to JSON.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.LOG_RECORDS_DROPPED.inc()
@@ -0,0 +1,53 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api import archive
+from api.models import ReportArchive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move resolved/rejected reports older than --older-than-days into the archive table, "
+        "in small batches. Safe to stop and re-run at any time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=settings.REPORT_ARCHIVE_AFTER_DAYS)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--sleep", type=float, default=0.2,
+                            help="pause between batches so a live database keeps up")
+        parser.add_argument("--max-batches", type=int, default=0, help="stop after this many batches (0 = no limit)")
+        parser.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+
+    def handle(self, *args, **opts):
+        cutoff = timezone.now() - timedelta(days=opts["older_than_days"])
+        pending = archive.archivable(cutoff).count()
+        self.stdout.write(f"{pending} report(s) resolved/rejected before {cutoff:%Y-%m-%d} to archive.")
+        if opts["dry_run"] or not pending:
+            return
+
+        moved = batches = 0
+        last_id = 0
+        started = time.perf_counter()
+        while True:
+            count, next_id = archive.archive_batch(cutoff, last_id, opts["batch_size"])
+            if next_id == last_id:
+                break  # nothing left past last_id
+            moved += count
+            batches += 1
+            last_id = next_id
+            if batches % 10 == 0:
+                self.stdout.write(f"  {moved} moved (up to id {last_id})")
+            if opts["max_batches"] and batches >= opts["max_batches"]:
+                self.stdout.write("Stopping at --max-batches; run again to continue.")
+                break
+            time.sleep(opts["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} report(s) in {batches} batch(es), {time.perf_counter() - started:.1f}s. "
+            f"Archive now holds {ReportArchive.objects.count()}."
+        ))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import hotspots
+
+
+class Command(BaseCommand):
+    help = (
+        "Find dense and abnormally rising report areas for each HOTSPOT_WINDOWS_DAYS window "
+        "and store them for GET /api/hotspots/. Meant for an hourly cron job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="print the rising cells without storing anything")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        found = hotspots.detect()
+        elapsed = time.perf_counter() - started
+        rising = [h for h in found if h.rising]
+        self.stdout.write(f"{len(found)} hotspot(s), {len(rising)} rising, in {elapsed:.1f}s")
+        for h in sorted(rising, key=lambda h: (h.window_days, -h.score))[:20]:
+            self.stdout.write(f"  {h.window_days}d {h.category or 'all':<14} {h.latitude:.4f},{h.longitude:.4f} "
+                              f"{h.count} vs {h.baseline:.1f} (score {h.score:.1f})")
+        if not opts["dry_run"]:
+            hotspots.replace(found)
@@ -0,0 +1,53 @@
+import csv
+import sys
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import onboarding
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users and profiles from a CSV (username, and optionally email, phone_number, password), "
+        "the same way as POST /api/users/import/. Existing usernames are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file, or - for stdin")
+        parser.add_argument("--workers", type=int, help="password hashing processes (default: USER_IMPORT_WORKERS)")
+        parser.add_argument("--batch-size", type=int, help="rows per insert (default: USER_IMPORT_BATCH_SIZE)")
+
+    def handle(self, *args, **opts):
+        source = sys.stdin.buffer if opts["path"] == "-" else open(opts["path"], "rb")
+        try:
+            try:
+                reader = onboarding.open_csv(source)
+            except (ValueError, UnicodeDecodeError) as e:
+                raise CommandError(str(e))
+
+            started = time.perf_counter()
+            totals, error = Counter(), None
+            with onboarding.hashing_pool(opts["workers"]) as pool:
+                try:
+                    for batch in onboarding.batches(reader, pool, opts["batch_size"]):
+                        for result in batch:
+                            totals[result["status"]] += 1
+                            if result["status"] == "invalid":
+                                errors = "; ".join(f"{field}: {' '.join(map(str, messages))}"
+                                                   for field, messages in result["errors"].items())
+                                self.stderr.write(f"line {result['line']} ({result['username'] or '-'}): {errors}")
+                except (UnicodeDecodeError, csv.Error) as e:
+                    error = f"Stopped at line {reader.line_num + 1}: {e}"
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+
+        done = onboarding.summary(totals, time.perf_counter() - started)
+        self.stdout.write(
+            f"{done['created']} created, {done['duplicate']} duplicate, {done['invalid']} invalid; "
+            f"{done['rows']} rows in {done['seconds']}s ({done['rows_per_second']} rows/s)"
+        )
+        if error:
+            raise CommandError(error)
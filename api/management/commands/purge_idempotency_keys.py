@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import IdempotencyRecord
+
+
+class Command(BaseCommand):
+    help = "Delete expired Idempotency-Key records, in batches (uses the expires_at index)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **opts):
+        now = timezone.now()
+        total = 0
+        while True:
+            ids = list(
+                IdempotencyRecord.objects.filter(expires_at__lte=now)
+                .values_list("id", flat=True)[:opts["batch_size"]]
+            )
+            if not ids:
+                break
+            total += IdempotencyRecord.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} expired idempotency key(s)."))
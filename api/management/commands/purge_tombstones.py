@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete sync tombstones older than --days. Clients holding an older sync token "
+        "get 410 from /api/sync/ and do a full sync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.SYNC_TOMBSTONE_DAYS)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **opts):
+        cutoff = timezone.now() - timedelta(days=opts["days"])
+        total = 0
+        while True:
+            ids = list(
+                Tombstone.objects.filter(deleted_at__lt=cutoff)
+                .order_by("deleted_at", "id").values_list("id", flat=True)[:opts["batch_size"]]
+            )
+            if not ids:
+                break
+            total += Tombstone.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} tombstone(s) older than {cutoff:%Y-%m-%d}."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api import mapgrid
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the map cluster grid (GET /api/map/clusters/) from the Report table. "
+        "Needed after changing the MAP_GRID_* settings, or when --check finds drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000, help="cells per INSERT")
+        parser.add_argument("--check", action="store_true", help="only count cells that drifted")
+
+    def handle(self, *args, **opts):
+        if opts["check"]:
+            self.stdout.write(f"{mapgrid.drifted_cells()} map grid cell(s) drifted.")
+            return
+        cells = mapgrid.rebuild(opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the map grid: {cells} cell(s)."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Max, Q
+
+from api import counters
+from api.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Profile dashboard counters (reports by status, missions) from the tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000, help="profiles per UPDATE")
+        parser.add_argument("--user", help="only this username")
+        parser.add_argument("--check", action="store_true", help="only count profiles whose counters drifted")
+
+    def handle(self, *args, **opts):
+        profiles = Profile.objects.all()
+        if opts["user"]:
+            profiles = profiles.filter(user__username=opts["user"])
+
+        if opts["check"]:
+            expected = counters.expected_counters()
+            drifted = Q()
+            for field in expected:
+                drifted |= ~Q(**{field: F(f"expected_{field}")})
+            count = profiles.annotate(**{f"expected_{f}": e for f, e in expected.items()}).filter(drifted).count()
+            self.stdout.write(f"{count} profile(s) with drifted counters.")
+            return
+
+        last = profiles.aggregate(Max("id"))["id__max"] or 0
+        batch = opts["batch_size"]
+        updated = 0
+        for start in range(0, last + 1, batch):
+            with transaction.atomic():
+                updated += counters.recompute(profiles.filter(id__gte=start, id__lt=start + batch))
+        self.stdout.write(self.style.SUCCESS(f"Recomputed counters for {updated} profile(s)."))
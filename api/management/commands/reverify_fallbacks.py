@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from api import throttling, verification
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Spaces calls evenly under `per_minute` AI calls, counted in a bucket in
+    the shared cache, so overlapping runs (or several hosts running the same
+    cron job) share one budget. Each Gemini call also takes a token from the
+    deployment-wide AI_QUOTA_RATE bucket (api/ai_scheduler.py), which live
+    requests draw on too."""
+
+    def __init__(self, key, per_minute):
+        self.key = f"ai:rate:{key}"
+        self.per_minute = per_minute
+
+    def wait(self):
+        while True:
+            try:
+                wait = throttling.consume(self.key, self.per_minute, 60, burst=1)
+            except Exception as e:
+                # Cache outage: pace this thread on its own
+                logger.error("rate_limit_cache_error", extra={"key": self.key, "error": str(e)})
+                time.sleep(60.0 / self.per_minute)
+                return
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+def parse_window(value):
+    """'01:00-06:00' -> (time, time). The window may wrap past midnight."""
+    try:
+        start, end = (datetime.strptime(part.strip(), "%H:%M").time() for part in value.split("-"))
+    except ValueError:
+        raise CommandError(f"Invalid --window '{value}', expected HH:MM-HH:MM")
+    return start, end
+
+
+def in_window(window, now):
+    start, end = window
+    if start <= end:
+        return start <= now < end
+    return now >= start or now < end
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run AI verification on reports and mission proofs that fell back to manual "
+        "review because Gemini was busy. Meant for an off-peak cron job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=["report", "proof", "all"], default="all")
+        parser.add_argument("--limit", type=int, default=200, help="max items per run")
+        parser.add_argument("--concurrency", type=int, default=settings.AI_SWEEP_CONCURRENCY)
+        parser.add_argument("--rate", type=float, default=settings.AI_SWEEP_RATE_PER_MINUTE,
+                            help="max AI calls per minute, shared by every run of this command")
+        parser.add_argument("--window", default=settings.AI_SWEEP_WINDOW,
+                            help="only run inside this local time window, e.g. 01:00-06:00 (empty = any time)")
+        parser.add_argument("--max-busy", type=int, default=5,
+                            help="stop after this many consecutive 'AI busy' results")
+        parser.add_argument("--dry-run", action="store_true", help="only count the fallback items")
+
+    def handle(self, *args, **opts):
+        if opts["rate"] <= 0:
+            raise CommandError("--rate must be positive")
+        if opts["window"]:
+            window = parse_window(opts["window"])
+            now = timezone.localtime().time()
+            if not in_window(window, now):
+                self.stdout.write(f"Outside the sweep window {opts['window']} (now {now:%H:%M}); nothing to do.")
+                return
+
+        jobs = []
+        if opts["kind"] in ("report", "all"):
+            ids = verification.fallback_reports().order_by("created_at").values_list("id", flat=True)
+            jobs += [("report", pk) for pk in ids[:opts["limit"]]]
+        if opts["kind"] in ("proof", "all"):
+            ids = verification.fallback_proofs().order_by("submitted_at").values_list("id", flat=True)
+            jobs += [("proof", pk) for pk in ids[:opts["limit"]]]
+        jobs = jobs[:opts["limit"]]
+
+        if opts["dry_run"] or not jobs:
+            self.stdout.write(f"{len(jobs)} fallback item(s) waiting.")
+            return
+
+        limiter = RateLimiter("reverify_fallbacks", opts["rate"])
+        results = Counter()
+        lock = threading.Lock()
+        busy_streak = 0
+        stop = threading.Event()
+
+        def run(job):
+            nonlocal busy_streak
+            if stop.is_set():
+                return
+            kind, pk = job
+            limiter.wait()
+            try:
+                if kind == "report":
+                    outcome = verification.reverify_report(pk)
+                else:
+                    outcome = verification.reverify_proof(pk)
+            except Exception as e:
+                logger.warning("reverify_error", extra={"kind": kind, "id": pk, "error": str(e)})
+                outcome = "error"
+            finally:
+                connections.close_all()
+            with lock:
+                results[(kind, outcome or "skipped")] += 1
+                busy_streak = busy_streak + 1 if outcome == "busy" else 0
+                if busy_streak >= opts["max_busy"]:
+                    # Gemini is still rate limiting us; try again next run
+                    stop.set()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max(1, opts["concurrency"])) as pool:
+            list(pool.map(run, jobs))
+        elapsed = time.perf_counter() - started
+
+        cleared = sum(n for (kind, outcome), n in results.items() if outcome in ("verified", "rejected", "completed"))
+        attempted = sum(results.values())
+        summary = ", ".join(f"{kind} {outcome}: {n}" for (kind, outcome), n in sorted(results.items()))
+        logger.info("reverify_run", extra={
+            "queued": len(jobs), "attempted": attempted, "cleared": cleared,
+            "seconds": round(elapsed, 1), "stopped_early": stop.is_set(),
+            "results": {f"{kind}.{outcome}": n for (kind, outcome), n in results.items()},
+        })
+        self.stdout.write(f"Cleared {cleared} of {attempted} attempted ({len(jobs)} queued) in {elapsed:.1f}s")
+        if summary:
+            self.stdout.write(f"  {summary}")
+        if stop.is_set():
+            self.stdout.write("  Stopped early: Gemini is still busy.")
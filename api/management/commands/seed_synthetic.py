@@ -0,0 +1,145 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api import counters, mapgrid
+from api.models import Mission, Notice, Profile, Report, UserMission
+
+SYNTHETIC_PREFIX = "bench_"
+SYNTHETIC_PASSWORD = "bench-pass-123"
+
+# Rough production ratios per user
+REPORTS_PER_USER = 4
+MISSIONS_JOINED_PER_USER = 1.5
+USERS_PER_NOTICE = 100
+USERS_PER_MISSION = 50
+
+REPORT_STATUS_WEIGHTS = {"verified": 50, "pending": 25, "resolved": 15, "rejected": 10}
+PROOF_STATUS_WEIGHTS = {"completed": 60, "pending": 25, "rejected": 15}
+CATEGORIES = ["Infrastructure", "Garbage", "Streetlight", "Water Leak", "Pothole", "Safety"]
+
+# City centre the synthetic pins scatter around (New Delhi)
+CENTER_LAT, CENTER_LNG = 28.6139, 77.2090
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users, reports, missions and notices for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--days", type=int, default=180, help="spread created_at over this many days")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--clear", action="store_true", help="delete previous synthetic data first")
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        batch = opts["batch_size"]
+
+        if opts["clear"]:
+            with mapgrid.batched():
+                deleted, _ = User.objects.filter(username__startswith=SYNTHETIC_PREFIX).delete()
+            Mission.objects.filter(title__startswith=SYNTHETIC_PREFIX).delete()
+            self.stdout.write(f"Cleared {deleted} synthetic rows")
+
+        n_users = opts["users"]
+        now = timezone.now()
+        span = timedelta(days=opts["days"]).total_seconds()
+
+        def random_time():
+            return now - timedelta(seconds=rng.random() * span)
+
+        with transaction.atomic():
+            # One hash shared by every synthetic user keeps seeding fast
+            password = make_password(SYNTHETIC_PASSWORD)
+            start = User.objects.filter(username__startswith=SYNTHETIC_PREFIX).count()
+            users = User.objects.bulk_create(
+                [
+                    User(username=f"{SYNTHETIC_PREFIX}{start + i}", email=f"{SYNTHETIC_PREFIX}{start + i}@example.com", password=password)
+                    for i in range(n_users)
+                ],
+                batch_size=batch,
+            )
+            # bulk_create skips the post_save signal, so profiles are created here
+            profiles = []
+            for u in users:
+                points = rng.choice([0, 10, 50, 120, 320, 560])
+                profiles.append(Profile(
+                    user=u, points=points, level=Profile.level_for(points),
+                    phone_number=f"98{rng.randrange(10**8):08d}",
+                ))
+            Profile.objects.bulk_create(profiles, batch_size=batch)
+
+            missions = Mission.objects.bulk_create(
+                [
+                    Mission(title=f"{SYNTHETIC_PREFIX}mission {i}", description=f"Clean up site #{i}", points_reward=rng.choice([20, 50, 100]))
+                    for i in range(max(10, n_users // USERS_PER_MISSION))
+                ]
+            )
+
+            reports = Report.objects.bulk_create(
+                [self._report(rng, rng.choice(users)) for _ in range(n_users * REPORTS_PER_USER)],
+                batch_size=batch,
+            )
+            # auto_now_add ignores explicit values on insert; backdate afterwards
+            for report in reports:
+                report.created_at = random_time()
+            Report.objects.bulk_update(reports, ["created_at"], batch_size=batch)
+            mapgrid.reports_created(reports)
+
+            pairs = set()
+            target = int(n_users * MISSIONS_JOINED_PER_USER)
+            while len(pairs) < min(target, len(users) * len(missions)):
+                pairs.add((rng.choice(users), rng.choice(missions)))
+            UserMission.objects.bulk_create(
+                [
+                    UserMission(user=u, mission=m, status=self._weighted(rng, PROOF_STATUS_WEIGHTS), ai_analysis="Synthetic proof.")
+                    for u, m in pairs
+                ],
+                batch_size=batch,
+            )
+
+            # Authored by a synthetic user so --clear removes them too
+            notices = Notice.objects.bulk_create(
+                [
+                    Notice(title=f"Notice {i}", content="Synthetic community update.", author=users[0], is_pinned=(i % 10 == 0))
+                    for i in range(max(5, n_users // USERS_PER_NOTICE))
+                ]
+            )
+            for notice in notices:
+                notice.created_at = random_time()
+            Notice.objects.bulk_update(notices, ["created_at"], batch_size=batch)
+
+            # bulk_create bypasses the status history, so fill the dashboard counters directly
+            counters.recompute(Profile.objects.filter(user__username__startswith=SYNTHETIC_PREFIX))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(users)} users, {len(reports)} reports, {len(missions)} missions, "
+            f"{len(pairs)} mission entries, {len(notices)} notices "
+            f"(password for every user: {SYNTHETIC_PASSWORD})"
+        ))
+
+    def _weighted(self, rng, weights):
+        return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _report(self, rng, user):
+        status = self._weighted(rng, REPORT_STATUS_WEIGHTS)
+        confidence = 0 if status == "pending" and rng.random() < 0.4 else rng.randint(30, 99)
+        return Report(
+            user=user,
+            title=f"{rng.choice(CATEGORIES)} issue",
+            description="Synthetic report generated for benchmarking.",
+            category=rng.choice(CATEGORIES),
+            location="Synthetic Ward",
+            latitude=CENTER_LAT + rng.gauss(0, 0.05),
+            longitude=CENTER_LNG + rng.gauss(0, 0.05),
+            status=status,
+            ai_confidence=confidence,
+            ai_analysis="AI Network Busy. Queued for manual review." if confidence == 0 else "Synthetic analysis.",
+            xp_awarded=status in ("verified", "resolved"),
+        )
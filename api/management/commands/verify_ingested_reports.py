@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from decouple import config
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api import sms, verification
+from api.management.commands.reverify_fallbacks import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch, store and AI-verify the images of partner-ingested reports "
+        "(POST /api/reports/bulk/). Meant for a cron job every minute or so."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=500, help="max reports per run")
+        parser.add_argument("--concurrency", type=int, default=settings.AI_INGEST_CONCURRENCY)
+        parser.add_argument("--rate", type=float, default=settings.AI_INGEST_RATE_PER_MINUTE,
+                            help="max AI calls per minute, shared by every run of this command")
+        parser.add_argument("--max-busy", type=int, default=5,
+                            help="stop after this many consecutive 'AI busy' results")
+        parser.add_argument("--no-sms", action="store_true", help="skip the admin summary SMS")
+        parser.add_argument("--dry-run", action="store_true", help="only count the queued reports")
+
+    def handle(self, *args, **opts):
+        if opts["rate"] <= 0:
+            raise CommandError("--rate must be positive")
+        ids = list(verification.ingested_reports().order_by("id").values_list("id", flat=True)[:opts["limit"]])
+        if opts["dry_run"] or not ids:
+            self.stdout.write(f"{len(ids)} ingested report(s) waiting.")
+            return
+
+        limiter = RateLimiter("verify_ingested_reports", opts["rate"])
+        results = Counter()
+        lock = threading.Lock()
+        busy_streak = 0
+        stop = threading.Event()
+
+        def run(pk):
+            nonlocal busy_streak
+            if stop.is_set():
+                return
+            limiter.wait()
+            try:
+                outcome = verification.verify_ingested(pk)
+            except Exception as e:
+                logger.warning("verify_ingested_error", extra={"id": pk, "error": str(e)})
+                outcome = "error"
+            finally:
+                connections.close_all()
+            with lock:
+                results[outcome or "skipped"] += 1
+                busy_streak = busy_streak + 1 if outcome == "busy" else 0
+                if busy_streak >= opts["max_busy"]:
+                    stop.set()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max(1, opts["concurrency"])) as pool:
+            list(pool.map(run, ids))
+        elapsed = time.perf_counter() - started
+
+        summary = ", ".join(f"{outcome}: {n}" for outcome, n in sorted(results.items()))
+        logger.info("verify_ingested_run", extra={
+            "queued": len(ids), "seconds": round(elapsed, 1), "stopped_early": stop.is_set(),
+            "results": dict(results),
+        })
+        self.stdout.write(f"Processed {sum(results.values())} of {len(ids)} queued in {elapsed:.1f}s")
+        if summary:
+            self.stdout.write(f"  {summary}")
+        if stop.is_set():
+            self.stdout.write("  Stopped early: Gemini is busy; the rest stay queued.")
+
+        # One summary text per run instead of an SMS per report
+        admin_phone = config("ADMIN_PHONE_NUMBER", default=None)
+        if results["verified"] and admin_phone and sms.is_configured() and not opts["no_sms"]:
+            try:
+                sms.send(admin_phone, f"PULSE: {results['verified']} partner report(s) verified by AI, "
+                                      f"{results['pending'] + results['busy'] + results['unreachable']} need review.")
+            except Exception as e:
+                logger.error("sms_error", extra={"recipient": "admin", "error": str(e)})
@@ -0,0 +1,294 @@
+import math
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections, router, transaction
+
+# ==========================================
+#  MAP GRID (server-side clustering)
+# ==========================================
+# GET /api/map/clusters/ answers with one cluster per non-empty grid cell in
+# the bounding box instead of one pin per report. Cells are Web Mercator
+# tiles split MAP_GRID_CELL_BITS times (2 -> 4x4 cells of 64px per 256px
+# tile), one grid per zoom from MAP_GRID_MIN_ZOOM to MAP_GRID_MAX_ZOOM. Each
+# cell is a level further down than the one at the zoom above, so a cell's
+# parent is just (x >> 1, y >> 1).
+#
+# MapGridCell rows hold count, coordinate sums (for the centroid) and counts
+# per status. They move with the reports, like the profile counters do: the
+# Report signals handle single saves and deletes, and the bulk paths
+# (moderation, partner ingest, archival) call in with their rows. A change
+# touches a cell at every zoom, so cells are written with multi-row
+# INSERT ... ON CONFLICT DO UPDATE, the same SQL on Postgres and SQLite
+# (the ORM cannot add to a counter on conflict). rebuild() recomputes
+# everything from the Report table.
+#
+# If the box covers more than MAP_CLUSTER_MAX_CELLS cells at the requested
+# zoom, a coarser zoom is used, so a response never has more clusters than
+# that, however many reports there are.
+
+STATUSES = ('pending', 'verified', 'rejected', 'resolved')
+COLUMNS = ('count', 'lat_sum', 'lng_sum', *STATUSES)
+# Web Mercator stops here
+MAX_LAT = 85.05112878
+# Rows per INSERT (capped by the backend's parameter limit)
+WRITE_CHUNK = 1000
+
+_batch = ContextVar('mapgrid_batch', default=None)
+
+
+def zooms():
+    return range(settings.MAP_GRID_MIN_ZOOM, settings.MAP_GRID_MAX_ZOOM + 1)
+
+
+def tile(lat, lng, level):
+    """(x, y) of the Web Mercator tile at `level` holding the point."""
+    n = 1 << level
+    lat = max(-MAX_LAT, min(MAX_LAT, lat))
+    x = int((lng + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(x, y, level):
+    """(west, south, east, north) of a tile in degrees."""
+    n = 1 << level
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def cells(lat, lng):
+    """(zoom, x, y) of the point's cell at every grid zoom."""
+    top = settings.MAP_GRID_MAX_ZOOM
+    x, y = tile(lat, lng, top + settings.MAP_GRID_CELL_BITS)
+    return [(zoom, x >> (top - zoom), y >> (top - zoom)) for zoom in zooms()]
+
+
+def _empty():
+    return [0] * len(COLUMNS)
+
+
+def _bump(totals, status, lat, lng, sign):
+    totals[0] += sign
+    totals[1] += sign * lat
+    totals[2] += sign * lng
+    if status in STATUSES:
+        totals[3 + STATUSES.index(status)] += sign
+
+
+def _add(deltas, status, lat, lng, sign):
+    # Reports without coordinates are not on the map
+    if lat is None or lng is None:
+        return
+    for key in cells(lat, lng):
+        _bump(deltas[key], status, lat, lng, sign)
+
+
+# ==========================================
+#  INCREMENTAL UPDATES
+# ==========================================
+
+@contextmanager
+def batched():
+    """Collect grid changes made in this block into one write (archival)."""
+    if _batch.get() is not None:
+        yield
+        return
+    deltas = defaultdict(_empty)
+    token = _batch.set(deltas)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    _write(deltas)
+
+
+def _apply(deltas):
+    batch = _batch.get()
+    if batch is None:
+        _write(deltas)
+        return
+    for key, values in deltas.items():
+        totals = batch[key]
+        for i, value in enumerate(values):
+            totals[i] += value
+
+
+def _write(deltas):
+    from .models import MapGridCell
+
+    # Sorted, so concurrent writers lock shared cells in the same order
+    rows = [(*key, *values) for key, values in sorted(deltas.items()) if any(values)]
+    if not rows:
+        return
+    connection = connections[router.db_for_write(MapGridCell)]
+    quote = connection.ops.quote_name
+    table = quote(MapGridCell._meta.db_table)
+    names = ', '.join(quote(name) for name in ('zoom', 'x', 'y', *COLUMNS))
+    increments = ', '.join(f"{quote(c)} = {table}.{quote(c)} + excluded.{quote(c)}" for c in COLUMNS)
+    row_sql = '(' + ', '.join(['%s'] * len(rows[0])) + ')'
+    size = min(WRITE_CHUNK, (connection.features.max_query_params or 65535) // len(rows[0]))
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), size):
+            chunk = rows[start:start + size]
+            cursor.execute(
+                f"INSERT INTO {table} ({names}) VALUES {', '.join([row_sql] * len(chunk))} "
+                f"ON CONFLICT ({quote('zoom')}, {quote('x')}, {quote('y')}) DO UPDATE SET {increments}",
+                [value for row in chunk for value in row],
+            )
+
+
+def _loaded(report):
+    """(status, lat, lng) as last read from / written to the database."""
+    lat, lng = getattr(report, '_loaded_point', (report.latitude, report.longitude))
+    return getattr(report, '_loaded_status', report.status), lat, lng
+
+
+def report_saved(report, created):
+    # Called from the post_save signal before it resets _loaded_status
+    old = None if created else _loaded(report)
+    new = (report.status, report.latitude, report.longitude)
+    report._loaded_point = (report.latitude, report.longitude)
+    if old == new:
+        return
+    deltas = defaultdict(_empty)
+    if old is not None:
+        _add(deltas, *old, -1)
+    _add(deltas, *new, 1)
+    _apply(deltas)
+
+
+def report_deleted(report):
+    deltas = defaultdict(_empty)
+    _add(deltas, *_loaded(report), -1)
+    _apply(deltas)
+
+
+def reports_created(reports):
+    """After bulk_create, which sends no signals."""
+    deltas = defaultdict(_empty)
+    for report in reports:
+        _add(deltas, report.status, report.latitude, report.longitude, 1)
+    _apply(deltas)
+
+
+def report_statuses_changed(rows, status):
+    """After queryset.update(status=...); rows carry the old status and coordinates."""
+    deltas = defaultdict(_empty)
+    for row in rows:
+        _add(deltas, row['status'], row['latitude'], row['longitude'], -1)
+        _add(deltas, status, row['latitude'], row['longitude'], 1)
+    _apply(deltas)
+
+
+# ==========================================
+#  QUERIES
+# ==========================================
+
+def parse_bbox(value):
+    """'west,south,east,north' in degrees -> floats. Raises ValueError."""
+    try:
+        west, south, east, north = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError("bbox must be west,south,east,north in degrees")
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError("bbox must be west,south,east,north with west <= east and south <= north")
+    return west, south, east, north
+
+
+def clusters(west, south, east, north, zoom):
+    """Returns (zoom used, clusters in the box)."""
+    from .models import MapGridCell
+
+    zoom = min(max(zoom, settings.MAP_GRID_MIN_ZOOM), settings.MAP_GRID_MAX_ZOOM)
+    while True:
+        level = zoom + settings.MAP_GRID_CELL_BITS
+        x0, y0 = tile(north, west, level)
+        x1, y1 = tile(south, east, level)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) <= settings.MAP_CLUSTER_MAX_CELLS or zoom == settings.MAP_GRID_MIN_ZOOM:
+            break
+        zoom -= 1
+
+    rows = MapGridCell.objects.filter(
+        zoom=zoom, x__range=(x0, x1), y__range=(y0, y1), count__gt=0,
+    ).values_list(*COLUMNS)
+    result = []
+    for count, lat_sum, lng_sum, *by_status in rows:
+        result.append({
+            'lat': round(lat_sum / count, 6),
+            'lng': round(lng_sum / count, 6),
+            'count': count,
+            'statuses': dict(zip(STATUSES, by_status)),
+        })
+    return zoom, result
+
+
+# ==========================================
+#  REBUILD
+# ==========================================
+
+def expected_cells():
+    """{(zoom, x, y): totals} from the Report table: one pass for the finest
+    zoom, then each coarser zoom by merging child cells."""
+    from .models import Report
+
+    top = settings.MAP_GRID_MAX_ZOOM
+    level = top + settings.MAP_GRID_CELL_BITS
+    finest = defaultdict(_empty)
+    points = (Report.objects.filter(latitude__isnull=False, longitude__isnull=False)
+              .values_list('status', 'latitude', 'longitude'))
+    for status, lat, lng in points.iterator(chunk_size=5000):
+        x, y = tile(lat, lng, level)
+        _bump(finest[(top, x, y)], status, lat, lng, 1)
+
+    expected = dict(finest)
+    children = finest
+    for zoom in range(top - 1, settings.MAP_GRID_MIN_ZOOM - 1, -1):
+        parents = defaultdict(_empty)
+        for (_, x, y), values in children.items():
+            totals = parents[(zoom, x >> 1, y >> 1)]
+            for i, value in enumerate(values):
+                totals[i] += value
+        expected.update(parents)
+        children = parents
+    return expected
+
+
+def _same(expected, stored):
+    return all(
+        math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6) if isinstance(a, float) or isinstance(b, float) else a == b
+        for a, b in zip(expected, stored)
+    )
+
+
+def drifted_cells():
+    """How many cells differ from what the Report table says."""
+    from .models import MapGridCell
+
+    expected = expected_cells()
+    drifted = 0
+    for zoom, x, y, *stored in MapGridCell.objects.values_list('zoom', 'x', 'y', *COLUMNS).iterator(chunk_size=5000):
+        if not _same(expected.pop((zoom, x, y), _empty()), stored):
+            drifted += 1
+    # Cells with reports but no row at all
+    return drifted + sum(1 for values in expected.values() if values[0])
+
+
+def rebuild(batch_size=2000):
+    """Replace the grid with one computed from the Report table. Returns the number of cells."""
+    from .models import MapGridCell
+
+    expected = expected_cells()
+    with transaction.atomic():
+        MapGridCell.objects.all().delete()
+        MapGridCell.objects.bulk_create(
+            [MapGridCell(zoom=zoom, x=x, y=y, **dict(zip(COLUMNS, values)))
+             for (zoom, x, y), values in expected.items()],
+            batch_size=batch_size,
+        )
+    return len(expected)
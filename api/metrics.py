@@ -0,0 +1,241 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+# ==========================================
+#  METRICS REGISTRY (Prometheus text format)
+# ==========================================
+# Values live in process memory, so each worker exposes its own series;
+# Prometheus sums them across scrape targets.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, ([*s[0]], s[1], s[2])) for key, s in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_number(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_number(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "pulse_http_request_duration_seconds", "Request latency by endpoint.",
+    ["endpoint", "method", "status"],
+))
+DB_QUERIES_PER_REQUEST = registry.register(Histogram(
+    "pulse_db_queries_per_request", "Database queries issued per request.",
+    ["endpoint"], buckets=QUERY_COUNT_BUCKETS,
+))
+DB_QUERIES = registry.register(Counter(
+    "pulse_db_queries_total", "Database queries by endpoint.", ["endpoint"],
+))
+DB_QUERY_SECONDS = registry.register(Counter(
+    "pulse_db_query_seconds_total", "Time spent in database queries by endpoint.", ["endpoint"],
+))
+EXTERNAL_CALL_DURATION = registry.register(Histogram(
+    "pulse_external_call_duration_seconds", "Latency of calls to Gemini, Twilio and Cloudinary.",
+    ["service", "outcome"],
+))
+AI_QUEUE_WAIT = registry.register(Histogram(
+    "pulse_ai_queue_wait_seconds", "Time Gemini calls waited for an AI scheduler slot.",
+    ["priority", "outcome"],
+))
+AI_OUTCOMES = registry.register(Counter(
+    "pulse_ai_verifications_total", "AI image verification outcomes.", ["source", "outcome"],
+))
+LOG_RECORDS_DROPPED = registry.register(Counter(
+    "pulse_log_records_dropped_total", "Log records dropped because the log queue was full.",
+))
+
+
+# ==========================================
+#  PER-REQUEST DB ACCOUNTING
+# ==========================================
+# One execute wrapper is installed on every new DB connection. It reports to
+# every RequestStats active in the current context (they nest, e.g. a test's
+# query capture around a request the middleware is also measuring). The
+# context follows the request across sync_to_async thread hops under ASGI.
+
+class RequestStats:
+    def __init__(self, record=False):
+        self.queries = 0
+        self.query_time = 0.0
+        # When recording, keep (sql, seconds) for every query and
+        # (service, outcome, seconds) for every external call
+        self.record = record
+        self.executed = []
+        self.external = []
+
+
+_active_stats = ContextVar("pulse_request_stats", default=())
+
+
+def current_stats():
+    active = _active_stats.get()
+    return active[-1] if active else None
+
+
+def activate_stats(stats):
+    return _active_stats.set(_active_stats.get() + (stats,))
+
+
+def deactivate_stats(token):
+    _active_stats.reset(token)
+
+
+def _observe_query(execute, sql, params, many, context):
+    active = _active_stats.get()
+    if not active:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for stats in active:
+            stats.queries += 1
+            stats.query_time += elapsed
+            if stats.record:
+                stats.executed.append((sql, elapsed))
+
+
+def _install_query_observer(sender, connection, **kwargs):
+    if _observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_observe_query)
+
+
+connection_created.connect(_install_query_observer, dispatch_uid="pulse_query_observer")
+
+
+def record_request(endpoint, method, status, duration, stats):
+    REQUEST_DURATION.observe(duration, endpoint=endpoint, method=method, status=str(status))
+    DB_QUERIES_PER_REQUEST.observe(stats.queries, endpoint=endpoint)
+    DB_QUERIES.inc(stats.queries, endpoint=endpoint)
+    DB_QUERY_SECONDS.inc(stats.query_time, endpoint=endpoint)
+
+
+# ==========================================
+#  EXTERNAL CALLS & AI OUTCOMES
+# ==========================================
+
+@contextmanager
+def external_call(service):
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        EXTERNAL_CALL_DURATION.observe(elapsed, service=service, outcome=outcome)
+        for stats in _active_stats.get():
+            if stats.record:
+                stats.external.append((service, outcome, elapsed))
+
+
+def ai_outcome(source, match, confidence):
+    if confidence == 0:
+        outcome = "fallback"
+    elif match:
+        outcome = "match"
+    else:
+        outcome = "reject"
+    AI_OUTCOMES.inc(source=source, outcome=outcome)
+    return outcome
@@ -0,0 +1,259 @@
+import logging
+import time
+
+import brotli
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+from rest_framework.permissions import SAFE_METHODS
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import db_router, metrics, profiling, queries
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that can also run natively under ASGI.
+
+    Stock WhiteNoise is sync-only, which makes Django push every ASGI request
+    through one serialized thread hop. That is fine for short requests but
+    stalls long-lived SSE streams, so static lookups here stay on the event
+    loop and only actual file serving leaves it.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class MetricsMiddleware:
+    """Per-endpoint latency and DB query accounting for /api/metrics/."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats, token, started = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.deactivate_stats(token)
+        self._finish(request, response, stats, started)
+        return response
+
+    async def __acall__(self, request):
+        stats, token, started = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.deactivate_stats(token)
+        self._finish(request, response, stats, started)
+        return response
+
+    def _start(self):
+        stats = metrics.RequestStats()
+        return stats, metrics.activate_stats(stats), time.perf_counter()
+
+    def _finish(self, request, response, stats, started):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.view_name if match else 'unmatched'
+        metrics.record_request(
+            endpoint, request.method, response.status_code, time.perf_counter() - started, stats
+        )
+
+
+class QueryInspectorMiddleware:
+    """Development aid: records each request's queries and flags N+1 shapes.
+
+    Adds X-Query-Count / X-Query-Time-Ms headers, logs repeated query shapes,
+    and checks settings.QUERY_BUDGETS. With QUERY_BUDGET_STRICT on (as in
+    the test suite) an exceeded budget raises instead of just logging.
+    """
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with queries.capture_queries() as log:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.view_name if match else 'unmatched'
+        response['X-Query-Count'] = str(log.count)
+        response['X-Query-Time-Ms'] = f"{log.time * 1000:.1f}"
+
+        repeated = log.repeated_shapes()
+        for shape, n in repeated:
+            logger.warning("n_plus_one_suspected", extra={"endpoint": endpoint, "count": n, "shape": shape})
+        if repeated:
+            response['X-N-Plus-One'] = str(len(repeated))
+
+        budget = queries.budget_for(endpoint, request.method)
+        if budget is not None and log.count > budget:
+            message = f"{request.method} {endpoint}: query budget {budget} exceeded: {log.describe()}"
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise queries.QueryBudgetExceeded(message)
+            logger.warning("query_budget_exceeded", extra={"endpoint": endpoint, "budget": budget, "count": log.count})
+        return response
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """Profiles a staff request that asks for it (X-Profile header; see api/profiling.py).
+
+    Works in process_view, which Django runs in the view's own thread under
+    both WSGI and ASGI, so the profiler sees the view's stack. Must come last
+    in MIDDLEWARE so the other middleware's process_view still runs.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mode = profiling.requested_mode(request)
+        if mode is None or iscoroutinefunction(view_func):
+            return None
+        user = profiling.staff_user(request)
+        if user is None:
+            return None
+        response, stacks, stats, seconds = profiling.run(mode, view_func, request, view_args, view_kwargs)
+        profile = profiling.save(request, user, response, mode, stacks, stats, seconds)
+        response['X-Profile-Id'] = str(profile.id)
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Pins a user's reads to the primary after they write (see api.db_router)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not db_router.replica_aliases():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self._wrote(request, response):
+            db_router.pin_to_primary(request.user)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self._wrote(request, response):
+            await sync_to_async(db_router.pin_to_primary, thread_sensitive=False)(request.user)
+        return response
+
+    def _wrote(self, request, response):
+        # DRF copies the JWT-authenticated user onto the Django request
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+
+def preferred_encoding(accept_encoding):
+    """'br', 'gzip' or None for an Accept-Encoding header (q-values honoured, br wins ties)."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    fallback = accepted.get('*', 0.0)
+    br, gzip = accepted.get('br', fallback), accepted.get('gzip', fallback)
+    if br > 0 and br >= gzip:
+        return 'br'
+    if gzip > 0:
+        return 'gzip'
+    return None
+
+
+class CompressionMiddleware:
+    """Brotli or gzip for API responses, whichever the client prefers.
+
+    Django's GZipMiddleware only speaks gzip; brotli at a low quality level is
+    smaller and cheaper on JSON. Streaming responses (SSE, static files) are
+    left alone so nothing sits in a compressor buffer. Under ASGI, large bodies
+    are compressed off the event loop (zlib and brotli release the GIL).
+    """
+    sync_capable = True
+    async_capable = True
+    THREAD_THRESHOLD = 256 * 1024
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self._compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if not response.streaming and len(response.content) >= self.THREAD_THRESHOLD:
+            return await sync_to_async(self._compress, thread_sensitive=False)(request, response)
+        return self._compress(request, response)
+
+    def _compress(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_BYTES:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = preferred_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if encoding == 'br':
+            body = brotli.compress(response.content, quality=settings.BROTLI_QUALITY)
+        else:
+            body = compress_string(response.content)
+        if len(body) >= len(response.content):
+            return response
+
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        # The bytes changed, so a strong ETag no longer holds (same as GZipMiddleware)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
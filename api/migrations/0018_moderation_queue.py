@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_alter_usermission_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='usermission',
+            name='ai_confidence',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usermission',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='usermission',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['ai_confidence', 'created_at', 'id'], name='report_mod_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usermission',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['ai_confidence', 'submitted_at', 'id'], name='usermission_mod_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_moderation_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportArchive',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('category', models.CharField(default='Infrastructure', max_length=100)),
+                ('location', models.CharField(max_length=255)),
+                ('image', models.ImageField(blank=True, max_length=500, null=True, upload_to='reports/')),
+                ('resolved_image', models.ImageField(blank=True, max_length=500, null=True, upload_to='resolved_proofs/')),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('verified', 'Verified'), ('rejected', 'Rejected'), ('resolved', 'Resolved')], max_length=20)),
+                ('feedback', models.TextField(blank=True, null=True)),
+                ('rating', models.IntegerField(default=0)),
+                ('ai_analysis', models.TextField(blank=True, null=True)),
+                ('ai_confidence', models.IntegerField(default=0)),
+                ('xp_awarded', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at'], name='api_reporta_user_id_3c188e_idx'), models.Index(fields=['category', '-created_at'], name='api_reporta_categor_e1b48b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_report_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('report', 'Report'), ('proof', 'Mission proof')], max_length=8)),
+                ('object_id', models.IntegerField()),
+                ('old_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('new_status', models.CharField(max_length=20)),
+                ('source', models.CharField(choices=[('user', 'User'), ('ai', 'AI'), ('admin', 'Admin'), ('system', 'System')], max_length=8)),
+                ('confidence', models.SmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'object_id', 'id'], name='statusevent_object_idx'), models.Index(fields=['user', 'id'], name='statusevent_user_idx')],
+            },
+        ),
+    ]
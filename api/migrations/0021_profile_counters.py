@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_status_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='missions_completed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='missions_joined',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='reports_pending',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='reports_rejected',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='reports_resolved',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='reports_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='reports_verified',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='points',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
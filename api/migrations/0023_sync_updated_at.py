@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:02
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_idempotency_record'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('report', 'Report'), ('notice', 'Notice'), ('mission', 'Mission progress')], max_length=8)),
+                ('object_id', models.IntegerField()),
+                ('owner_id', models.IntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notice',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='usermission',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['updated_at', 'id'], name='notice_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['updated_at', 'id'], name='report_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usermission',
+            index=models.Index(fields=['updated_at', 'id'], name='usermission_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='tombstone_sync_idx'),
+        ),
+    ]
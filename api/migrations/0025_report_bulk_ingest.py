@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_throttle_hit'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='report',
+            options={'permissions': [('bulk_ingest_report', 'Can bulk ingest reports (partner API)')]},
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='source_image_url',
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='report',
+            constraint=models.UniqueConstraint(condition=models.Q(('external_id__isnull', False)), fields=('user', 'external_id'), name='report_user_external_id_unique'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_report_bulk_ingest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapGridCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.SmallIntegerField()),
+                ('x', models.IntegerField()),
+                ('y', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('lat_sum', models.FloatField(default=0)),
+                ('lng_sum', models.FloatField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('verified', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('zoom', 'x', 'y'), name='mapgridcell_zoom_x_y_unique')],
+            },
+        ),
+    ]
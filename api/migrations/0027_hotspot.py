@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_map_grid_cell'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hotspot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_days', models.SmallIntegerField()),
+                ('category', models.CharField(blank=True, default='', max_length=100)),
+                ('zoom', models.SmallIntegerField()),
+                ('x', models.IntegerField()),
+                ('y', models.IntegerField()),
+                ('west', models.FloatField()),
+                ('south', models.FloatField()),
+                ('east', models.FloatField()),
+                ('north', models.FloatField()),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('count', models.IntegerField()),
+                ('baseline', models.FloatField()),
+                ('score', models.FloatField()),
+                ('rising', models.BooleanField(default=False)),
+                ('categories', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['window_days', 'category', '-score'], name='hotspot_window_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_hotspot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('view_name', models.CharField(blank=True, default='', max_length=200)),
+                ('status_code', models.SmallIntegerField()),
+                ('mode', models.CharField(choices=[('sample', 'Sampling'), ('trace', 'Deterministic trace')], max_length=10)),
+                ('duration_ms', models.FloatField()),
+                ('sample_interval_ms', models.FloatField(blank=True, null=True)),
+                ('weight', models.BigIntegerField(default=0)),
+                ('folded', models.TextField(blank=True, default='')),
+                ('query_count', models.IntegerField(default=0)),
+                ('query_ms', models.FloatField(default=0)),
+                ('queries', models.JSONField(blank=True, default=list)),
+                ('external_calls', models.JSONField(blank=True, default=list)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:19
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    # CREATE INDEX CONCURRENTLY keeps the report table writable while the
+    # index builds. Other databases (SQLite in development) get a plain AddIndex.
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0028_request_profile'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='report',
+            index=models.Index(fields=['-created_at'], name='report_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='report',
+            index=models.Index(fields=['status', 'category', '-created_at'], name='report_status_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='report',
+            index=models.Index(fields=['category', 'status', '-created_at'], name='report_category_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='report',
+            index=models.Index(fields=['user', '-created_at'], name='report_user_created_idx'),
+        ),
+    ]
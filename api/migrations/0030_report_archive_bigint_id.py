@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_report_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportarchive',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+    ]
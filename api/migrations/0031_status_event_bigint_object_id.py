@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_report_archive_bigint_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='statusevent',
+            name='object_id',
+            field=models.BigIntegerField(),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_status_event_bigint_object_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tombstone',
+            name='object_id',
+            field=models.BigIntegerField(),
+        ),
+    ]
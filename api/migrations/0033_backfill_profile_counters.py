@@ -0,0 +1,55 @@
+from django.db import migrations
+from django.db.models import F, Func, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# 0021 added the Profile dashboard counters at 0; fill them in for existing
+# profiles so the first status change does not take them below zero. Same
+# as `manage.py recompute_counters` (api/counters.py), with the historical
+# models, one UPDATE per BATCH profiles.
+
+BATCH = 2000
+REPORT_STATUS_FIELDS = {
+    'pending': 'reports_pending',
+    'verified': 'reports_verified',
+    'rejected': 'reports_rejected',
+    'resolved': 'reports_resolved',
+}
+
+
+def _count(model, **filters):
+    return Coalesce(Subquery(
+        model.objects.filter(user=OuterRef('user'), **filters).order_by()
+        .annotate(n=Func(F('pk'), function='COUNT')).values('n'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+def backfill(apps, schema_editor):
+    Profile = apps.get_model('api', 'Profile')
+    Report = apps.get_model('api', 'Report')
+    ReportArchive = apps.get_model('api', 'ReportArchive')
+    UserMission = apps.get_model('api', 'UserMission')
+
+    expected = {
+        # Archived reports still count towards a user's totals
+        'reports_total': _count(Report) + _count(ReportArchive),
+        'missions_joined': _count(UserMission),
+        'missions_completed': _count(UserMission, status='completed'),
+    }
+    for status, field in REPORT_STATUS_FIELDS.items():
+        expected[field] = _count(Report, status=status) + _count(ReportArchive, status=status)
+
+    last = Profile.objects.aggregate(Max('id'))['id__max'] or 0
+    for start in range(0, last + 1, BATCH):
+        Profile.objects.filter(id__gte=start, id__lt=start + BATCH).update(**expected)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_tombstone_bigint_object_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
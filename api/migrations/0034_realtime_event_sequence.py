@@ -0,0 +1,32 @@
+import time
+
+from django.db import migrations
+
+# Shared id sequence for realtime events with REALTIME_BACKEND=postgres
+# (api/realtime.py). Other databases only run the local backend. It starts
+# above the local backend's timestamp ids, so a client still holding one of
+# those as its Last-Event-ID is not ahead of every new event.
+
+SEQUENCE = 'pulse_event_id'
+
+
+def create_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        start = time.time_ns() // 1000
+        schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS {SEQUENCE} START WITH {start}')
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS {SEQUENCE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_backfill_profile_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
@@ -1,24 +1,65 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from . import counters, history, mapgrid, realtime, sync
 
 #1. USER PROFILE
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
-    points = models.IntegerField(default=0)
+    points = models.IntegerField(default=0, db_index=True)
     level = models.CharField(max_length=50, default="Scout")
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     
     bio = models.TextField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
 
+    # Dashboard counters, kept in sync by api/counters.py on every status
+    # transition (repair with `manage.py recompute_counters`)
+    reports_total = models.IntegerField(default=0)
+    reports_pending = models.IntegerField(default=0)
+    reports_verified = models.IntegerField(default=0)
+    reports_rejected = models.IntegerField(default=0)
+    reports_resolved = models.IntegerField(default=0)
+    missions_joined = models.IntegerField(default=0)
+    missions_completed = models.IntegerField(default=0)
+
+    # (minimum points, level), highest first
+    LEVELS = [(500, "Hero"), (300, "Guardian"), (100, "Scout")]
+    DEFAULT_LEVEL = "Citizen"
+
+    @classmethod
+    def level_for(cls, points):
+        for minimum, level in cls.LEVELS:
+            if points >= minimum:
+                return level
+        return cls.DEFAULT_LEVEL
+
+    @classmethod
+    def level_expression(cls):
+        # Same rule as level_for, for queryset.update() after bulk point changes
+        return models.Case(
+            *[models.When(points__gte=minimum, then=models.Value(level)) for minimum, level in cls.LEVELS],
+            default=models.Value(cls.DEFAULT_LEVEL),
+        )
+
+    COUNTER_FIELDS = (
+        'reports_total', 'reports_pending', 'reports_verified', 'reports_rejected',
+        'reports_resolved', 'missions_joined', 'missions_completed',
+    )
+
     def save(self, *args, **kwargs):
         # Auto-calculate Level
-        if self.points >= 500: self.level = "Hero"
-        elif self.points >= 300: self.level = "Guardian"
-        elif self.points >= 100: self.level = "Scout"
-        else: self.level = "Citizen"
+        self.level = self.level_for(self.points)
+        # Counters only change through F() updates; a regular save of a
+        # (possibly stale) instance must not write them back
+        if self.pk and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -59,12 +100,105 @@ class Report(models.Model):
 
     # Reward Tracking
     xp_awarded = models.BooleanField(default=False)
+
+    # Moderation queue lease (see api/moderation.py)
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    claim_expires_at = models.DateTimeField(null=True, blank=True)
+
+    # Partner bulk ingest (api/ingest.py): the partner's own id for the row,
+    # and the image to fetch and verify later (manage.py verify_ingested_reports)
+    external_id = models.CharField(max_length=100, null=True, blank=True)
+    source_image_url = models.URLField(max_length=500, null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    # Delta sync cursor (api/sync.py); queryset.update() callers set it by hand
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='report_sync_idx'),
+            # Feed filters (api/facets.py). status and category come in both
+            # orders so each facet's GROUP BY reads only the index
+            models.Index(fields=['-created_at'], name='report_created_idx'),
+            models.Index(fields=['status', 'category', '-created_at'], name='report_status_created_idx'),
+            models.Index(fields=['category', 'status', '-created_at'], name='report_category_created_idx'),
+            models.Index(fields=['user', '-created_at'], name='report_user_created_idx'),
+            # Moderation queue order; only pending rows are indexed
+            models.Index(
+                fields=['ai_confidence', 'created_at', 'id'],
+                condition=models.Q(status='pending'),
+                name='report_mod_queue_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'external_id'],
+                condition=models.Q(external_id__isnull=False),
+                name='report_user_external_id_unique',
+            ),
+        ]
+        permissions = [('bulk_ingest_report', 'Can bulk ingest reports (partner API)')]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the status as loaded so saves can detect transitions
+        if 'status' in field_names:
+            instance._loaded_status = values[field_names.index('status')]
+        # ...and the coordinates, for moves on the map grid
+        if 'latitude' in field_names and 'longitude' in field_names:
+            instance._loaded_point = (values[field_names.index('latitude')], values[field_names.index('longitude')])
+        return instance
+
+    def save(self, *args, **kwargs):
+        # post_save writes the StatusEvent, the Profile counters and the map
+        # grid; keep them in one transaction with the row so they cannot drift
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.title} ({self.status})"
 
+#2b. REPORT ARCHIVE
+# Old resolved/rejected reports are moved here by `manage.py archive_reports`
+# so the live table (feed, admin, moderation) only holds recent and active
+# rows. Ids are kept, image files stay where they are.
+class ReportArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_reports')
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    category = models.CharField(max_length=100, default="Infrastructure")
+    location = models.CharField(max_length=255)
+    image = models.ImageField(upload_to='reports/', max_length=500, blank=True, null=True)
+    resolved_image = models.ImageField(upload_to='resolved_proofs/', max_length=500, blank=True, null=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=Report.STATUS_CHOICES)
+    feedback = models.TextField(blank=True, null=True)
+    rating = models.IntegerField(default=0)
+    ai_analysis = models.TextField(blank=True, null=True)
+    ai_confidence = models.IntegerField(default=0)
+    xp_awarded = models.BooleanField(default=False)
+    created_at = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    # Report columns copied verbatim when archiving
+    COPIED_FIELDS = (
+        'id', 'user_id', 'title', 'description', 'category', 'location', 'image', 'resolved_image',
+        'latitude', 'longitude', 'status', 'feedback', 'rating', 'ai_analysis', 'ai_confidence',
+        'xp_awarded', 'created_at',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['category', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.status}, archived)"
+
 #3. MISSIONS
 class Mission(models.Model):
     title = models.CharField(max_length=100)
@@ -87,6 +221,36 @@ class UserMission(models.Model):
 
     proof_image = models.ImageField(upload_to='mission_proofs/', max_length=500, null=True, blank=True)
     ai_analysis = models.TextField(blank=True, null=True)
+    ai_confidence = models.IntegerField(default=0)
+
+    # Moderation queue lease (see api/moderation.py)
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    claim_expires_at = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='usermission_sync_idx'),
+            models.Index(
+                fields=['ai_confidence', 'submitted_at', 'id'],
+                condition=models.Q(status='pending'),
+                name='usermission_mod_queue_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names:
+            instance._loaded_status = values[field_names.index('status')]
+        return instance
+
+    def save(self, *args, **kwargs):
+        # post_save writes the StatusEvent and the Profile counters; keep them
+        # in one transaction with the row so they cannot drift
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} - {self.mission.title}"
@@ -98,10 +262,204 @@ class Notice(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     is_pinned = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='notice_sync_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+#4b. STATUS HISTORY
+# Append-only log of report / mission-proof status transitions, written by
+# api/history.py. No FK to the subject row, so history outlives archival.
+class StatusEvent(models.Model):
+    KIND_CHOICES = [('report', 'Report'), ('proof', 'Mission proof')]
+    SOURCE_CHOICES = [('user', 'User'), ('ai', 'AI'), ('admin', 'Admin'), ('system', 'System')]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    # Owner of the report / proof
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    old_status = models.CharField(max_length=20, null=True, blank=True)
+    new_status = models.CharField(max_length=20)
+    source = models.CharField(max_length=8, choices=SOURCE_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    confidence = models.SmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'object_id', 'id'], name='statusevent_object_idx'),
+            models.Index(fields=['user', 'id'], name='statusevent_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.old_status} -> {self.new_status} ({self.source})"
+
+#4c. SYNC TOMBSTONES
+# One row per deleted (or archived) report, notice or mission progress row,
+# so /api/sync/ can tell offline clients what to drop. owner_id is a plain
+# integer: tombstones are written while a user's rows are being cascaded away.
+class Tombstone(models.Model):
+    KIND_CHOICES = [('report', 'Report'), ('notice', 'Notice'), ('mission', 'Mission progress')]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    # Set for per-user rows (mission progress); those only sync to their owner
+    owner_id = models.IntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='tombstone_sync_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted"
+
+#4d. IDEMPOTENCY KEYS
+# Stored results of POSTs sent with an Idempotency-Key header, so client
+# retries replay the first response instead of redoing the work
+# (see api/idempotency.py). Purged after expires_at.
+class IdempotencyRecord(models.Model):
+    STATE_CHOICES = [('in_progress', 'In progress'), ('completed', 'Completed')]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    # METHOD + path, so one key cannot be replayed against another endpoint
+    fingerprint = models.CharField(max_length=300)
+    state = models.CharField(max_length=12, choices=STATE_CHOICES, default='in_progress')
+    response_status = models.SmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.state})"
+
+#4e. THROTTLING
+# Who keeps hitting the rate limits (api/throttling.py), one row per scope and
+# client. hits is approximate: rejections are counted in the cache and
+# flushed here at most once per THROTTLE_LOG_SECONDS.
+class ThrottleHit(models.Model):
+    scope = models.CharField(max_length=32)
+    # "user:<id>" or "ip:<address>"
+    ident = models.CharField(max_length=100)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    hits = models.IntegerField(default=0)
+    first_seen = models.DateTimeField(default=timezone.now)
+    last_seen = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'ident'], name='throttlehit_scope_ident_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.ident} ({self.hits})"
+
+#4f. MAP GRID
+# Per-zoom report counts for server-side map clustering (api/mapgrid.py).
+# One row per non-empty grid cell at each zoom; kept up to date as reports
+# are created, moved, change status or are deleted, and rebuilt from the
+# Report table by manage.py rebuild_map_grid. lat_sum / lng_sum give the
+# cell's centroid.
+class MapGridCell(models.Model):
+    zoom = models.SmallIntegerField()
+    x = models.IntegerField()
+    y = models.IntegerField()
+    count = models.IntegerField(default=0)
+    lat_sum = models.FloatField(default=0)
+    lng_sum = models.FloatField(default=0)
+    pending = models.IntegerField(default=0)
+    verified = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index for bounding box lookups (zoom, then x range)
+            models.UniqueConstraint(fields=['zoom', 'x', 'y'], name='mapgridcell_zoom_x_y_unique'),
+        ]
+
+    def __str__(self):
+        return f"z{self.zoom} {self.x}/{self.y} ({self.count})"
+
+#4g. HOTSPOTS
+# Output of the latest manage.py detect_hotspots run (api/hotspots.py): the
+# densest and the abnormally rising grid cells for each time window, overall
+# (category "") and per category. Each run replaces the previous rows.
+class Hotspot(models.Model):
+    window_days = models.SmallIntegerField()
+    # "" = all categories
+    category = models.CharField(max_length=100, blank=True, default='')
+    # Map grid cell (api/mapgrid.py) at HOTSPOT_GRID_ZOOM, and its bounds
+    zoom = models.SmallIntegerField()
+    x = models.IntegerField()
+    y = models.IntegerField()
+    west = models.FloatField()
+    south = models.FloatField()
+    east = models.FloatField()
+    north = models.FloatField()
+    # Centroid of the window's reports
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    count = models.IntegerField()
+    # Mean count per window over the preceding baseline windows
+    baseline = models.FloatField()
+    score = models.FloatField()
+    rising = models.BooleanField(default=False)
+    # Report count per category in the window, largest first
+    categories = models.JSONField(default=dict)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['window_days', 'category', '-score'], name='hotspot_window_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.window_days}d {self.category or 'all'} z{self.zoom} {self.x}/{self.y} ({self.count})"
+
+#4h. REQUEST PROFILES
+# One staff request profiled on demand (X-Profile header or ?_profile=,
+# api/profiling.py). `folded` holds the call stacks in the collapsed-stack
+# format flamegraph.pl and speedscope read: one "root;...;leaf weight" line
+# per stack, weighted by samples or, when traced, by microseconds.
+class RequestProfile(models.Model):
+    MODES = [('sample', 'Sampling'), ('trace', 'Deterministic trace')]
+
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True, default='')
+    status_code = models.SmallIntegerField()
+    mode = models.CharField(max_length=10, choices=MODES)
+    duration_ms = models.FloatField()
+    sample_interval_ms = models.FloatField(null=True, blank=True)
+    # Samples taken, or traced microseconds
+    weight = models.BigIntegerField(default=0)
+    folded = models.TextField(blank=True, default='')
+    query_count = models.IntegerField(default=0)
+    query_ms = models.FloatField(default=0)
+    # [{"sql", "ms"}] and [{"service", "outcome", "ms"}] in execution order
+    queries = models.JSONField(default=list, blank=True)
+    external_calls = models.JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms, {self.mode})"
+
 #5. SIGNALS
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, created, **kwargs):
@@ -110,4 +468,42 @@ def save_user_profile(sender, instance, created, **kwargs):
     else:
         # Just ensure it exists
         Profile.objects.get_or_create(user=instance)
-        instance.profile.save()
\ No newline at end of file
+        instance.profile.save()
+
+@receiver(post_save, sender=Report)
+def push_report_status(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_status', instance.status)
+    if created or previous != instance.status:
+        realtime.report_status_changed(instance, previous)
+        history.record_transition('report', instance.id, instance.user_id, previous, instance.status,
+                                  confidence=instance.ai_confidence)
+    mapgrid.report_saved(instance, created)
+    instance._loaded_status = instance.status
+
+@receiver(post_save, sender=UserMission)
+def log_proof_status(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_status', instance.status)
+    if created or previous != instance.status:
+        history.record_transition('proof', instance.id, instance.user_id, previous, instance.status,
+                                  confidence=instance.ai_confidence)
+    instance._loaded_status = instance.status
+
+@receiver(post_delete, sender=Report)
+def count_report_deleted(sender, instance, **kwargs):
+    counters.report_deleted(instance)
+    sync.record_deletion('report', instance.id)
+    mapgrid.report_deleted(instance)
+
+@receiver(post_delete, sender=UserMission)
+def count_proof_deleted(sender, instance, **kwargs):
+    counters.proof_deleted(instance)
+    sync.record_deletion('mission', instance.id, owner_id=instance.user_id)
+
+@receiver(post_delete, sender=Notice)
+def tombstone_notice(sender, instance, **kwargs):
+    sync.record_deletion('notice', instance.id)
+
+@receiver(post_save, sender=Notice)
+def push_notice(sender, instance, created, **kwargs):
+    if created:
+        realtime.notice_created(instance)
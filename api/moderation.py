@@ -0,0 +1,277 @@
+import base64
+import heapq
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from . import history, mapgrid, realtime
+from .models import Profile, Report, UserMission
+from .utils import AI_QUEUED_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  BULK MODERATION
+# ==========================================
+# Admin actions moderate hundreds of reports at once. Everything happens in
+# one transaction with a fixed number of queries, however many reports or
+# users are involved; realtime events go out in one batch after commit.
+
+REPORT_XP = 10
+
+
+def award_xp(points_by_user):
+    """Add points to many profiles with one grouped UPDATE, then fix levels."""
+    if not points_by_user:
+        return
+    profiles = Profile.objects.filter(user_id__in=points_by_user)
+    profiles.update(points=Case(
+        *[When(user_id=user_id, then=F('points') + Value(points)) for user_id, points in points_by_user.items()],
+        default=F('points'),
+    ))
+    # Level depends on the new totals, so it needs a second statement
+    profiles.update(level=Profile.level_expression())
+
+
+def bulk_set_status(queryset, status, actor=None, source='admin'):
+    """Move every report in queryset to status. Returns (changed, xp_awarded)."""
+    with transaction.atomic():
+        rows = list(
+            queryset.exclude(status=status)
+            .select_for_update(of=('self',))
+            .values('id', 'user_id', 'title', 'status', 'xp_awarded', 'ai_confidence', 'latitude', 'longitude')
+        )
+        if not rows:
+            return 0, 0
+
+        ids = [row['id'] for row in rows]
+        # XP goes out once per report, the first time it is verified
+        award_ids = {row['id'] for row in rows if status == 'verified' and not row['xp_awarded']}
+
+        Report.objects.filter(id__in=ids).update(
+            status=status,
+            xp_awarded=Case(When(id__in=award_ids, then=Value(True)), default=F('xp_awarded')),
+            # A decided report has nothing left to claim
+            claimed_by=None,
+            claim_expires_at=None,
+            updated_at=timezone.now(),
+        )
+
+        points = Counter()
+        for row in rows:
+            if row['id'] in award_ids:
+                points[row['user_id']] += REPORT_XP
+        award_xp(points)
+
+        realtime.report_statuses_changed(rows, status)
+        mapgrid.report_statuses_changed(rows, status)
+        with history.batched():
+            for row in rows:
+                history.record_transition('report', row['id'], row['user_id'], row['status'], status,
+                                          confidence=row['ai_confidence'], source=source, actor=actor)
+
+    logger.info("bulk_moderation", extra={
+        "status": status,
+        "reports": len(rows),
+        "xp_reports": len(award_ids),
+        "users": len(points),
+        "actor": getattr(actor, 'pk', None),
+    })
+    return len(rows), len(award_ids)
+
+
+def bulk_set_proof_status(queryset, status, actor=None, source='admin'):
+    """Mission proofs: 'completed' awards each mission's XP. Returns the count."""
+    with transaction.atomic():
+        rows = list(
+            queryset.exclude(status=status)
+            .select_for_update(of=('self',))
+            .values('id', 'user_id', 'status', 'ai_confidence', 'mission__points_reward')
+        )
+        if not rows:
+            return 0
+        UserMission.objects.filter(id__in=[row['id'] for row in rows]).update(
+            status=status, claimed_by=None, claim_expires_at=None, updated_at=timezone.now(),
+        )
+        if status == 'completed':
+            points = Counter()
+            for row in rows:
+                points[row['user_id']] += row['mission__points_reward']
+            award_xp(points)
+        with history.batched():
+            for row in rows:
+                history.record_transition('proof', row['id'], row['user_id'], row['status'], status,
+                                          confidence=row['ai_confidence'], source=source, actor=actor)
+
+    logger.info("bulk_proof_moderation", extra={
+        "status": status, "proofs": len(rows), "actor": getattr(actor, 'pk', None),
+    })
+    return len(rows)
+
+
+# ==========================================
+#  MODERATION QUEUE
+# ==========================================
+# Pending reports and pending mission proofs in one list, ordered by
+# (ai_confidence, age): AI fallbacks (confidence 0) first, then the least
+# confident matches, oldest first. Each source is read with a keyset query
+# that walks its partial index (status='pending'); the two ordered streams
+# are merged here. Moderators lease items with a compare-and-set UPDATE so
+# two people never work the same item.
+
+QUEUE_KINDS = {
+    'report': {
+        'model': Report,
+        'ts': 'created_at',
+        'fields': ('id', 'title', 'user__username', 'ai_confidence', 'ai_analysis',
+                   'image', 'created_at', 'claimed_by__username', 'claim_expires_at'),
+        'approve': 'verified',
+    },
+    'proof': {
+        'model': UserMission,
+        'ts': 'submitted_at',
+        'fields': ('id', 'mission__title', 'user__username', 'ai_confidence', 'ai_analysis',
+                   'proof_image', 'submitted_at', 'claimed_by__username', 'claim_expires_at'),
+        'approve': 'completed',
+    },
+}
+
+
+def encode_cursor(item):
+    raw = json.dumps([item['ai_confidence'], item['ts'].isoformat(), item['kind'], item['id']])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        confidence, ts, kind, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(confidence), datetime.fromisoformat(ts), str(kind), int(pk)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def pending_queryset(kind):
+    qs = QUEUE_KINDS[kind]['model'].objects.filter(status='pending')
+    if kind == 'proof':
+        # Joined-but-not-submitted missions are pending too; they have no proof yet
+        qs = qs.exclude(proof_image__isnull=True).exclude(proof_image='')
+    else:
+        # Partner reports still waiting for their first AI check
+        qs = qs.exclude(ai_analysis=AI_QUEUED_MESSAGE)
+    return qs
+
+
+def available_to(user, now=None):
+    """Unclaimed, lease expired, or already leased by this user."""
+    now = now or timezone.now()
+    return Q(claim_expires_at__isnull=True) | Q(claim_expires_at__lte=now) | Q(claimed_by=user)
+
+
+def _after(kind, ts_field, cursor):
+    confidence, ts, cursor_kind, pk = cursor
+    same_ts = Q(ai_confidence=confidence, **{ts_field: ts})
+    if kind > cursor_kind:
+        tail = same_ts
+    elif kind == cursor_kind:
+        tail = same_ts & Q(id__gt=pk)
+    else:
+        tail = Q(pk__in=[])
+    return Q(ai_confidence__gt=confidence) | Q(ai_confidence=confidence, **{f'{ts_field}__gt': ts}) | tail
+
+
+def _queue_items(kind, user, limit, cursor=None, include_claimed=False):
+    spec = QUEUE_KINDS[kind]
+    ts_field = spec['ts']
+    qs = pending_queryset(kind)
+    if not include_claimed:
+        qs = qs.filter(available_to(user))
+    if cursor:
+        qs = qs.filter(_after(kind, ts_field, cursor))
+    for row in qs.order_by('ai_confidence', ts_field, 'id').values(*spec['fields'])[:limit]:
+        image = row.get('image') or row.get('proof_image')
+        yield {
+            'kind': kind,
+            'id': row['id'],
+            'title': row.get('title') or row.get('mission__title'),
+            'username': row['user__username'],
+            'ai_confidence': row['ai_confidence'],
+            'ai_fallback': row['ai_confidence'] == 0,
+            'ai_analysis': row['ai_analysis'],
+            'image': default_storage.url(image) if image else None,
+            'ts': row[ts_field],
+            'claimed_by': row['claimed_by__username'],
+            'claim_expires_at': row['claim_expires_at'],
+        }
+
+
+def _sort_key(item):
+    return (item['ai_confidence'], item['ts'], item['kind'], item['id'])
+
+
+def queue_page(user, limit=25, cursor=None, kinds=None, include_claimed=False):
+    """One page of the queue. Returns (items, next_cursor or None)."""
+    kinds = kinds or list(QUEUE_KINDS)
+    streams = [list(_queue_items(kind, user, limit + 1, cursor, include_claimed)) for kind in kinds]
+    items = list(heapq.merge(*streams, key=_sort_key))[:limit + 1]
+    next_cursor = encode_cursor(items[limit - 1]) if len(items) > limit else None
+    return items[:limit], next_cursor
+
+
+def lease_seconds():
+    return settings.MODERATION_LEASE_SECONDS
+
+
+def claim(kind, pk, user):
+    """Compare-and-set lease. Returns the expiry, or None if someone else holds it."""
+    now = timezone.now()
+    expires = now + timedelta(seconds=lease_seconds())
+    updated = pending_queryset(kind).filter(available_to(user, now), pk=pk).update(
+        claimed_by=user, claim_expires_at=expires,
+    )
+    return expires if updated else None
+
+
+def claim_next(user, count=1, kinds=None):
+    """Lease the next `count` available items in priority order."""
+    claimed = []
+    cursor = None
+    while len(claimed) < count:
+        items, cursor_next = queue_page(user, limit=count * 2, cursor=cursor, kinds=kinds)
+        for item in items:
+            # Skip our own existing leases and anything another moderator won first
+            if item['claimed_by'] == user.username:
+                continue
+            expires = claim(item['kind'], item['id'], user)
+            if expires:
+                item['claimed_by'], item['claim_expires_at'] = user.username, expires
+                claimed.append(item)
+                if len(claimed) == count:
+                    break
+        if not cursor_next:
+            break
+        cursor = decode_cursor(cursor_next)
+    return claimed
+
+
+def release(kind, pk, user):
+    return QUEUE_KINDS[kind]['model'].objects.filter(pk=pk, claimed_by=user).update(
+        claimed_by=None, claim_expires_at=None,
+    )
+
+
+def decide(kind, pk, user, approve):
+    """Apply a decision on an item this user holds an unexpired lease on."""
+    held = pending_queryset(kind).filter(pk=pk, claimed_by=user, claim_expires_at__gt=timezone.now())
+    status = QUEUE_KINDS[kind]['approve'] if approve else 'rejected'
+    if kind == 'report':
+        changed, _ = bulk_set_status(held, status, actor=user)
+    else:
+        changed = bulk_set_proof_status(held, status, actor=user)
+    return bool(changed)
@@ -0,0 +1,205 @@
+import codecs
+import csv
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import orjson
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from .models import Profile
+from .serializers import BulkUserSerializer
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  BULK USER IMPORT (community drives)
+# ==========================================
+# POST /api/users/import/ (staff) and `manage.py import_users` take a CSV
+# with a username column and optional email, phone_number and password
+# columns. It is read USER_IMPORT_BATCH_SIZE rows at a time, never whole.
+# Registering one user at a time costs a password hash (~0.3s of CPU with
+# PBKDF2) plus a post_save signal that does get_or_create and save on the
+# Profile. Here each batch:
+#
+#   * validates rows with BulkUserSerializer, which also normalizes phone
+#     numbers once, so they are stored ready for SMS;
+#   * skips usernames that already exist or repeat earlier in the file, with
+#     one query per batch;
+#   * hashes the passwords of the new rows across USER_IMPORT_WORKERS
+#     processes (hashing holds the GIL, so threads would not help). Rows
+#     without a password get an unusable one, so they need a reset to log in;
+#   * inserts users and profiles with one bulk_create each, in one
+#     transaction. bulk_create sends no post_save, so profiles are built here.
+#
+# A result line per row is streamed back as each batch commits (like the
+# partner ingest in api/ingest.py), then a summary with rows per second.
+
+CONTENT_TYPES = ('text/csv', 'application/csv')
+COLUMNS = ('username', 'email', 'phone_number', 'password')
+
+
+def open_csv(stream):
+    """csv.DictReader over a binary stream (file or request), read line by line.
+    Raises ValueError if there is no username column."""
+    reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig'))
+    fields = [name.strip() for name in reader.fieldnames or ()]
+    if 'username' not in fields:
+        raise ValueError(f"The first line must be a header with a username column (and optionally "
+                         f"{', '.join(COLUMNS[1:])}).")
+    reader.fieldnames = fields
+    return reader
+
+
+def workers():
+    return settings.USER_IMPORT_WORKERS or os.cpu_count() or 1
+
+
+@contextmanager
+def hashing_pool(count=None):
+    """Process pool for password hashing, or None when there is one worker."""
+    count = count or workers()
+    if count <= 1:
+        yield None
+        return
+    # spawn, not fork: the server (and the log writer) run threads, and a
+    # forked child could inherit a lock held by one of them
+    with ProcessPoolExecutor(count, mp_context=multiprocessing.get_context('spawn')) as pool:
+        yield pool
+
+
+def _hash(passwords, pool):
+    # None -> unusable password (cheap, no hashing)
+    passwords = [password or None for password in passwords]
+    # The pool's processes start on first use, so a file without passwords never spawns them
+    if pool is None or not any(passwords):
+        return [make_password(password) for password in passwords]
+    # Each hash is ~0.3s of CPU, so one per task costs nothing extra in IPC
+    return list(pool.map(make_password, passwords))
+
+
+def _split(rows):
+    """rows: [(line, validated data)] -> ({line: existing user id}, {line: first line of a
+    username repeated in the batch}, rows to insert)."""
+    names = [data['username'] for _, data in rows]
+    known = dict(User.objects.filter(username__in=names).values_list('username', 'id'))
+    existing, repeats, new, first_line = {}, {}, [], {}
+    for line, data in rows:
+        name = data['username']
+        if name in known:
+            existing[line] = known[name]
+        elif name in first_line:
+            repeats[line] = first_line[name]
+        else:
+            first_line[name] = line
+            new.append((line, data))
+    return existing, repeats, new
+
+
+def _insert(rows):
+    """rows: [(line, data with a hashed password)], usernames distinct. Returns {line: (status, user id)}."""
+    existing, _, new = _split(rows)
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(username=data['username'], email=data.get('email', ''), password=data['password'])
+            for _, data in new
+        ])
+        Profile.objects.bulk_create([
+            Profile(user=user, phone_number=data.get('phone_number'))
+            for user, (_, data) in zip(users, new)
+        ])
+    results = {line: ('duplicate', user_id) for line, user_id in existing.items()}
+    results.update({line: ('created', user.id) for user, (line, _) in zip(users, new)})
+    return results
+
+
+def _process(batch, validator, pool):
+    """batch: [(line, CSV row dict)] -> [result dict] in input order."""
+    valid, results = [], {}
+    for line, row in batch:
+        data = {key: value if key == 'password' else value.strip()
+                for key, value in row.items() if key in COLUMNS and value and value.strip()}
+        try:
+            valid.append((line, validator.run_validation(data)))
+        except serializers.ValidationError as e:
+            results[line] = {'status': 'invalid', 'errors': e.detail}
+
+    if valid:
+        existing, repeats, new = _split(valid)
+        # Only rows that will be inserted are hashed
+        for (_, data), hashed in zip(new, _hash([data.get('password') for _, data in new], pool)):
+            data['password'] = hashed
+        try:
+            inserted = _insert(new) if new else {}
+        except IntegrityError:
+            # Lost a race with someone registering the same username; the
+            # re-read inside _insert now sees it as a duplicate
+            inserted = _insert(new)
+        inserted.update({line: ('duplicate', user_id) for line, user_id in existing.items()})
+        inserted.update({line: ('duplicate', inserted[first][1]) for line, first in repeats.items()})
+        for line, (status, user_id) in inserted.items():
+            results[line] = {'status': status, 'id': user_id}
+
+    usernames = {line: (row.get('username') or '').strip() for line, row in batch}
+    return [{'line': line, 'username': usernames[line], **results[line]} for line, _ in batch]
+
+
+def batches(reader, pool=None, batch_size=None):
+    """Yields one list of result dicts per batch of CSV rows."""
+    batch_size = batch_size or settings.USER_IMPORT_BATCH_SIZE
+    validator = BulkUserSerializer()
+    batch = []
+    try:
+        for row in reader:
+            # The header is line 1; line_num is the last physical line of this record
+            batch.append((reader.line_num, row))
+            if len(batch) >= batch_size:
+                yield _process(batch, validator, pool)
+                batch = []
+    except (UnicodeDecodeError, csv.Error):
+        # Rows read before a bad line are still imported
+        if batch:
+            yield _process(batch, validator, pool)
+        raise
+    if batch:
+        yield _process(batch, validator, pool)
+
+
+def summary(totals, seconds):
+    rows = sum(totals.values())
+    return {
+        **{status: totals[status] for status in ('created', 'duplicate', 'invalid')},
+        'rows': rows,
+        'seconds': round(seconds, 2),
+        'rows_per_second': round(rows / seconds, 1) if seconds else None,
+    }
+
+
+def stream(reader):
+    """NDJSON results: one line per CSV row, then a summary line."""
+    started = time.perf_counter()
+    totals = Counter()
+    error = None
+    with hashing_pool() as pool:
+        try:
+            for batch in batches(reader, pool):
+                totals.update(result['status'] for result in batch)
+                # One chunk per batch, so the response flushes as each batch commits
+                yield b''.join(orjson.dumps(result) + b'\n' for result in batch)
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Batches before the bad line are already stored
+            error = f"Stopped at line {reader.line_num + 1}: {e}"
+
+    done = summary(totals, time.perf_counter() - started)
+    # "created" is a LogRecord attribute, so the counts need their own names
+    counts = {f"rows_{status}": done[status] for status in ('created', 'duplicate', 'invalid')}
+    logger.info("user_import", extra={**counts, "rows": done['rows'], "seconds": done['seconds'], "error": error})
+    yield orjson.dumps({'summary': done, **({'error': error} if error else {})}) + b'\n'
@@ -0,0 +1,217 @@
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  ON-DEMAND REQUEST PROFILING (staff)
+# ==========================================
+# A staff request with an `X-Profile: sample|trace` header (or
+# `?_profile=sample|trace`; `1` means sample) is run under a profiler and
+# stored as a RequestProfile, browsable in the admin:
+#
+#   sample  a background thread reads the view thread's stack every
+#           PROFILE_SAMPLE_INTERVAL_MS via sys._current_frames(). Low
+#           overhead, fine on slow production requests.
+#   trace   sys.setprofile on the view thread records every Python and C
+#           call with its self time. Exact, but makes the request several
+#           times slower.
+#
+# Both give stacks in the collapsed format (flamegraph.pl, speedscope). The
+# SQL and external calls (Gemini, Twilio, Cloudinary, image fetches) made
+# meanwhile are recorded through the same RequestStats the query inspector
+# uses. Requests without the flag pay one header/query lookup and nothing
+# else. The profile covers the view only; a streaming body runs after it.
+
+HEADER = 'HTTP_X_PROFILE'
+PARAM = '_profile'
+MODES = {'1': 'sample', 'sample': 'sample', 'trace': 'trace'}
+
+_PREFIXES = sorted({
+    os.path.join(str(settings.BASE_DIR), ''),
+    os.path.join(sysconfig.get_paths()['purelib'], ''),
+    os.path.join(sysconfig.get_paths()['stdlib'], ''),
+}, key=len, reverse=True)
+
+
+def requested_mode(request):
+    """'sample', 'trace' or None, from the header or query flag (not yet checked for staff)."""
+    value = request.META.get(HEADER) or request.GET.get(PARAM)
+    if not value or not settings.PROFILING_ENABLED:
+        return None
+    return MODES.get(value.strip().lower())
+
+
+def staff_user(request):
+    """The staff user making the request (admin session or JWT), else None.
+    Runs before DRF has authenticated the request, so the token is checked here."""
+    from rest_framework.exceptions import APIException
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            user, _ = JWTAuthentication().authenticate(request) or (None, None)
+        except APIException:
+            return None
+    return user if user is not None and user.is_staff else None
+
+
+def _short_path(filename):
+    for prefix in _PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+_labels = {}
+
+
+def _label(code):
+    label = _labels.get(code)
+    if label is None:
+        # ';' separates frames in the folded format
+        label = f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+        _labels[code] = label
+    return label
+
+
+def _c_label(function):
+    module = getattr(function, '__module__', None) or type(getattr(function, '__self__', None)).__name__
+    return f"{module}.{getattr(function, '__qualname__', repr(function))} (builtin)".replace(';', ',')
+
+
+def folded(stacks):
+    """Counter of frame tuples (root first) -> collapsed-stack text, heaviest first."""
+    return '\n'.join(f"{';'.join(stack)} {weight}" for stack, weight in stacks.most_common() if weight > 0)
+
+
+class Sampler(threading.Thread):
+    """Reads another thread's stack at a fixed interval until stopped."""
+
+    def __init__(self, target, interval, root_code):
+        super().__init__(name='request-profiler', daemon=True)
+        self.target, self.interval, self.root_code = target, interval, root_code
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None and frame.f_code is not self.root_code:
+                stack.append(_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Tracer:
+    """sys.setprofile callback: self time per call stack, in microseconds."""
+
+    def __init__(self):
+        self.stacks = Counter()
+        # [label, started, time spent in children]
+        self._frames = []
+
+    def __call__(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == 'call':
+            self._frames.append([_label(frame.f_code), now, 0.0])
+        elif event == 'c_call':
+            self._frames.append([_c_label(arg), now, 0.0])
+        elif event in ('return', 'c_return', 'c_exception') and self._frames:
+            stack = tuple(entry[0] for entry in self._frames)
+            _, started, children = self._frames.pop()
+            elapsed = now - started
+            self.stacks[stack] += round((elapsed - children) * 1_000_000)
+            if self._frames:
+                self._frames[-1][2] += elapsed
+
+
+def _render(response):
+    # Include serialization; Django skips render() on a rendered response
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    return response
+
+
+def run(mode, view, request, args, kwargs):
+    """Call the view under the profiler. Returns (response, stacks, RequestStats, seconds)."""
+    stats = metrics.RequestStats(record=True)
+    token = metrics.activate_stats(stats)
+    started = time.perf_counter()
+    try:
+        if mode == 'trace':
+            tracer = Tracer()
+            sys.setprofile(tracer)
+            try:
+                response = _render(view(request, *args, **kwargs))
+            finally:
+                sys.setprofile(None)
+            stacks = tracer.stacks
+        else:
+            sampler = Sampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000, run.__code__)
+            sampler.start()
+            try:
+                response = _render(view(request, *args, **kwargs))
+            finally:
+                sampler.stop()
+            stacks = sampler.stacks
+    finally:
+        metrics.deactivate_stats(token)
+    return response, stacks, stats, time.perf_counter() - started
+
+
+def save(request, user, response, mode, stacks, stats, seconds):
+    from .models import RequestProfile
+
+    match = getattr(request, 'resolver_match', None)
+    profile = RequestProfile.objects.create(
+        user=user,
+        method=request.method,
+        path=request.get_full_path()[:500],
+        view_name=match.view_name if match else '',
+        status_code=response.status_code,
+        mode=mode,
+        duration_ms=round(seconds * 1000, 2),
+        sample_interval_ms=settings.PROFILE_SAMPLE_INTERVAL_MS if mode == 'sample' else None,
+        weight=sum(stacks.values()),
+        folded=folded(stacks),
+        query_count=stats.queries,
+        query_ms=round(stats.query_time * 1000, 2),
+        queries=[{'sql': sql, 'ms': round(elapsed * 1000, 3)} for sql, elapsed in stats.executed],
+        external_calls=[{'service': service, 'outcome': outcome, 'ms': round(elapsed * 1000, 2)}
+                        for service, outcome, elapsed in stats.external],
+    )
+    # Keep the table small: only the latest PROFILE_KEEP profiles
+    stale = RequestProfile.objects.order_by('-id').values_list('id', flat=True)[settings.PROFILE_KEEP:settings.PROFILE_KEEP + 1]
+    if stale:
+        RequestProfile.objects.filter(id__lte=stale[0]).delete()
+    logger.info("request_profiled", extra={"profile_id": profile.id, "mode": mode, "path": profile.path,
+                                           "duration_ms": profile.duration_ms})
+    return profile
+
+
+def top_frames(folded_text, limit=25):
+    """[(frame, self weight, share)] summed over the folded stacks' leaf frames."""
+    totals, overall = Counter(), 0
+    for line in folded_text.splitlines():
+        stack, _, weight = line.rpartition(' ')
+        weight = int(weight)
+        totals[stack.rsplit(';', 1)[-1]] += weight
+        overall += weight
+    return [(frame, weight, weight / overall) for frame, weight in totals.most_common(limit)] if overall else []
@@ -0,0 +1,99 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from . import metrics
+
+# ==========================================
+#  QUERY RECORDING, BUDGETS & N+1 DETECTION
+# ==========================================
+
+_IN_LIST = re.compile(r"IN \((?:%s|\?)(?:, ?(?:%s|\?))*\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_shape(sql):
+    """Normalize SQL so queries differing only in parameters compare equal."""
+    shape = _STRING.sub("?", sql)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class QueryLog:
+    def __init__(self, stats):
+        self.stats = stats
+
+    @property
+    def count(self):
+        return self.stats.queries
+
+    @property
+    def time(self):
+        return self.stats.query_time
+
+    @property
+    def queries(self):
+        return [sql for sql, _ in self.stats.executed]
+
+    def repeated_shapes(self, threshold=None):
+        """Shapes issued at least ``threshold`` times: likely N+1 loops."""
+        if threshold is None:
+            threshold = getattr(settings, 'NPLUSONE_THRESHOLD', 3)
+        counts = Counter(query_shape(sql) for sql in self.queries)
+        return [(shape, n) for shape, n in counts.most_common() if n >= threshold]
+
+    def describe(self):
+        lines = [f"{self.count} queries ({self.time * 1000:.1f} ms)"]
+        lines.extend(f"  {i}. {sql}" for i, sql in enumerate(self.queries, 1))
+        for shape, n in self.repeated_shapes():
+            lines.append(f"  repeated x{n}: {shape}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def capture_queries():
+    stats = metrics.RequestStats(record=True)
+    token = metrics.activate_stats(stats)
+    try:
+        yield QueryLog(stats)
+    finally:
+        metrics.deactivate_stats(token)
+
+
+@contextmanager
+def assert_query_budget(budget, allow_repeats=False):
+    """Fail when the block runs more than ``budget`` queries or repeats a
+    query shape often enough to look like an N+1 loop."""
+    with capture_queries() as log:
+        yield log
+    if log.count > budget:
+        raise QueryBudgetExceeded(f"Query budget {budget} exceeded: {log.describe()}")
+    if not allow_repeats and log.repeated_shapes():
+        raise QueryBudgetExceeded(f"Possible N+1 detected: {log.describe()}")
+
+
+def budget_for(view_name, method):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(f"{method} {view_name}", budgets.get(view_name))
+
+
+class QueryBudgetTestMixin:
+    """TestCase helpers; endpoint budgets come from settings.QUERY_BUDGETS."""
+
+    def assertQueryBudget(self, budget, allow_repeats=False):
+        return assert_query_budget(budget, allow_repeats=allow_repeats)
+
+    def assertEndpointWithinBudget(self, view_name, method, request):
+        budget = budget_for(view_name, method)
+        self.assertIsNotNone(budget, f"No query budget declared for {method} {view_name}")
+        with assert_query_budget(budget):
+            return request()
@@ -0,0 +1,271 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connection, transaction
+
+# ==========================================
+#  REALTIME PUSH (in-process pub/sub)
+# ==========================================
+# Channels:
+#   "user:<id>"  -> report status updates for one user
+#   "notices"    -> broadcast of new community notices
+#
+# Every message gets an integer id, increasing in delivery order, so SSE
+# clients can reconnect with Last-Event-ID and replay whatever they missed
+# from the in-memory history. The local backend takes it from the broker
+# (microsecond timestamp, strictly increasing in the process); the postgres
+# backend from one shared sequence, so an id means the same event on every
+# worker and a client can resume on any of them.
+
+logger = logging.getLogger(__name__)
+
+NOTICES_CHANNEL = "notices"
+PG_CHANNEL = "pulse_events"
+PG_SEQUENCE = "pulse_event_id"  # created by migration 0034
+# pg_advisory_xact_lock key that serialises publishers (any fixed bigint)
+PG_PUBLISH_LOCK = 0x70756C7365
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class Subscription:
+    def __init__(self, channels, loop, maxsize):
+        self.channels = channels
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _put(self, message):
+        # Runs on the subscriber's event loop.
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Slow consumer: stop feeding it. The stream closes once the queue
+            # drains and the client catches up through Last-Event-ID replay.
+            self.overflowed = True
+
+
+class Broker:
+    def __init__(self, history_size=1000, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._history = deque(maxlen=history_size)
+        self._evicted_id = 0
+        self._last_id = 0
+
+    def next_id(self):
+        with self._lock:
+            self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+            return self._last_id
+
+    def deliver(self, message):
+        with self._lock:
+            if len(self._history) == self._history.maxlen:
+                self._evicted_id = self._history[0]["id"]
+            self._history.append(message)
+            subscribers = list(self._subscribers.get(message["channel"], ()))
+
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, message)
+            except RuntimeError:
+                # Loop already closed; the stream's finally block cleans up.
+                pass
+
+    def subscribe(self, channels, loop, last_event_id=None):
+        """Register a subscriber and return (subscription, backlog, complete).
+
+        ``complete`` is False when the history no longer reaches back to
+        ``last_event_id`` and the client must refetch instead of replaying.
+        """
+        sub = Subscription(channels, loop, self.queue_size)
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(sub)
+
+            backlog = []
+            complete = True
+            if last_event_id is not None:
+                complete = last_event_id >= self._evicted_id
+                backlog = [
+                    m for m in self._history
+                    if m["id"] > last_event_id and m["channel"] in channels
+                ]
+        return sub, backlog, complete
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for channel in sub.channels:
+                subs = self._subscribers.get(channel)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscribers[channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({sub for subs in self._subscribers.values() for sub in subs})
+
+
+# ==========================================
+#  BACKENDS
+# ==========================================
+
+class LocalBackend:
+    """Single process: publish straight into the local broker."""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def publish(self, message):
+        message["id"] = self.broker.next_id()
+        self.broker.deliver(message)
+
+    def start(self):
+        pass
+
+
+class PostgresBackend:
+    """Fan out across workers with LISTEN/NOTIFY.
+
+    Publishing only sends NOTIFY; every process (including this one) receives
+    the message back through its listener thread and delivers it locally.
+    Notifications arrive in commit order, so the id is taken and the NOTIFY
+    sent under one transaction-level lock: ids then reach every listener in
+    increasing order and replay after Last-Event-ID cannot skip an event.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def publish(self, message):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PG_PUBLISH_LOCK])
+            cursor.execute("SELECT nextval(%s)", [PG_SEQUENCE])
+            message["id"] = cursor.fetchone()[0]
+            cursor.execute("SELECT pg_notify(%s, %s)", [PG_CHANNEL, json.dumps(message)])
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._listen_forever, name="pulse-realtime-listener", daemon=True).start()
+
+    def _connect(self):
+        # A dedicated connection outside Django's pool: LISTEN holds it forever
+        import psycopg
+
+        db = settings.DATABASES["default"]
+        options = {
+            key: value for key, value in db.get("OPTIONS", {}).items()
+            if key not in ("pool", "server_side_binding", "isolation_level", "assume_role")
+        }
+        return psycopg.connect(
+            dbname=db["NAME"], user=db.get("USER") or None, password=db.get("PASSWORD") or None,
+            host=db.get("HOST") or None, port=db.get("PORT") or None, autocommit=True, **options
+        )
+
+    def _listen_forever(self):
+        while True:
+            conn = None
+            try:
+                conn = self._connect()
+                conn.execute(f"LISTEN {PG_CHANNEL}")
+                while True:
+                    # Returns after the timeout so a dead connection surfaces
+                    for notify in conn.notifies(timeout=30):
+                        self.broker.deliver(json.loads(notify.payload))
+            except Exception as e:
+                logger.error("realtime_listener_error", extra={"error": str(e)})
+                time.sleep(2)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+broker = Broker(
+    history_size=getattr(settings, "REALTIME_HISTORY_SIZE", 1000),
+    queue_size=getattr(settings, "REALTIME_QUEUE_SIZE", 100),
+)
+
+if getattr(settings, "REALTIME_BACKEND", "local") == "postgres":
+    backend = PostgresBackend(broker)
+else:
+    backend = LocalBackend(broker)
+
+
+def publish(channel, event, data):
+    # The backend assigns the id
+    message = {"channel": channel, "event": event, "data": data}
+    try:
+        backend.publish(message)
+    except Exception as e:
+        logger.error("realtime_publish_error", extra={"error": str(e), "channel": channel})
+
+
+def publish_on_commit(channel, event, data):
+    transaction.on_commit(lambda: publish(channel, event, data))
+
+
+# ==========================================
+#  EVENT HELPERS (called from model signals)
+# ==========================================
+
+def report_status_changed(report, previous_status):
+    publish_on_commit(user_channel(report.user_id), "report.status", {
+        "id": report.id,
+        "title": report.title,
+        "status": report.status,
+        "previous_status": previous_status,
+        "ai_confidence": report.ai_confidence,
+    })
+
+
+def report_statuses_changed(rows, status):
+    """Bulk moderation: one on_commit hook for many reports (dicts with id,
+    user_id, title, status (previous) and ai_confidence)."""
+    messages = [
+        (user_channel(row["user_id"]), "report.status", {
+            "id": row["id"],
+            "title": row["title"],
+            "status": status,
+            "previous_status": row["status"],
+            "ai_confidence": row["ai_confidence"],
+        })
+        for row in rows
+    ]
+
+    def send():
+        for channel, event, data in messages:
+            publish(channel, event, data)
+
+    transaction.on_commit(send)
+
+
+def notice_created(notice):
+    publish_on_commit(NOTICES_CHANNEL, "notice.created", {
+        "id": notice.id,
+        "title": notice.title,
+        "is_pinned": notice.is_pinned,
+        "created_at": notice.created_at.isoformat(),
+    })
+
+
+def format_sse(message):
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
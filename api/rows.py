@@ -0,0 +1,135 @@
+from operator import itemgetter
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+# ==========================================
+#  FAST READ-ONLY SERIALIZERS
+# ==========================================
+# The big public lists (report feed, notices, leaderboard) are read-only, so
+# they skip ModelSerializer: rows come from one values_list() query (joins
+# included) and each RowSerializer turns the tuples into dicts with a field
+# plan built once at import. Output matches the matching DRF serializer
+# field for field; report rows also embed a user_summary from the join.
+#
+# Converters take (value, context); the context carries what DRF would look
+# up per field (current time zone, request), resolved once per response.
+
+
+def datetime_field(value, context):
+    # Same as DRF's DateTimeField: current time zone, ISO 8601, "Z" for UTC
+    if value is None:
+        return None
+    value = value.astimezone(context['tz']).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def file_field(name, context):
+    if not name:
+        return None
+    url = default_storage.url(name)
+    # DRF makes relative media URLs absolute (local storage); Cloudinary's already are
+    if context['request'] is not None and url.startswith('/'):
+        return context['request'].build_absolute_uri(url)
+    return url
+
+
+class RowSerializer:
+    """fields: output name -> values() lookup, (lookup, converter), or a
+    nested dict of the same for embedded objects."""
+    fields = {}
+
+    def __init__(self):
+        self.lookups = []
+        self.plan = self._compile(self.fields)
+
+    def _index(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    def _compile(self, fields):
+        plain, converted, nested = [], [], []
+        for name, spec in fields.items():
+            if isinstance(spec, dict):
+                nested.append((name, self._compile(spec)))
+            elif isinstance(spec, tuple):
+                converted.append((name, self._index(spec[0]), spec[1]))
+            else:
+                plain.append((name, self._index(spec)))
+        names = tuple(name for name, _ in plain)
+        if len(plain) == 1:
+            index = plain[0][1]
+            get_plain = lambda row: (row[index],)
+        else:
+            get_plain = itemgetter(*(index for _, index in plain)) if plain else (lambda row: ())
+
+        def build(row, context):
+            item = dict(zip(names, get_plain(row)))
+            for name, index, convert in converted:
+                item[name] = convert(row[index], context)
+            for name, build_nested in nested:
+                item[name] = build_nested(row, context)
+            return item
+
+        return build
+
+    def to_representation(self, rows, request=None):
+        context = {'tz': timezone.get_current_timezone(), 'request': request}
+        plan = self.plan
+        return [plan(row, context) for row in rows]
+
+    def serialize(self, queryset, request=None):
+        return self.to_representation(queryset.values_list(*self.lookups), request)
+
+
+class ReportRows(RowSerializer):
+    fields = {
+        'id': 'id',
+        'user': 'user_id',
+        'title': 'title',
+        'description': 'description',
+        'category': 'category',
+        'image': ('image', file_field),
+        'location': 'location',
+        'latitude': 'latitude',
+        'longitude': 'longitude',
+        'status': 'status',
+        'created_at': ('created_at', datetime_field),
+        'ai_analysis': 'ai_analysis',
+        'ai_confidence': 'ai_confidence',
+        'resolved_image': ('resolved_image', file_field),
+        'feedback': 'feedback',
+        'updated_at': ('updated_at', datetime_field),
+        'user_summary': {
+            'id': 'user_id',
+            'username': 'user__username',
+            'level': 'user__profile__level',
+        },
+    }
+
+
+class NoticeRows(RowSerializer):
+    fields = {
+        'id': 'id',
+        'title': 'title',
+        'content': 'content',
+        'author_name': 'author__username',
+        'is_pinned': 'is_pinned',
+        'created_at': ('created_at', datetime_field),
+        'updated_at': ('updated_at', datetime_field),
+    }
+
+
+class LeaderboardRows(RowSerializer):
+    fields = {
+        'username': 'user__username',
+        'points': 'points',
+        'level': 'level',
+        'profile_picture': ('profile_picture', file_field),
+    }
+
+
+report_rows = ReportRows()
+notice_rows = NoticeRows()
+leaderboard_rows = LeaderboardRows()
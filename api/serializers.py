@@ -1,6 +1,8 @@
 from rest_framework import serializers
-from django.contrib.auth.models import User
-from .models import Report, Profile, Mission, UserMission, Notice
+from django.contrib.auth.models import User, UserManager
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from . import sms
+from .models import Report, ReportArchive, Profile, Mission, UserMission, Notice, StatusEvent
 
 #1. NOTICE SERIALIZER
 class NoticeSerializer(serializers.ModelSerializer):
@@ -8,7 +10,7 @@ class NoticeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Notice
-        fields = ['id', 'title', 'content', 'author_name', 'is_pinned', 'created_at']
+        fields = ['id', 'title', 'content', 'author_name', 'is_pinned', 'created_at', 'updated_at']
 
 #2. USER REGISTRATION SERIALIZER
 class RegisterSerializer(serializers.ModelSerializer):
@@ -52,6 +54,37 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         model = Profile
         fields = ['id', 'user_id', 'username', 'email', 'bio', 'phone_number', 'profile_picture']
 
+#4b. BULK USER IMPORT ROW (one CSV row of POST /api/users/import/)
+class BulkUserSerializer(serializers.Serializer):
+    # Username uniqueness is checked per batch in api/onboarding.py, not per row
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(required=False)
+    phone_number = serializers.CharField(required=False)
+    password = serializers.CharField(required=False, trim_whitespace=False)
+
+    def validate_username(self, value):
+        return User.normalize_username(value)
+
+    def validate_email(self, value):
+        return UserManager.normalize_email(value)
+
+    def validate_phone_number(self, value):
+        # Stored normalized (+91 added), so SMS sends need no further cleanup.
+        # Partner lists mix "098765 43210", "91-9876543210" and "+91 98765 43210".
+        phone = ''.join(c for c in value if c not in ' -().')
+        if phone.startswith('00'):
+            phone = '+' + phone[2:]
+        elif len(phone) == 11 and phone.startswith('0'):
+            phone = phone[1:]
+        elif len(phone) == 12 and phone.startswith('91'):
+            phone = '+' + phone
+        if not phone.lstrip('+').isdigit() or not 10 <= len(phone.lstrip('+')) <= 14:
+            raise serializers.ValidationError("Enter a phone number of 10-14 digits.")
+        phone = sms.normalize_phone(phone)
+        if len(phone) > Profile._meta.get_field('phone_number').max_length:
+            raise serializers.ValidationError("Phone number is too long.")
+        return phone
+
 #5. REPORT SERIALIZER
 class ReportSerializer(serializers.ModelSerializer):
     
@@ -64,10 +97,47 @@ class ReportSerializer(serializers.ModelSerializer):
             'id', 'user', 'title', 'description', 'category', 
             'image', 'location', 'latitude', 'longitude', 
             'status', 'created_at', 'ai_analysis', 'ai_confidence',
-            'resolved_image', 'feedback' 
+            'resolved_image', 'feedback', 'updated_at'
         ]
         # These are read-only for the user, but the View can update them
-        read_only_fields = ["user", "status", "created_at", "ai_analysis", "ai_confidence"]
+        read_only_fields = ["user", "status", "created_at", "updated_at", "ai_analysis", "ai_confidence"]
+
+#5b. ARCHIVED REPORT SERIALIZER (read-only)
+class ArchivedReportSerializer(serializers.ModelSerializer):
+    username = serializers.ReadOnlyField(source='user.username')
+    archived = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportArchive
+        fields = [
+            'id', 'user', 'username', 'title', 'description', 'category',
+            'image', 'location', 'latitude', 'longitude',
+            'status', 'created_at', 'ai_analysis', 'ai_confidence',
+            'resolved_image', 'feedback', 'archived', 'archived_at'
+        ]
+        read_only_fields = fields
+
+    def get_archived(self, obj):
+        return True
+
+#5c. STATUS HISTORY SERIALIZER
+class StatusEventSerializer(serializers.ModelSerializer):
+    actor_name = serializers.ReadOnlyField(source='actor.username', default=None)
+
+    class Meta:
+        model = StatusEvent
+        fields = ['id', 'kind', 'object_id', 'old_status', 'new_status', 'source', 'actor_name', 'confidence', 'created_at']
+
+#5d. BULK INGEST ROW (one NDJSON line of POST /api/reports/bulk/)
+class BulkReportSerializer(serializers.Serializer):
+    external_id = serializers.CharField(max_length=100, required=False, allow_null=True)
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField()
+    category = serializers.CharField(max_length=100, required=False, default="Infrastructure")
+    location = serializers.CharField(max_length=255)
+    latitude = serializers.FloatField(required=False, allow_null=True, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(required=False, allow_null=True, min_value=-180, max_value=180)
+    image_url = serializers.URLField(max_length=500, required=False, allow_null=True)
 
 # 6. GAMIFICATION SERIALIZERS
 class MissionSerializer(serializers.ModelSerializer):
@@ -79,8 +149,8 @@ class UserMissionSerializer(serializers.ModelSerializer):
     mission_title = serializers.ReadOnlyField(source='mission.title')
     class Meta:
         model = UserMission
-        fields = ['id', 'mission', 'mission_title', 'status', 'submitted_at']
-        read_only_fields = ['status', 'submitted_at']
+        fields = ['id', 'mission', 'mission_title', 'status', 'submitted_at', 'updated_at']
+        read_only_fields = ['status', 'submitted_at', 'updated_at']
 
 class LeaderboardSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username')
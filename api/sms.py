@@ -0,0 +1,58 @@
+import threading
+
+from decouple import config
+
+from . import metrics
+
+# ==========================================
+#  TWILIO ADAPTER (lazy SDK import)
+# ==========================================
+
+_client = None
+_lock = threading.Lock()
+
+
+def is_configured():
+    return bool(config('TWILIO_ACCOUNT_SID', default=None) and config('TWILIO_AUTH_TOKEN', default=None))
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                from twilio.rest import Client
+
+                client = Client(config('TWILIO_ACCOUNT_SID'), config('TWILIO_AUTH_TOKEN'))
+                # TWILIO_BASE_URL points the SDK at a fake server for benchmarks
+                base_url = config('TWILIO_BASE_URL', default=None)
+                if base_url:
+                    client.api.base_url = base_url
+                _client = client
+    return _client
+
+
+def normalize_phone(raw_phone):
+    """Indian numbers are stored without a country code; add +91 when missing."""
+    if not raw_phone:
+        return None
+    raw_phone = str(raw_phone).strip()
+    if not raw_phone:
+        return None
+    return raw_phone if raw_phone.startswith('+') else f"+91{raw_phone}"
+
+
+def send(to, body):
+    with metrics.external_call('twilio'):
+        return get_client().messages.create(
+            body=body,
+            from_=config('TWILIO_PHONE_NUMBER', default=None),
+            to=to
+        )
+
+
+def warm():
+    if is_configured():
+        get_client()
+    else:
+        from twilio.rest import Client  # noqa: F401
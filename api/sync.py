@@ -0,0 +1,140 @@
+import base64
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+# ==========================================
+#  DELTA SYNC
+# ==========================================
+# /api/sync/ hands offline-first clients only what changed since their last
+# sync. Reports, notices and mission progress carry an indexed updated_at;
+# deletions (and archival, which drops reports from the feed) leave a
+# Tombstone. The sync token holds one (timestamp, id) keyset cursor per
+# stream, base64 JSON like the moderation queue cursor.
+#
+# updated_at is stamped before commit, so a slow transaction can commit rows
+# "in the past". Cursors are therefore never moved past now - SYNC_LAG_SECONDS:
+# rows from the last few seconds are sent again on the next sync, and clients
+# apply changes as upserts by id.
+
+STREAMS = ('reports', 'notices', 'missions', 'deleted')
+TOMBSTONE_KINDS = {'report': 'reports', 'notice': 'notices', 'mission': 'missions'}
+
+_batch = ContextVar('sync_tombstone_batch', default=None)
+
+
+class TokenExpired(Exception):
+    """The token is older than the tombstone retention; the client must resync."""
+
+
+# ==========================================
+#  TOMBSTONES
+# ==========================================
+
+@contextmanager
+def batched():
+    """Buffer tombstones written in this block into one bulk INSERT (archival)."""
+    if _batch.get() is not None:
+        yield
+        return
+    rows = []
+    token = _batch.set(rows)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    if rows:
+        from .models import Tombstone
+        Tombstone.objects.bulk_create(rows)
+
+
+def record_deletion(kind, object_id, owner_id=None):
+    from .models import Tombstone
+
+    tombstone = Tombstone(kind=kind, object_id=object_id, owner_id=owner_id, deleted_at=timezone.now())
+    batch = _batch.get()
+    if batch is None:
+        tombstone.save(force_insert=True)
+    else:
+        batch.append(tombstone)
+
+
+# ==========================================
+#  TOKENS
+# ==========================================
+
+def encode_token(cursors):
+    raw = json.dumps({name: [ts.isoformat(), pk] for name, (ts, pk) in cursors.items()})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_token(token):
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return {name: (datetime.fromisoformat(raw[name][0]), int(raw[name][1])) for name in STREAMS}
+    except (ValueError, TypeError, KeyError, IndexError):
+        raise ValueError("Invalid sync token")
+
+
+# ==========================================
+#  CHANGES
+# ==========================================
+
+def _querysets(user):
+    from .models import Notice, Report, Tombstone, UserMission
+
+    return {
+        'reports': (Report.objects.all(), 'updated_at'),
+        'notices': (Notice.objects.select_related('author'), 'updated_at'),
+        'missions': (UserMission.objects.filter(user=user).select_related('mission'), 'updated_at'),
+        # Shared tombstones, plus the user's own mission progress ones
+        'deleted': (
+            Tombstone.objects.filter(Q(owner_id__isnull=True) | Q(owner_id=user.id)),
+            'deleted_at',
+        ),
+    }
+
+
+def _page(queryset, ts_field, cursor, limit):
+    ts, pk = cursor
+    if ts is not None:
+        queryset = queryset.filter(Q(**{f'{ts_field}__gt': ts}) | Q(**{ts_field: ts, 'id__gt': pk}))
+    rows = list(queryset.order_by(ts_field, 'id')[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def changes(user, token=None, limit=200):
+    """Everything after the token. Returns (changes, next_token, has_more);
+    changes maps each stream to rows (tombstones for 'deleted')."""
+    now = timezone.now()
+    if token:
+        cursors = decode_token(token)
+        if cursors['deleted'][0] < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+            raise TokenExpired()
+    else:
+        # First sync: every live row; deletions only from here on
+        cursors = {name: (None, 0) for name in STREAMS}
+
+    horizon = (now - timedelta(seconds=settings.SYNC_LAG_SECONDS), 0)
+    if cursors['deleted'][0] is None:
+        cursors['deleted'] = horizon
+    results, next_cursors, has_more = {}, {}, False
+    for name, (queryset, ts_field) in _querysets(user).items():
+        cursor = cursors[name]
+        rows, more = _page(queryset, ts_field, cursor, limit)
+        results[name] = rows
+        advanced = (getattr(rows[-1], ts_field), rows[-1].id) if rows else cursor
+        if advanced[0] is not None and advanced > horizon:
+            advanced = horizon
+        if cursor[0] is not None and advanced < cursor:
+            advanced = cursor
+        next_cursors[name] = advanced if advanced[0] is not None else horizon
+        # A page made entirely of very recent rows cannot move the cursor;
+        # stop paging there instead of handing out the same page forever.
+        has_more = has_more or (more and next_cursors[name] != cursor)
+    return results, encode_token(next_cursors), has_more
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import Report
+
+# Shared fixtures for the api test modules. Rows are created through the
+# models (not bulk_create) so signals, counters and the map grid run as they
+# do in production.
+
+CATEGORIES = ("Pothole", "Garbage", "Streetlight", "Water Leak")
+STATUSES = ("pending", "verified", "rejected", "resolved")
+
+
+def make_user(username, **fields):
+    # No password: tests authenticate with tokens, and hashing is slow
+    return User.objects.create_user(username=username, **fields)
+
+
+def make_report(user, **fields):
+    fields.setdefault("title", "Broken streetlight")
+    fields.setdefault("description", "Out since Monday")
+    fields.setdefault("category", "Streetlight")
+    fields.setdefault("location", "Main St")
+    return Report.objects.create(user=user, **fields)
+
+
+def seed_reports(users, count):
+    """count reports spread over users, statuses, categories and a few map cells."""
+    return [
+        make_report(
+            users[i % len(users)],
+            title=f"Report {i}",
+            status=STATUSES[i % len(STATUSES)],
+            category=CATEGORIES[i % len(CATEGORIES)],
+            latitude=12.97 + (i % 5) * 0.01,
+            longitude=77.59 + (i % 7) * 0.01,
+        )
+        for i in range(count)
+    ]
+
+
+def backdate(queryset, days=0, seconds=0, field="created_at"):
+    """auto_now/auto_now_add fields can only be moved with a queryset update."""
+    return queryset.update(**{field: timezone.now() - timedelta(days=days, seconds=seconds)})
+
+
+def jwt_client(user=None):
+    """APIClient sending a Bearer token, the way the apps authenticate."""
+    client = APIClient(HTTP_HOST="localhost")
+    if user is not None:
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+class CacheClearingTestCase(TestCase):
+    """Throttle buckets, facet counts and the AI quota live in the cache."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
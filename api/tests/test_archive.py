@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from api import archive, counters, mapgrid
+from api.models import Profile, Report, ReportArchive, Tombstone
+
+from .common import CacheClearingTestCase, backdate, jwt_client, make_report, make_user
+
+
+class ArchiveBatchTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("citizen")
+        self.old = [
+            make_report(self.user, title=f"Old {i}", status="resolved" if i % 2 else "rejected",
+                        latitude=12.9 + i * 0.01, longitude=77.5)
+            for i in range(7)
+        ]
+        self.old_pending = make_report(self.user, title="Old but open")
+        backdate(Report.objects.all(), days=400)
+        self.recent = make_report(self.user, title="Recent", status="resolved")
+        self.cutoff = timezone.now() - timedelta(days=180)
+
+    def archive_all(self, batch_size):
+        moved, last_id = [], 0
+        while True:
+            count, last_id = archive.archive_batch(self.cutoff, last_id, batch_size)
+            if not count:
+                return moved
+            moved.append(count)
+
+    def test_moves_terminal_reports_in_batches(self):
+        self.assertEqual(self.archive_all(batch_size=3), [3, 3, 1])
+        self.assertEqual(sorted(ReportArchive.objects.values_list("id", flat=True)), [r.pk for r in self.old])
+        self.assertEqual(set(Report.objects.values_list("id", flat=True)), {self.old_pending.pk, self.recent.pk})
+
+    def test_copies_keep_ids_and_fields(self):
+        self.archive_all(batch_size=500)
+        original = self.old[0]
+        copy = ReportArchive.objects.get(pk=original.pk)
+        self.assertEqual((copy.title, copy.status, copy.user_id), (original.title, original.status, self.user.pk))
+        self.assertLess(copy.created_at, self.cutoff)
+
+    def test_archival_leaves_counters_and_updates_map_and_sync(self):
+        self.archive_all(batch_size=3)
+        # Archived reports still count on the dashboard, and a recount agrees
+        profiles = Profile.objects.filter(user=self.user)
+        before = profiles.values(*Profile.COUNTER_FIELDS).get()
+        self.assertEqual((before["reports_total"], before["reports_resolved"]), (9, 4))
+        counters.recompute(profiles)
+        self.assertEqual(profiles.values(*Profile.COUNTER_FIELDS).get(), before)
+        # ...but leave the feed, so synced clients and the map drop them
+        self.assertEqual(Tombstone.objects.filter(kind="report").count(), 7)
+        self.assertEqual(mapgrid.drifted_cells(), 0)
+
+    def test_rerun_is_a_no_op(self):
+        self.archive_all(batch_size=3)
+        self.assertEqual(self.archive_all(batch_size=3), [])
+        self.assertEqual(ReportArchive.objects.count(), 7)
+
+    def test_leftover_copy_does_not_block_the_batch(self):
+        # e.g. from a run interrupted between the copy and the delete
+        ReportArchive.objects.create(**Report.objects.values(*ReportArchive.COPIED_FIELDS).get(pk=self.old[0].pk))
+        self.assertEqual(self.archive_all(batch_size=500), [7])
+        self.assertEqual(ReportArchive.objects.count(), 7)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("archive_reports", "--batch-size", "2", "--sleep", "0", stdout=out)
+        self.assertIn("Archived 7 report(s) in 4 batch(es)", out.getvalue())
+        self.assertEqual(ReportArchive.objects.count(), 7)
+
+    def test_command_stops_at_max_batches(self):
+        call_command("archive_reports", "--batch-size", "2", "--sleep", "0", "--max-batches", "2", stdout=StringIO())
+        self.assertEqual(ReportArchive.objects.count(), 4)
+        call_command("archive_reports", "--dry-run", stdout=StringIO())
+        self.assertEqual(archive.archivable(self.cutoff).count(), 3)
+
+    def test_archived_report_is_readable(self):
+        self.archive_all(batch_size=500)
+        response = jwt_client(self.user).get(reverse("report-detail", args=[self.old[2].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["archived"])
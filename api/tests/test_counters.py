@@ -0,0 +1,37 @@
+from django.urls import reverse
+
+from api import counters
+from api.models import Profile
+
+from .common import CacheClearingTestCase, jwt_client, make_user
+
+
+class RankTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.users = {}
+        for name, points in (("asha", 300), ("ravi", 120), ("meera", 120), ("dev", 0)):
+            self.users[name] = make_user(name)
+            Profile.objects.filter(user=self.users[name]).update(points=points)
+        # Staff are left off the leaderboard
+        officer = make_user("officer", is_staff=True)
+        Profile.objects.filter(user=officer).update(points=1000)
+
+    def test_rank_counts_profiles_with_more_points(self):
+        self.assertEqual([counters.rank_for(p) for p in (1000, 300, 120, 50, 0)], [1, 1, 2, 4, 4])
+        self.assertEqual(counters.rank_for(121), 2)
+
+    def test_matches_counting_directly(self):
+        for points in (500, 300, 200, 120, 10, 0):
+            above = Profile.objects.filter(user__is_staff=False, points__gt=points).count()
+            self.assertEqual(counters.rank_for(points), above + 1)
+
+    def test_table_is_cached(self):
+        counters.rank_for(0)
+        Profile.objects.filter(user=self.users["dev"]).update(points=999)
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.rank_for(120), 2)
+
+    def test_dashboard(self):
+        response = jwt_client(self.users["meera"]).get(reverse("user-dashboard"))
+        self.assertEqual((response.json()["points"], response.json()["rank"]), (120, 2))
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from api.idempotency import REPLAYED_HEADER
+from api.models import IdempotencyRecord, Mission, Profile, Report
+
+from .common import CacheClearingTestCase, jwt_client, make_user
+
+
+class IdempotencyTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("citizen")
+        self.client = jwt_client(self.user)
+        self.url = reverse("report-list-create")
+        self.data = {"title": "Pothole", "description": "Deep one", "category": "Pothole", "location": "Ring Rd"}
+
+    def post(self, key, **data):
+        return self.client.post(self.url, {**self.data, **data}, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post("key-1")
+        self.assertEqual(first.status_code, 201)
+        self.assertFalse(first.has_header(REPLAYED_HEADER))
+
+        retry = self.post("key-1")
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry[REPLAYED_HEADER], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Report.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Profile.objects.get(user=self.user).reports_total, 1)
+
+    def test_new_key_runs_again(self):
+        self.post("key-1")
+        self.assertEqual(self.post("key-2").status_code, 201)
+        self.assertEqual(Report.objects.filter(user=self.user).count(), 2)
+
+    def test_without_a_key_every_post_runs(self):
+        self.client.post(self.url, self.data)
+        self.client.post(self.url, self.data)
+        self.assertEqual(Report.objects.filter(user=self.user).count(), 2)
+
+    def test_keys_are_per_user(self):
+        self.post("shared")
+        other = make_user("neighbour")
+        response = jwt_client(other).post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="shared")
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header(REPLAYED_HEADER))
+        self.assertEqual(Report.objects.count(), 2)
+
+    def test_key_reused_for_another_endpoint(self):
+        self.post("key-1")
+        IdempotencyRecord.objects.filter(key="key-1").update(fingerprint="POST /api/missions/1/submit_proof/")
+        response = self.post("key-1")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Report.objects.count(), 1)
+
+    def test_failed_request_is_not_stored(self):
+        # Validation errors are raised through the decorator, which drops the record
+        self.assertEqual(self.post("key-1", title="").status_code, 400)
+        self.assertFalse(IdempotencyRecord.objects.filter(key="key-1").exists())
+        retry = self.post("key-1")
+        self.assertEqual(retry.status_code, 201)
+        self.assertFalse(retry.has_header(REPLAYED_HEADER))
+
+    def test_returned_error_is_not_stored(self):
+        mission = Mission.objects.create(title="Clean the park", description="Before and after photo")
+        url = reverse("mission-submit-proof", args=[mission.pk])
+        # The view returns this 400 itself rather than raising it
+        response = self.client.post(url, {}, HTTP_IDEMPOTENCY_KEY="proof-1")
+        self.assertEqual(response.json(), {"error": "Join mission first"})
+        self.assertFalse(IdempotencyRecord.objects.filter(key="proof-1").exists())
+
+        self.client.post(reverse("mission-join", args=[mission.pk]))
+        retry = self.client.post(url, {}, HTTP_IDEMPOTENCY_KEY="proof-1")
+        self.assertEqual(retry.json(), {"error": "No image uploaded"})
+        self.assertFalse(retry.has_header(REPLAYED_HEADER))
+
+    def test_expired_record_counts_as_absent(self):
+        self.post("key-1")
+        IdempotencyRecord.objects.filter(key="key-1").update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertFalse(self.post("key-1").has_header(REPLAYED_HEADER))
+        self.assertEqual(Report.objects.count(), 2)
+
+    def test_in_progress_duplicate_gets_409(self):
+        now = timezone.now()
+        IdempotencyRecord.objects.create(user=self.user, key="key-1", fingerprint=f"POST {self.url}",
+                                         created_at=now, expires_at=now + timedelta(hours=1))
+        with self.settings(IDEMPOTENCY_WAIT_SECONDS=0):
+            response = self.post("key-1")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Report.objects.count(), 0)
+
+    def test_stale_in_progress_record_is_taken_over(self):
+        past = timezone.now() - timedelta(hours=1)
+        IdempotencyRecord.objects.create(user=self.user, key="key-1", fingerprint=f"POST {self.url}",
+                                         created_at=past, expires_at=past + timedelta(days=1))
+        self.assertEqual(self.post("key-1").status_code, 201)
+        self.assertEqual(IdempotencyRecord.objects.get(key="key-1").state, "completed")
@@ -0,0 +1,55 @@
+import orjson
+from django.contrib.auth.models import Permission
+from django.test import override_settings
+from django.urls import reverse
+
+from api.models import Report
+from api.utils import AI_QUEUED_MESSAGE
+
+from .common import CacheClearingTestCase, jwt_client, make_user
+
+
+def ndjson(*rows):
+    return b"\n".join(row if isinstance(row, bytes) else orjson.dumps(row) for row in rows)
+
+
+@override_settings(BULK_INGEST_BATCH_SIZE=2)
+class BulkIngestViewTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.partner = make_user("city_app")
+        self.partner.user_permissions.add(Permission.objects.get(codename="bulk_ingest_report"))
+        self.client = jwt_client(self.partner)
+
+    def post(self, body, client=None):
+        return (client or self.client).post(reverse("report-bulk-ingest"), body, content_type="application/x-ndjson")
+
+    def results(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [orjson.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    def row(self, i, **fields):
+        return {"title": f"Partner {i}", "description": "From the city app", "category": "Garbage",
+                "location": "Ward 5", "external_id": f"p{i}", **fields}
+
+    def test_streams_a_result_per_line_and_a_summary(self):
+        body = ndjson(self.row(1, image_url="https://img.example.com/1.jpg"), self.row(2), b"{not json",
+                      self.row(1), {"title": "No description"})
+        *rows, summary = self.results(self.post(body))
+        self.assertEqual([row["status"] for row in rows], ["created", "created", "invalid", "duplicate", "invalid"])
+        self.assertEqual(summary, {"summary": {"created": 2, "duplicate": 1, "invalid": 2}})
+
+        queued = Report.objects.get(external_id="p1")
+        self.assertEqual((queued.status, queued.ai_analysis, queued.xp_awarded), ("pending", AI_QUEUED_MESSAGE, True))
+
+    def test_resending_a_file_creates_nothing(self):
+        body = ndjson(self.row(1), self.row(2), self.row(3))
+        self.results(self.post(body))
+        *_, summary = self.results(self.post(body))
+        self.assertEqual(summary["summary"], {"created": 0, "duplicate": 3, "invalid": 0})
+        self.assertEqual(Report.objects.count(), 3)
+
+    def test_needs_the_partner_permission(self):
+        response = self.post(ndjson(self.row(1)), client=jwt_client(make_user("citizen")))
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Report.objects.exists())
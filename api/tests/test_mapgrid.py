@@ -0,0 +1,94 @@
+import orjson
+from django.db.models import Sum
+from django.test import override_settings
+from django.urls import reverse
+
+from api import ingest, mapgrid, moderation
+from api.models import MapGridCell, Report
+
+from .common import CacheClearingTestCase, jwt_client, make_report, make_user, seed_reports
+
+
+def grid():
+    """{(zoom, x, y): column values} for every non-empty cell, floats rounded."""
+    return {
+        (zoom, x, y): tuple(round(v, 6) if isinstance(v, float) else v for v in values)
+        for zoom, x, y, *values in MapGridCell.objects.filter(count__gt=0).values_list("zoom", "x", "y", *mapgrid.COLUMNS)
+    }
+
+
+def placed():
+    """Reports on the map: every one is in exactly one cell per zoom."""
+    return MapGridCell.objects.filter(zoom=0).aggregate(n=Sum("count"))["n"] or 0
+
+
+# A small grid keeps the cell count (and the test) small
+@override_settings(MAP_GRID_MIN_ZOOM=0, MAP_GRID_MAX_ZOOM=8, MAP_GRID_CELL_BITS=2)
+class MapGridDeltaTests(CacheClearingTestCase):
+    """The cells kept up to date report by report must equal a rebuild() from scratch."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("citizen")
+        self.moderator = make_user("moderator", is_staff=True)
+        self.reports = seed_reports([self.user], 12)
+
+    def assertMatchesRebuild(self):
+        incremental = grid()
+        self.assertEqual(mapgrid.drifted_cells(), 0)
+        mapgrid.rebuild()
+        self.assertEqual(incremental, grid())
+
+    def test_created(self):
+        self.assertEqual(placed(), 12)
+        self.assertMatchesRebuild()
+
+    def test_status_change(self):
+        report = self.reports[0]
+        report.status = "resolved"
+        report.save()
+        self.assertMatchesRebuild()
+
+    def test_moved_and_unplaced(self):
+        report = self.reports[1]
+        report.latitude, report.longitude = -33.86, 151.21
+        report.save()
+        unplaced = self.reports[2]
+        unplaced.latitude = unplaced.longitude = None
+        unplaced.save()
+        make_report(self.user, title="No location")
+        self.assertEqual(placed(), 11)
+        self.assertMatchesRebuild()
+
+    def test_deleted(self):
+        self.reports[3].delete()
+        # Loaded fresh, so the old position comes from from_db()
+        Report.objects.filter(pk=self.reports[4].pk).get().delete()
+        self.assertMatchesRebuild()
+
+    def test_bulk_moderation(self):
+        moderation.bulk_set_status(Report.objects.filter(status="pending"), "verified", actor=self.moderator)
+        moderation.bulk_set_status(Report.objects.filter(pk__in=[r.pk for r in self.reports[:6]]), "rejected")
+        self.assertMatchesRebuild()
+
+    def test_partner_ingest(self):
+        body = b"\n".join(orjson.dumps({
+            "title": f"Partner {i}", "description": "From the city app", "category": "Garbage",
+            "location": "Ward 5", "latitude": 13.0 + i * 0.1, "longitude": 77.6, "external_id": f"p{i}",
+        }) for i in range(5))
+        list(ingest.stream(self.user, body))
+        self.assertEqual(placed(), 17)
+        self.assertMatchesRebuild()
+
+    def test_rebuild_repairs_drift(self):
+        MapGridCell.objects.filter(zoom=3).update(count=0)
+        self.assertGreater(mapgrid.drifted_cells(), 0)
+        mapgrid.rebuild()
+        self.assertEqual(mapgrid.drifted_cells(), 0)
+
+    def test_clusters_endpoint(self):
+        response = jwt_client().get(reverse("map-clusters"), {"bbox": "77,12,78,13.5", "zoom": 8})
+        self.assertEqual(response.status_code, 200)
+        clusters = response.json()["clusters"]
+        self.assertEqual(sum(cluster["count"] for cluster in clusters), 12)
+        self.assertEqual(sum(cluster["statuses"]["pending"] for cluster in clusters), 3)
@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from api import moderation
+from api.models import Profile, Report
+from api.utils import AI_QUEUED_MESSAGE
+
+from .common import CacheClearingTestCase, jwt_client, make_report, make_user
+
+
+class ModerationLeaseTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = make_user("alice", is_staff=True)
+        self.bob = make_user("bob", is_staff=True)
+        self.citizen = make_user("citizen")
+        # Lowest AI confidence first
+        self.reports = [make_report(self.citizen, title=f"Report {i}", ai_confidence=i * 10) for i in range(4)]
+
+    def expire(self, report):
+        Report.objects.filter(pk=report.pk).update(claim_expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_claim_is_exclusive(self):
+        report = self.reports[0]
+        self.assertIsNotNone(moderation.claim("report", report.pk, self.alice))
+        self.assertIsNone(moderation.claim("report", report.pk, self.bob))
+        # Renewing your own lease is fine
+        self.assertIsNotNone(moderation.claim("report", report.pk, self.alice))
+
+    def test_expired_lease_can_be_taken_over(self):
+        report = self.reports[0]
+        moderation.claim("report", report.pk, self.alice)
+        self.expire(report)
+        self.assertIsNotNone(moderation.claim("report", report.pk, self.bob))
+        self.assertEqual(Report.objects.get(pk=report.pk).claimed_by, self.bob)
+
+    def test_claim_next_skips_items_leased_by_others(self):
+        moderation.claim("report", self.reports[0].pk, self.alice)
+        claimed = moderation.claim_next(self.bob, count=2)
+        self.assertEqual([item["id"] for item in claimed], [self.reports[1].pk, self.reports[2].pk])
+        # Two moderators asking at once never get the same item
+        claimed = moderation.claim_next(self.alice, count=5)
+        self.assertEqual([item["id"] for item in claimed], [self.reports[3].pk])
+
+    def test_queue_leaves_out_other_leases_and_unchecked_ingest(self):
+        moderation.claim("report", self.reports[0].pk, self.alice)
+        make_report(self.citizen, title="Partner report", ai_analysis=AI_QUEUED_MESSAGE)
+        items, _ = moderation.queue_page(self.bob)
+        self.assertEqual([item["id"] for item in items], [r.pk for r in self.reports[1:]])
+        items, _ = moderation.queue_page(self.bob, include_claimed=True)
+        self.assertEqual(len(items), 4)
+
+    def test_queue_pages_with_a_cursor(self):
+        items, cursor = moderation.queue_page(self.alice, limit=3)
+        rest, end = moderation.queue_page(self.alice, limit=3, cursor=moderation.decode_cursor(cursor))
+        self.assertEqual([item["id"] for item in items + rest], [r.pk for r in self.reports])
+        self.assertIsNone(end)
+
+    def test_decide_needs_a_live_lease(self):
+        report = self.reports[0]
+        self.assertFalse(moderation.decide("report", report.pk, self.alice, approve=True))
+        moderation.claim("report", report.pk, self.alice)
+        self.assertFalse(moderation.decide("report", report.pk, self.bob, approve=True))
+        self.expire(report)
+        self.assertFalse(moderation.decide("report", report.pk, self.alice, approve=True))
+
+        moderation.claim("report", report.pk, self.alice)
+        self.assertTrue(moderation.decide("report", report.pk, self.alice, approve=True))
+        report.refresh_from_db()
+        self.assertEqual((report.status, report.xp_awarded, report.claimed_by), ("verified", True, None))
+        profile = Profile.objects.get(user=self.citizen)
+        self.assertEqual((profile.points, profile.reports_verified), (moderation.REPORT_XP, 1))
+        # Decided items leave the queue
+        self.assertFalse(moderation.decide("report", report.pk, self.alice, approve=False))
+
+    def test_release(self):
+        report = self.reports[0]
+        moderation.claim("report", report.pk, self.alice)
+        self.assertEqual(moderation.release("report", report.pk, self.bob), 0)
+        self.assertEqual(moderation.release("report", report.pk, self.alice), 1)
+        self.assertIsNotNone(moderation.claim("report", report.pk, self.bob))
+
+    def test_api_flow(self):
+        alice, bob = jwt_client(self.alice), jwt_client(self.bob)
+        report = self.reports[0]
+        claim_url = reverse("moderation-claim", args=["report", report.pk])
+        self.assertEqual(alice.post(claim_url).status_code, 200)
+        self.assertEqual(bob.post(claim_url).status_code, 409)
+
+        response = bob.post(reverse("moderation-claim-next"), {"count": 1})
+        self.assertEqual([item["id"] for item in response.json()["results"]], [self.reports[1].pk])
+
+        decide_url = reverse("moderation-decide", args=["report", report.pk])
+        self.assertEqual(bob.post(decide_url, {"decision": "reject"}).status_code, 409)
+        self.assertEqual(alice.post(decide_url, {"decision": "reject"}).status_code, 200)
+        self.assertEqual(Report.objects.get(pk=report.pk).status, "rejected")
+
+    def test_citizens_cannot_moderate(self):
+        response = jwt_client(self.citizen).post(reverse("moderation-claim-next"))
+        self.assertEqual(response.status_code, 403)
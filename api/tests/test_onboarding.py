@@ -0,0 +1,48 @@
+import orjson
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+
+from api.models import Profile
+
+from .common import CacheClearingTestCase, jwt_client, make_user
+
+
+@override_settings(USER_IMPORT_WORKERS=1, USER_IMPORT_BATCH_SIZE=2)
+class UserImportViewTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = jwt_client(make_user("officer", is_staff=True))
+        make_user("taken")
+
+    def post(self, body, client=None):
+        return (client or self.staff).post(reverse("user-import"), body, content_type="text/csv")
+
+    def results(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [orjson.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    def test_imports_in_batches_and_ends_with_a_summary(self):
+        body = (
+            "username,email,phone_number,password\n"
+            "asha,asha@example.com,098765 43210,\n"
+            "ravi,,,s3cret-pass\n"
+            "taken,,,\n"
+            "bad name!,,,\n"
+            "meera,,,\n"
+        )
+        *rows, summary = self.results(self.post(body))
+        self.assertEqual([row["status"] for row in rows], ["created", "created", "duplicate", "invalid", "created"])
+        self.assertEqual([row["line"] for row in rows], [2, 3, 4, 5, 6])
+        self.assertEqual({k: summary["summary"][k] for k in ("created", "duplicate", "invalid", "rows")},
+                         {"created": 3, "duplicate": 1, "invalid": 1, "rows": 5})
+
+        self.assertTrue(User.objects.get(username="ravi").check_password("s3cret-pass"))
+        self.assertFalse(User.objects.get(username="asha").has_usable_password())
+        self.assertEqual(Profile.objects.get(user__username="asha").phone_number, "+919876543210")
+
+    def test_rejects_other_content_types_and_citizens(self):
+        response = self.staff.post(reverse("user-import"), "username\nx\n", content_type="application/json")
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(self.post("username\nx\n", client=jwt_client(make_user("citizen"))).status_code, 403)
+        self.assertFalse(User.objects.filter(username="x").exists())
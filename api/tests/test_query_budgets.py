@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+
+from api import archive
+from api.models import Mission, Notice, Report, ReportArchive, UserMission
+from api.queries import QueryBudgetExceeded, QueryBudgetTestMixin
+
+from .common import CacheClearingTestCase, jwt_client, make_user, seed_reports
+
+# One test per entry in settings.QUERY_BUDGETS, named test_<view name>. The
+# data is spread over several users, authors and missions, so a per-row query
+# (an N+1) shows up as a repeated query shape and fails the budget.
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, CacheClearingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [make_user(f"citizen{i}") for i in range(6)]
+        cls.user = cls.users[0]
+        cls.reports = seed_reports(cls.users, 40)
+
+        authors = [make_user(f"officer{i}", is_staff=True) for i in range(4)]
+        for i in range(12):
+            Notice.objects.create(title=f"Notice {i}", content="Water supply cut", author=authors[i % 4],
+                                  is_pinned=i % 5 == 0)
+
+        missions = [Mission.objects.create(title=f"Mission {i}", description="Plant a tree") for i in range(8)]
+        for i, mission in enumerate(missions[:5]):
+            UserMission.objects.create(user=cls.user, mission=mission,
+                                       status="completed" if i % 2 else "pending")
+
+    def setUp(self):
+        super().setUp()
+        self.client = jwt_client(self.user)
+
+    def get(self, view_name, *args, **params):
+        response = self.assertEndpointWithinBudget(
+            view_name, "GET", lambda: self.client.get(reverse(view_name, args=args), params),
+        )
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return response
+
+    def test_every_budget_has_a_test(self):
+        for key in settings.QUERY_BUDGETS:
+            view_name = key.split()[-1]
+            with self.subTest(endpoint=key):
+                self.assertTrue(hasattr(self, f"test_{view_name.replace('-', '_')}"))
+
+    def test_report_list_create(self):
+        response = self.get("report-list-create")
+        self.assertEqual(len(response.json()), len(self.reports))
+        self.get("report-list-create", status="pending,verified", category="Pothole,Garbage", user="me")
+
+    def test_report_facets(self):
+        response = self.get("report-facets", status="pending")
+        self.assertEqual(response.json()["total"], Report.objects.filter(status="pending").count())
+
+    def test_report_detail(self):
+        own = Report.objects.filter(user=self.user).first()
+        self.assertEqual(self.get("report-detail", own.pk).json()["id"], own.pk)
+
+        # Archived reports are served from ReportArchive after the live lookup misses
+        archive.archive_batch(timezone.now() + timedelta(days=1))
+        archived = ReportArchive.objects.filter(user=self.user).first()
+        self.assertEqual(self.get("report-detail", archived.pk).json()["id"], archived.pk)
+
+    def test_notice_list(self):
+        response = self.get("notice-list")
+        self.assertEqual(len(response.json()), 12)
+
+    def test_leaderboard(self):
+        self.get("leaderboard")
+
+    def test_missions(self):
+        response = self.get("missions")
+        statuses = [mission["status"] for mission in response.json()]
+        self.assertEqual(statuses.count("available"), 3)
+
+    def test_user_profile(self):
+        self.get("user-profile")
+
+    def test_user_dashboard(self):
+        response = self.get("user-dashboard")
+        self.assertEqual(response.json()["reports"]["total"], Report.objects.filter(user=self.user).count())
+
+    def test_sync(self):
+        response = self.get("sync", limit=500)
+        self.assertEqual(len(response.json()["reports"]["changed"]), len(self.reports))
+        self.assertEqual(len(response.json()["missions"]["changed"]), 5)
+
+    def test_repeated_queries_fail_the_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with self.assertQueryBudget(100):
+                for report in Report.objects.all()[:5]:
+                    report.user.username
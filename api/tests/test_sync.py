@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from api import sync
+from api.models import Notice, Report
+
+from .common import CacheClearingTestCase, backdate, jwt_client, make_report, make_user
+
+
+@override_settings(SYNC_LAG_SECONDS=5)
+class SyncTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("citizen")
+        self.client = jwt_client(self.user)
+        self.reports = [make_report(self.user, title=f"Report {i}") for i in range(5)]
+        # Older than the sync lag, so cursors can move past them
+        backdate(Report.objects.all(), seconds=60, field="updated_at")
+
+    def sync(self, token=None, limit=2):
+        params = {"limit": limit}
+        if token:
+            params["token"] = token
+        response = self.client.get(reverse("sync"), params)
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        return response.json()
+
+    def changed_ids(self, page, stream="reports"):
+        return [row["id"] for row in page[stream]["changed"]]
+
+    def sync_all(self, token=None, limit=2):
+        """Follow has_more; returns (report ids per page, last token)."""
+        pages = []
+        while True:
+            page = self.sync(token, limit)
+            pages.append(self.changed_ids(page))
+            token = page["sync_token"]
+            if not page["has_more"]:
+                return pages, token
+
+    def test_full_sync_pages_through_every_report_once(self):
+        pages, _ = self.sync_all()
+        self.assertEqual(pages, [[r.pk for r in self.reports[:2]], [r.pk for r in self.reports[2:4]],
+                                 [self.reports[4].pk]])
+
+    def test_delta_sync_returns_only_changes(self):
+        _, token = self.sync_all()
+        self.assertEqual(self.changed_ids(self.sync(token)), [])
+
+        report = self.reports[1]
+        report.status = "verified"
+        report.save()
+        deleted = self.reports[3].pk
+        self.reports[3].delete()
+        page = self.sync(token)
+        self.assertEqual(self.changed_ids(page), [report.pk])
+        self.assertEqual(page["reports"]["deleted"], [deleted])
+
+    def test_rows_inside_the_lag_are_sent_again(self):
+        _, token = self.sync_all()
+        fresh = make_report(self.user, title="Just now")
+        page = self.sync(token)
+        self.assertEqual(self.changed_ids(page), [fresh.pk])
+        # The cursor stays behind now - SYNC_LAG_SECONDS, so a late commit
+        # stamped a moment earlier would still be picked up
+        self.assertEqual(self.changed_ids(self.sync(page["sync_token"])), [fresh.pk])
+
+    def test_same_timestamp_rows_are_split_by_id(self):
+        Report.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        pages, _ = self.sync_all(limit=3)
+        self.assertEqual(sum(pages, []), [r.pk for r in self.reports])
+
+    def test_notices_and_missions_stream_separately(self):
+        Notice.objects.create(title="Road closed", content="Till Friday", author=make_user("officer", is_staff=True))
+        page = self.sync(limit=10)
+        self.assertEqual(len(page["notices"]["changed"]), 1)
+        self.assertEqual(page["missions"]["changed"], [])
+
+    def test_expired_token_asks_for_a_full_sync(self):
+        old = timezone.now() - timedelta(days=60)
+        token = sync.encode_token({name: (old, 0) for name in sync.STREAMS})
+        with self.settings(SYNC_TOMBSTONE_DAYS=30):
+            response = self.client.get(reverse("sync"), {"token": token})
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()["resync"])
+
+    def test_invalid_token(self):
+        self.assertEqual(self.client.get(reverse("sync"), {"token": "not-a-token"}).status_code, 400)
@@ -0,0 +1,78 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+
+from api import throttling
+from api.models import Report, ThrottleHit
+
+from .common import CacheClearingTestCase, jwt_client, make_user
+
+
+class GCRATests(CacheClearingTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate("10/min"), (10, 60))
+        self.assertEqual(throttling.parse_rate("20/hour"), (20, 3600))
+        self.assertEqual(throttling.parse_rate("5/s"), (5, 1))
+
+    def test_burst_then_wait_for_the_next_token(self):
+        self.assertEqual([throttling.consume("t", 3, 60) for _ in range(3)], [0, 0, 0])
+        # Refilled at one token every 60 / 3 seconds
+        self.assertAlmostEqual(throttling.consume("t", 3, 60), 20, delta=0.5)
+
+    def test_tokens_refill_evenly(self):
+        now = time.time()
+        with mock.patch.object(throttling.time, "time", return_value=now):
+            for _ in range(3):
+                throttling.consume("t", 3, 60)
+            self.assertGreater(throttling.consume("t", 3, 60), 0)
+        with mock.patch.object(throttling.time, "time", return_value=now + 20):
+            self.assertEqual(throttling.consume("t", 3, 60), 0)
+            self.assertGreater(throttling.consume("t", 3, 60), 0)
+
+    def test_rejected_calls_do_not_use_up_tokens(self):
+        now = time.time()
+        with mock.patch.object(throttling.time, "time", return_value=now):
+            for _ in range(10):
+                throttling.consume("t", 1, 60)
+        with mock.patch.object(throttling.time, "time", return_value=now + 60):
+            self.assertEqual(throttling.consume("t", 1, 60), 0)
+
+    def test_smaller_burst(self):
+        self.assertEqual(throttling.consume("t", 60, 60, burst=1), 0)
+        self.assertAlmostEqual(throttling.consume("t", 60, 60, burst=1), 1, delta=0.1)
+
+    def test_buckets_are_separate(self):
+        throttling.consume("a", 1, 60)
+        self.assertGreater(throttling.consume("a", 1, 60), 0)
+        self.assertEqual(throttling.consume("b", 1, 60), 0)
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    "DEFAULT_THROTTLE_RATES": {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "report_create": "2/hour"},
+})
+class ReportCreateThrottleTests(CacheClearingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("citizen")
+        self.client = jwt_client(self.user)
+        self.url = reverse("report-list-create")
+        self.data = {"title": "Pothole", "description": "Deep one", "location": "Ring Rd"}
+
+    def test_third_report_in_the_hour_is_rejected(self):
+        self.assertEqual([self.client.post(self.url, self.data).status_code for _ in range(2)], [201, 201])
+        response = self.client.post(self.url, self.data)
+        self.assertEqual(response.status_code, 429)
+        self.assertAlmostEqual(int(response["Retry-After"]), 1800, delta=2)
+        self.assertEqual(Report.objects.count(), 2)
+        self.assertEqual(ThrottleHit.objects.get(scope="report_create").ident, f"user:{self.user.pk}")
+
+    def test_reads_and_other_users_are_not_limited(self):
+        for _ in range(3):
+            self.client.post(self.url, self.data)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        other = jwt_client(make_user("neighbour"))
+        self.assertEqual(other.post(self.url, self.data).status_code, 201)
@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  TOKEN BUCKET THROTTLES
+# ==========================================
+# One bucket per (scope, user or client IP), kept in the shared cache as a
+# single integer: the bucket's "theoretical arrival time" (GCRA, which behaves
+# exactly like a token bucket refilled at rate/period with `rate` tokens of
+# burst). On Redis the check is one atomic Lua call using the server clock; on
+# other cache backends it is a get + set, atomic within a process only.
+#
+# Rates live in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] ("10/min"). Rejected
+# requests get 429 with Retry-After, and are tallied into ThrottleHit (at most
+# one DB write per client per THROTTLE_LOG_SECONDS) for the admin.
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+GCRA_LUA = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000000 + tonumber(now[2])
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = now
+local stored = redis.call('GET', KEYS[1])
+if stored then tat = math.max(tonumber(stored), now) end
+local new_tat = tat + interval
+local wait = new_tat - now - tolerance
+if wait > 0 then return wait end
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000) + 1)
+return 0
+"""
+
+_local_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60)."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period.strip()[0]]
+
+
+def _redis_client():
+    from django.core.cache.backends.redis import RedisCache
+
+    if not isinstance(cache, RedisCache):
+        return None
+    return cache._cache.get_client(write=True)
+
+
+def consume(key, num, period, burst=None):
+    """Take one token from a bucket refilled with `num` per `period` seconds and
+    holding `burst` (default num). Returns 0 if allowed, else seconds until the
+    next token."""
+    interval = int(period * 1_000_000 / num)
+    tolerance = interval * (num if burst is None else burst)
+    client = _redis_client()
+    if client is not None:
+        # EVALSHA, falling back to EVAL the first time a server sees the script
+        wait = client.register_script(GCRA_LUA)(keys=[cache.make_and_validate_key(key)], args=[interval, tolerance])
+        return int(wait) / 1_000_000
+
+    with _local_lock:
+        now = int(time.time() * 1_000_000)
+        tat = max(cache.get(key) or now, now)
+        new_tat = tat + interval
+        wait = new_tat - now - tolerance
+        if wait > 0:
+            return wait / 1_000_000
+        cache.set(key, new_tat, (new_tat - now) // 1_000_000 + 1)
+        return 0
+
+
+def record_hit(scope, ident, user):
+    """Count a rejection; flushed to ThrottleHit at most once per client per interval."""
+    from .models import ThrottleHit
+
+    counter = f'throttle:hits:{scope}:{ident}'
+    try:
+        cache.incr(counter)
+    except ValueError:
+        cache.set(counter, 1, 3600)
+    if not cache.add(f'throttle:logged:{scope}:{ident}', 1, settings.THROTTLE_LOG_SECONDS):
+        return
+    hits = cache.get(counter) or 1
+    cache.delete(counter)
+
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    now = timezone.now()
+    updates = {'hits': F('hits') + hits, 'last_seen': now, 'user_id': user_id}
+    if not ThrottleHit.objects.filter(scope=scope, ident=ident).update(**updates):
+        try:
+            ThrottleHit.objects.create(scope=scope, ident=ident, user_id=user_id, hits=hits,
+                                       first_seen=now, last_seen=now)
+        except IntegrityError:
+            ThrottleHit.objects.filter(scope=scope, ident=ident).update(**updates)
+    logger.warning("throttled", extra={"scope": scope, "ident": ident, "hits": hits})
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+    # Only these methods are throttled (None = all), so a list/create view
+    # can throttle writes without touching reads
+    methods = None
+
+    def get_scope(self, request):
+        return self.scope
+
+    def get_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{super().get_ident(request)}'
+
+    def allow_request(self, request, view):
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        scope = self.get_scope(request)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if not rate:
+            return True
+        num, period = parse_rate(rate)
+        ident = self.get_ident(request)
+        try:
+            self.wait_seconds = consume(f'throttle:{scope}:{ident}', num, period)
+        except Exception as e:
+            # Never take the endpoint down with the cache; fail open
+            logger.error("throttle_cache_error", extra={"scope": scope, "error": str(e)})
+            return True
+        if not self.wait_seconds:
+            return True
+        try:
+            record_hit(scope, ident, request.user)
+        except Exception as e:
+            logger.error("throttle_log_error", extra={"scope": scope, "error": str(e)})
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ChatThrottle(TokenBucketThrottle):
+    """Anonymous chat gets a much smaller bucket (per IP) than signed-in users."""
+
+    def get_scope(self, request):
+        return 'chat_user' if request.user and request.user.is_authenticated else 'chat_anon'
+
+
+class ReportCreateThrottle(TokenBucketThrottle):
+    scope = 'report_create'
+    methods = ('POST',)
+
+
+class ProofSubmitThrottle(TokenBucketThrottle):
+    scope = 'proof_submit'
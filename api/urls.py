@@ -7,14 +7,27 @@ from rest_framework_simplejwt.views import (
 )
 from .views import (
     RegisterView, 
+    UserImportView,
     UserProfileView, 
+    UserDashboardView,
     ProfileUpdateView, 
     ReportListCreateView, 
+    ReportBulkIngestView,
+    ReportExportView,
+    ReportFacetView,
+    MapClusterView,
+    HotspotView,
     ReportDetailView, 
     ReportDeleteView, 
     AIChatView, 
     GamificationViewSet,
     NoticeListCreateView, 
+    ModerationQueueViewSet,
+    ArchivedReportListView,
+    ArchivedReportDetailView,
+    ReportHistoryView,
+    StatusEventFeedView,
+    SyncView,
 )
 
 urlpatterns = [
@@ -23,6 +36,10 @@ urlpatterns = [
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('user/register/', RegisterView.as_view(), name='register'),
     path('user/profile/', UserProfileView.as_view(), name='user-profile'),
+    path('user/dashboard/', UserDashboardView.as_view(), name='user-dashboard'),
+
+    # BULK USER IMPORT (staff)
+    path('users/import/', UserImportView.as_view(), name='user-import'),
     
     # PROFILE UPDATE URL
     path('user/update/', ProfileUpdateView.as_view(), name='user-update'),
@@ -32,8 +49,23 @@ urlpatterns = [
 
     #REPORTS
     path('reports/', ReportListCreateView.as_view(), name='report-list-create'),
+    path('reports/bulk/', ReportBulkIngestView.as_view(), name='report-bulk-ingest'),
+    path('reports/export/', ReportExportView.as_view(), name='report-export'),
+    path('reports/facets/', ReportFacetView.as_view(), name='report-facets'),
     path('reports/<int:pk>/', ReportDetailView.as_view(), name='report-detail'),
     path('reports/<int:pk>/delete/', ReportDeleteView.as_view(), name='report-delete'),
+    path('reports/<int:pk>/history/', ReportHistoryView.as_view(), name='report-history'),
+    path('reports/archive/', ArchivedReportListView.as_view(), name='report-archive'),
+
+    # STATUS HISTORY
+    path('history/', StatusEventFeedView.as_view(), name='status-history'),
+    path('reports/archive/<int:pk>/', ArchivedReportDetailView.as_view(), name='report-archive-detail'),
+
+    # MAP CLUSTERS
+    path('map/clusters/', MapClusterView.as_view(), name='map-clusters'),
+
+    # OFFLINE DELTA SYNC
+    path('sync/', SyncView.as_view(), name='sync'),
 
     #AI CHAT
     path('ai-chat/', AIChatView.as_view(), name='ai-chat'),
@@ -44,5 +76,20 @@ urlpatterns = [
     path('missions/<int:pk>/join/', GamificationViewSet.as_view({'post': 'join'}), name='mission-join'),
     path('missions/<int:pk>/submit_proof/', GamificationViewSet.as_view({'post': 'submit_proof'}), name='mission-submit-proof'),
     
+    # HOTSPOTS (staff)
+    path('hotspots/', HotspotView.as_view(), name='hotspots'),
+
+    # MODERATION QUEUE (staff)
+    path('moderation/queue/', ModerationQueueViewSet.as_view({'get': 'list'}), name='moderation-queue'),
+    path('moderation/queue/claim-next/', ModerationQueueViewSet.as_view({'post': 'claim_next'}), name='moderation-claim-next'),
+    path('moderation/queue/<str:kind>/<int:pk>/claim/', ModerationQueueViewSet.as_view({'post': 'claim'}), name='moderation-claim'),
+    path('moderation/queue/<str:kind>/<int:pk>/release/', ModerationQueueViewSet.as_view({'post': 'release'}), name='moderation-release'),
+    path('moderation/queue/<str:kind>/<int:pk>/decide/', ModerationQueueViewSet.as_view({'post': 'decide'}), name='moderation-decide'),
+
+    # REALTIME (SSE, served by the ASGI app)
+    path('events/', views.event_stream, name='event-stream'),
+
     path('ping/', views.ping_server, name='ping'),
+    path('ready/', views.ready_check, name='ready'),
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
\ No newline at end of file
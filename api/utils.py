@@ -1,22 +1,30 @@
-from google import genai
 from decouple import config
-import PIL.Image
 import json
+import logging
 import time
 import re
+from . import ai_scheduler, gemini, imaging
+
+logger = logging.getLogger(__name__)
+
+# Returned (with confidence 0) when Gemini stays rate-limited/overloaded;
+# such items wait for a human or the reverify_fallbacks sweeper
+AI_BUSY_MESSAGE = "AI Network Busy. Queued for manual review."
+# Partner-ingested reports waiting for verify_ingested_reports to fetch their image
+AI_QUEUED_MESSAGE = "Queued for AI verification."
 
 def ai_verify_image(image, description="General anomaly"):
-    print("\n---AI IMAGE VERIFICATION START ---")
-    
+    logger.info("ai_verify_start", extra={"description": description[:100]})
+
     api_key = config('GEMINI_API_KEY', default=None)
     if not api_key:
-        print("❌ AI ERROR: API Key is missing.")
+        logger.error("ai_api_key_missing")
         return False, 0, "Server Error: API Key missing."
 
     try:
-        client = genai.Client(api_key=api_key)
+        gemini.get_client(api_key)
     except Exception as e:
-        print(f"❌ AI CLIENT ERROR: {e}")
+        logger.error("ai_client_error", extra={"error": str(e)})
         return False, 0, "Failed to initialize AI client."
 
     prompt = (
@@ -39,28 +47,23 @@ def ai_verify_image(image, description="General anomaly"):
         image.seek(0)
     
     try:
-        img = PIL.Image.open(image)
         # FIX 1: Force image to RGB (Gemini crashes on RGBA/transparent images)
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        print("✅ Image loaded and converted to RGB successfully.")
+        img = imaging.open_rgb(image)
+        logger.debug("ai_image_loaded", extra={"mode": img.mode, "size": img.size})
     except Exception as e:
-        print(f"❌ AI IMAGE FORMAT ERROR: {e}")
+        logger.warning("ai_image_format_error", extra={"error": str(e)})
         return False, 0, "Invalid image format."
 
     # explicitly naming the model is usually safer.
     target_model = 'gemini-flash-latest' 
-    print(f"🚀 Sending to model: {target_model}...")
+    logger.info("ai_request", extra={"model": target_model})
     
     max_retries = 2
     for attempt in range(max_retries):
         try:
-            response = client.models.generate_content(
-                model=target_model, 
-                contents=[prompt, img]
-            )
+            response = gemini.generate(api_key, [prompt, img], model=target_model)
             
-            print(f"📥 RAW AI RESPONSE:\n{response.text}")
+            logger.debug("ai_raw_response", extra={"text": response.text})
             
             # FIX 2: Bulletproof JSON Extractor
             response_text = response.text
@@ -79,16 +82,21 @@ def ai_verify_image(image, description="General anomaly"):
             confidence = int(data.get('confidence', 0))
             reason = data.get('reason', "AI processed image.")
 
-            print(f"✅ AI SUCCESS: Match={match}, Confidence={confidence}%")
+            logger.info("ai_verify_success", extra={"match": match, "confidence": confidence})
             return match, confidence, reason
 
+        except ai_scheduler.DeadlineExceeded as e:
+            # Waited too long behind other AI work; straight to manual review
+            logger.warning("ai_deadline_exceeded", extra={"error": str(e)})
+            return False, 0, AI_BUSY_MESSAGE
+
         except Exception as e:
             error_str = str(e)
-            print(f"⚠️ AI ERROR (Attempt {attempt+1}): {error_str}")
+            logger.warning("ai_verify_error", extra={"attempt": attempt + 1, "error": error_str})
             
             #Catch both 429 (Rate Limit) AND 503 (Overloaded)
             if "429" in error_str or "503" in error_str:
-                print("⏳ AI is rate-limited or overloaded. Retrying...")
+                logger.info("ai_rate_limited_retry", extra={"attempt": attempt + 1})
                 time.sleep(2)
                 continue
             else:
@@ -96,5 +104,5 @@ def ai_verify_image(image, description="General anomaly"):
                 return False, 0, f"AI Error: {error_str}"
     
     #If all retries fail, return confidence=0 so it queues for human review
-    print("❌ AI FINAL STATUS: Unavailable")
-    return False, 0, "AI Network Busy. Queued for manual review."
\ No newline at end of file
+    logger.error("ai_unavailable", extra={"attempts": max_retries})
+    return False, 0, AI_BUSY_MESSAGE
\ No newline at end of file
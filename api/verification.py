@@ -0,0 +1,275 @@
+import http.client
+import io
+import ipaddress
+import logging
+import posixpath
+import socket
+from urllib.parse import urlsplit
+from urllib.request import (HTTPDefaultErrorHandler, HTTPErrorProcessor, HTTPHandler, HTTPRedirectHandler,
+                            HTTPSHandler, OpenerDirector, Request)
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import ai_scheduler, metrics, moderation
+from .models import Report, UserMission
+from .utils import AI_BUSY_MESSAGE, AI_QUEUED_MESSAGE, ai_verify_image
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  AI VERIFICATION OUTCOMES
+# ==========================================
+# One place for "what does an AI result do to a report / mission proof",
+# shared by the request path (views) and the reverify_fallbacks sweeper.
+
+AUTO_APPROVE_CONFIDENCE = 70
+
+
+def report_outcome(match, confidence, reason):
+    """(status, ai_analysis) for a report's AI result."""
+    if confidence == 0:
+        # AI CRASHED / RATE LIMIT: Fallback to manual review
+        return "pending", AI_BUSY_MESSAGE
+    if match:
+        # Confident match is auto-approved; a weak match waits for a human
+        return ("verified" if confidence >= AUTO_APPROVE_CONFIDENCE else "pending"), reason
+    # AI is confident the image does NOT match
+    return "rejected", reason
+
+
+def proof_outcome(match, confidence):
+    """UserMission status for a proof's AI result."""
+    if confidence == 0:
+        return "pending"
+    if match and confidence >= AUTO_APPROVE_CONFIDENCE:
+        return "completed"
+    return "rejected"
+
+
+def award_report_xp(report):
+    """Grant the verification XP once. Safe to call twice for the same report."""
+    with transaction.atomic():
+        if not Report.objects.filter(pk=report.pk, xp_awarded=False).update(xp_awarded=True):
+            return False
+        moderation.award_xp({report.user_id: moderation.REPORT_XP})
+    report.xp_awarded = True
+    return True
+
+
+# ==========================================
+#  RE-VERIFYING AI FALLBACKS
+# ==========================================
+# Items whose AI check fell back because Gemini was busy: still pending,
+# confidence 0, an image to look at, and not leased by a moderator.
+
+def fallback_reports():
+    now = timezone.now()
+    return (
+        Report.objects.filter(status="pending", ai_confidence=0, ai_analysis=AI_BUSY_MESSAGE)
+        .exclude(Q(image__isnull=True) | Q(image=""))
+        .exclude(claim_expires_at__gt=now)
+    )
+
+
+def fallback_proofs():
+    now = timezone.now()
+    return (
+        moderation.pending_queryset("proof")
+        .filter(ai_confidence=0, ai_analysis=AI_BUSY_MESSAGE)
+        .exclude(claim_expires_at__gt=now)
+    )
+
+
+def reverify_report(pk):
+    """Re-run AI on a fallback report. Returns the resulting status, or None
+    if the report is no longer a fallback (decided or claimed meanwhile)."""
+    report = fallback_reports().filter(pk=pk).first()
+    if report is None:
+        return None
+    with report.image.open("rb") as image, ai_scheduler.job("background"):
+        match, confidence, reason = ai_verify_image(image, report.description)
+    metrics.ai_outcome("report", match, confidence)
+    if confidence == 0:
+        return "busy"
+    status, analysis = report_outcome(match, confidence, reason)
+
+    with transaction.atomic():
+        # Conditional update: a moderator or a parallel sweep may have got there first
+        if not fallback_reports().filter(pk=pk).update(
+                ai_confidence=confidence, ai_analysis=analysis, updated_at=timezone.now()):
+            return None
+        if status != "pending":
+            moderation.bulk_set_status(Report.objects.filter(pk=pk), status, source='ai')
+    return status
+
+
+def reverify_proof(pk):
+    user_mission = fallback_proofs().select_related("mission").filter(pk=pk).first()
+    if user_mission is None:
+        return None
+    with user_mission.proof_image.open("rb") as image, ai_scheduler.job("background"):
+        match, confidence, reason = ai_verify_image(image, user_mission.mission.description)
+    metrics.ai_outcome("proof", match, confidence)
+    if confidence == 0:
+        return "busy"
+    status = proof_outcome(match, confidence)
+
+    with transaction.atomic():
+        if not fallback_proofs().filter(pk=pk).update(
+                ai_confidence=confidence, ai_analysis=reason, updated_at=timezone.now()):
+            return None
+        moderation.bulk_set_proof_status(UserMission.objects.filter(pk=pk), status, source='ai')
+    return status
+
+
+# ==========================================
+#  PARTNER-INGESTED REPORTS
+# ==========================================
+# Bulk-ingested reports (api/ingest.py) only carry an image URL. They wait as
+# pending + AI_QUEUED_MESSAGE (hidden from the moderation queue) until
+# verify_ingested_reports fetches the image, stores it like an upload and
+# runs the usual AI check on it.
+#
+# image_url comes from outside, so fetches are locked down: http(s) only,
+# only hosts in INGEST_IMAGE_HOSTS (nothing is fetched while it is empty),
+# redirects only to those hosts, and the host is resolved once and refused
+# unless every address is public (no loopback, private or link-local ranges,
+# so not the cloud metadata service either). The connection then goes to
+# the checked address, so a DNS answer cannot change in between. No proxy,
+# file: or ftp: handlers.
+
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+
+def ingested_reports():
+    return Report.objects.filter(status="pending", ai_analysis=AI_QUEUED_MESSAGE, source_image_url__isnull=False)
+
+
+def check_image_url(url):
+    """Raises ValueError unless url is http(s) on a host in INGEST_IMAGE_HOSTS."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError(f"image_url scheme {parts.scheme or '(none)'} is not allowed")
+    if not settings.INGEST_IMAGE_HOSTS:
+        raise ValueError("INGEST_IMAGE_HOSTS is not set, so no partner images are fetched")
+    if parts.hostname not in settings.INGEST_IMAGE_HOSTS:
+        raise ValueError(f"image host {parts.hostname} is not in INGEST_IMAGE_HOSTS")
+
+
+def _connect_public(address, timeout, source_address=None):
+    # Resolve once, refuse if any answer is not a public address, then
+    # connect to exactly those addresses (no second lookup to rebind)
+    host, port = address
+    answers = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    for *_, sockaddr in answers:
+        ip = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if not (getattr(ip, "ipv4_mapped", None) or ip).is_global:
+            raise ValueError(f"image host {host} resolves to a non-public address ({ip})")
+    error = None
+    for *_, sockaddr in answers:
+        try:
+            return socket.create_connection(sockaddr[:2], timeout, source_address)
+        except OSError as e:
+            error = e
+    raise error
+
+
+class _PublicOnly:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _connect_public
+
+
+class _PublicHTTPConnection(_PublicOnly, http.client.HTTPConnection):
+    pass
+
+
+class _PublicHTTPSConnection(_PublicOnly, http.client.HTTPSConnection):
+    pass
+
+
+class _PublicHTTPHandler(HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+class _AllowedRedirectHandler(HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        check_image_url(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def _opener():
+    opener = OpenerDirector()
+    for handler in (_PublicHTTPHandler(), _PublicHTTPSHandler(), _AllowedRedirectHandler(),
+                    HTTPDefaultErrorHandler(), HTTPErrorProcessor()):
+        opener.add_handler(handler)
+    return opener
+
+
+def fetch_image(url):
+    check_image_url(url)
+    with metrics.external_call("image_fetch"):
+        request = Request(url, headers={"User-Agent": "PULSE-ingest"})
+        with _opener().open(request, timeout=settings.INGEST_IMAGE_TIMEOUT) as response:
+            data = response.read(MAX_IMAGE_BYTES + 1)
+    if len(data) > MAX_IMAGE_BYTES:
+        raise ValueError("image is larger than 5MB")
+    return data
+
+
+def verify_ingested(pk):
+    """Returns the resulting status, "busy" (left for reverify_fallbacks),
+    "unreachable" (left for a moderator), or None if no longer queued."""
+    report = ingested_reports().filter(pk=pk).first()
+    if report is None:
+        return None
+    try:
+        data = fetch_image(report.source_image_url)
+    except Exception as e:
+        logger.warning("ingest_image_error", extra={"id": pk, "url": report.source_image_url, "error": str(e)})
+        ingested_reports().filter(pk=pk).update(
+            ai_analysis=f"Could not fetch image: {e}"[:500], updated_at=timezone.now())
+        return "unreachable"
+
+    name = posixpath.basename(urlsplit(report.source_image_url).path) or f"ingest_{pk}.jpg"
+    try:
+        report.image.save(name, ContentFile(data), save=False)
+    except Exception as e:
+        # Leave it to a moderator rather than fetching and storing it again every run
+        logger.warning("ingest_image_store_error", extra={"id": pk, "error": str(e)})
+        ingested_reports().filter(pk=pk).update(
+            ai_analysis=f"Could not store image: {e}"[:500], updated_at=timezone.now())
+        return "unreachable"
+
+    # The report leaves the ingest queue with its image before Gemini is
+    # called: if anything below fails, it is an ordinary AI fallback that
+    # reverify_fallbacks retries under its rate limit, not a queued row that
+    # every run fetches and sends to Gemini again
+    if not ingested_reports().filter(pk=pk).update(
+            image=report.image.name, ai_analysis=AI_BUSY_MESSAGE, updated_at=timezone.now()):
+        return None
+
+    with ai_scheduler.job("background"):
+        match, confidence, reason = ai_verify_image(io.BytesIO(data), report.description)
+    metrics.ai_outcome("ingest", match, confidence)
+    if confidence == 0:
+        return "busy"
+    status, analysis = report_outcome(match, confidence, reason)
+
+    with transaction.atomic():
+        if not fallback_reports().filter(pk=pk).update(
+                ai_confidence=confidence, ai_analysis=analysis, updated_at=timezone.now()):
+            return None
+        if status != "pending":
+            moderation.bulk_set_status(Report.objects.filter(pk=pk), status, source='ai')
+    return status
@@ -6,16 +6,28 @@ from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticate
 from rest_framework.decorators import action
 from django.contrib.auth.models import User
 from decouple import config
-from twilio.rest import Client
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from datetime import timedelta
 from django.db.models import Count, Q
 from django.db.models.functions import TruncHour
 from rest_framework.decorators import api_view, permission_classes
-from .models import Report, Profile, Mission, UserMission, Notice
-from .utils import ai_verify_image  
-from google import genai 
+from .models import Report, ReportArchive, Profile, Mission, UserMission, Notice, Hotspot
+from .utils import ai_verify_image
+from .db_router import ReplicaReadMixin
 from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.crypto import constant_time_compare
+from . import ai_scheduler, archive, counters, export, facets, gemini, history, idempotency, ingest, mapgrid, metrics, moderation, onboarding, realtime, rows, sms, sync, throttling, verification, warmup
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 from .serializers import (
     UserSerializer, 
@@ -23,9 +35,10 @@ from .serializers import (
     ReportSerializer, 
     MissionSerializer, 
     UserMissionSerializer,
-    LeaderboardSerializer,
     NoticeSerializer,
-    ProfileUpdateSerializer 
+    ProfileUpdateSerializer,
+    ArchivedReportSerializer,
+    StatusEventSerializer,
 )
 
 # CUSTOM PERMISSION
@@ -35,6 +48,11 @@ class IsAdminOrReadOnly(permissions.BasePermission):
             return True
         return request.user and request.user.is_staff
 
+class CanBulkIngestReports(permissions.BasePermission):
+    # Granted to partner accounts in the admin ("Can bulk ingest reports")
+    def has_permission(self, request, view):
+        return request.user.has_perm('api.bulk_ingest_report')
+
 # ==========================================
 #  1. AUTHENTICATION & USER VIEWS
 # ==========================================
@@ -84,17 +102,63 @@ class UserProfileView(APIView):
         except Exception:
             return Response({"username": user.username, "points": 0, "level": "N/A"})
 
+class UserDashboardView(APIView):
+    """Home screen in one query: XP, level and the profile counters, plus the
+    rank from a cached points table (api/counters.py)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        profile = Profile.objects.filter(user=request.user).first()
+        if profile is None:
+            profile = Profile.objects.create(user=request.user)
+            profile.rank = None
+        else:
+            profile.rank = counters.rank_for(profile.points)
+        return Response({
+            "username": request.user.username,
+            "points": profile.points,
+            "level": profile.level,
+            "rank": profile.rank,
+            "reports": {
+                "total": profile.reports_total,
+                "pending": profile.reports_pending,
+                "verified": profile.reports_verified,
+                "rejected": profile.reports_rejected,
+                "resolved": profile.reports_resolved,
+            },
+            "missions": {
+                "joined": profile.missions_joined,
+                "completed": profile.missions_completed,
+            },
+            "profile_picture": profile.profile_picture.url if profile.profile_picture else None,
+        })
+
 # ==========================================
 #  2. REPORT & TWILIO VIEWS
 # ==========================================
 
-class ReportListCreateView(generics.ListCreateAPIView):
+class ReportListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
     serializer_class = ReportSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     parser_classes = (MultiPartParser, FormParser)
+    throttle_classes = [throttling.ReportCreateThrottle]
 
     def get_queryset(self):
         return Report.objects.all().order_by('-created_at')
+
+    def list(self, request, *args, **kwargs):
+        try:
+            filters = facets.parse_filters(request.query_params, request.user)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        # Read-only feed: one joined values() query, no ModelSerializer (api/rows.py)
+        queryset = facets.apply(self.filter_queryset(self.get_queryset()), filters)
+        return Response(rows.report_rows.serialize(queryset, request))
+
+    # Retries with the same Idempotency-Key get the first response back
+    @idempotency.idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
     
     def perform_create(self, serializer):
         image = self.request.FILES.get('image')
@@ -111,102 +175,174 @@ class ReportListCreateView(generics.ListCreateAPIView):
 
         if image:
             # Only call the AI ONCE
-            match, confidence, reason = ai_verify_image(image, description)
+            with ai_scheduler.job('report', self.request.user.pk):
+                match, confidence, reason = ai_verify_image(image, description)
+            metrics.ai_outcome('report', match, confidence)
             ai_confidence = confidence
-            ai_summary = reason
-
-            if confidence == 0:
-                # AI CRASHED / RATE LIMIT: Fallback
-                report_status = "pending"
-                ai_summary = "AI Network Busy. Queued for manual review."
-
-            elif match:
-                if confidence >= 70:
-                    # AI APPROVED
-                    report_status = "verified"
-                else:
-                    # AI thinks the image matches but isn't confident
-                    report_status = "pending"
-
-            else:
-                # AI is confident the image does NOT match
-                report_status = "rejected"
+            report_status, ai_summary = verification.report_outcome(match, confidence, reason)
 
             if hasattr(image, 'seek'):
                 image.seek(0)
 
-        instance = serializer.save(
-            user=self.request.user,
-            ai_confidence=ai_confidence,
-            ai_analysis=ai_summary,
-            status=report_status
-        )
+        # With an image the initial status is the AI's call
+        with history.acting('ai' if image else 'user', self.request.user):
+            instance = serializer.save(
+                user=self.request.user,
+                ai_confidence=ai_confidence,
+                ai_analysis=ai_summary,
+                status=report_status
+            )
 
         try:
-            if instance.status == "verified" and not instance.xp_awarded:
-                profile = self.request.user.profile
-                profile.points += 10
-                profile.save()
-
-                instance.xp_awarded = True
-                instance.save(update_fields=["xp_awarded"])
-                print("✅ XP Awarded: +10")
+            if instance.status == "verified" and verification.award_report_xp(instance):
+                logger.info("xp_awarded", extra={"user_id": self.request.user.id, "report_id": instance.id, "points": moderation.REPORT_XP})
             else:
-                print(f"No XP awarded. Report status: {instance.status}")
+                logger.info("xp_not_awarded", extra={"report_id": instance.id, "status": instance.status})
 
         except Exception as e:
-            print(f"Gamification Error: {e}")
+            logger.exception("gamification_error", extra={"report_id": instance.id})
 
         self.send_sms_alerts(instance)
 
     def send_sms_alerts(self, instance):
-        sid = config('TWILIO_ACCOUNT_SID', default=None)
-        token = config('TWILIO_AUTH_TOKEN', default=None)
-        twilio_phone = config('TWILIO_PHONE_NUMBER', default=None)
+        if not sms.is_configured():
+            return
         admin_phone = config('ADMIN_PHONE_NUMBER', default=None)
 
-        if sid and token:
+        # 1. USER SMS
+        try:
+            user_phone = None
+            if hasattr(self.request.user, 'profile'):
+                user_phone = sms.normalize_phone(self.request.user.profile.phone_number)
+
+            if user_phone:
+                sms.send(
+                    user_phone,
+                    f"PULSE: Hi {self.request.user.username}, report '{instance.title}' received! AI Status: {instance.status}"
+                )
+                logger.info("sms_sent", extra={"recipient": "user", "report_id": instance.id})
+            else:
+                logger.info("sms_skipped_no_phone", extra={"user_id": self.request.user.id})
+        except Exception as e:
+            logger.error("sms_error", extra={"recipient": "user", "error": str(e)})
+
+        # --- 2. ADMIN SMS ---
+        try:
+            if admin_phone:
+                sms.send(
+                    admin_phone,
+                    f"ADMIN ALERT: New Issue '{instance.title}'. AI Confidence: {instance.ai_confidence}%"
+                )
+                logger.info("sms_sent", extra={"recipient": "admin", "report_id": instance.id})
+            else:
+                logger.warning("sms_admin_phone_missing")
+        except Exception as e:
+            logger.error("sms_error", extra={"recipient": "admin", "error": str(e)})
+
+
+def _streaming_response(request, chunks, content_type):
+    """StreamingHttpResponse over a sync generator that really streams under both servers.
+
+    Under ASGI Django would drain a sync iterator with sync_to_async(list)
+    before sending a byte, so there each chunk is pulled through
+    sync_to_async instead (same thread every time, so the DB cursor is fine).
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        async def pull():
             try:
-                client = Client(sid, token)
+                while (chunk := await sync_to_async(next)(chunks, None)) is not None:
+                    yield chunk
+            finally:
+                await sync_to_async(chunks.close)()
+        return StreamingHttpResponse(pull(), content_type=content_type)
+    return StreamingHttpResponse(chunks, content_type=content_type)
 
-                # 1. USER SMS
-                try:
-                    user_phone = None
-                    if hasattr(self.request.user, 'profile') and self.request.user.profile.phone_number:
-                        raw_phone = str(self.request.user.profile.phone_number).strip()
-                        if len(raw_phone) == 10 and not raw_phone.startswith('+'):
-                            user_phone = f"+91{raw_phone}"
-                        else:
-                            user_phone = raw_phone if raw_phone.startswith('+') else f"+91{raw_phone}"
-
-                    if user_phone:
-                        client.messages.create(
-                            body=f"PULSE: Hi {self.request.user.username}, report '{instance.title}' received! AI Status: {instance.status}",
-                            from_=twilio_phone,
-                            to=user_phone
-                        )
-                        print(f"📱 TWILIO: User SMS sent to {user_phone}")
-                    else:
-                        print("⚠️ TWILIO: User has no phone number. Skipping User SMS.")
-                except Exception as e:
-                    print(f"❌ TWILIO USER SMS ERROR: {e}")
-
-                # --- 2. ADMIN SMS ---
-                try:
-                    if admin_phone:
-                        client.messages.create(
-                            body=f"ADMIN ALERT: New Issue '{instance.title}'. AI Confidence: {instance.ai_confidence}%",
-                            from_=twilio_phone,
-                            to=admin_phone
-                        )
-                        print(f"TWILIO: Admin SMS sent to {admin_phone}")
-                    else:
-                        print("⚠️ TWILIO: ADMIN_PHONE_NUMBER is missing in .env")
-                except Exception as e:
-                    print(f"❌ TWILIO ADMIN SMS ERROR: {e}")
-
-            except Exception as e:
-                print(f"Twilio Client Setup Error: {e}")
+
+class ReportBulkIngestView(APIView):
+    """Partner systems push NDJSON, one report per line; see api/ingest.py."""
+    permission_classes = [IsAuthenticated, CanBulkIngestReports]
+
+    def post(self, request):
+        if request.content_type.split(';')[0].strip() not in ingest.CONTENT_TYPES:
+            return Response({"error": "Send NDJSON (Content-Type: application/x-ndjson), one report per line."},
+                            status=415)
+        # Read the raw stream (no DRF parser) so request.data never buffers it twice
+        body = request.stream.read(settings.BULK_INGEST_MAX_BYTES + 1) if request.stream else b''
+        if len(body) > settings.BULK_INGEST_MAX_BYTES:
+            return Response({"error": f"Body over {settings.BULK_INGEST_MAX_BYTES} bytes; split the file."}, status=413)
+        if not body.strip():
+            return Response({"error": "Empty body."}, status=400)
+        return _streaming_response(request, ingest.stream(request.user, body), 'application/x-ndjson')
+
+
+class UserImportView(APIView):
+    """Staff: onboard citizens from a partner CSV; see api/onboarding.py."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        if request.content_type.split(';')[0].strip() not in onboarding.CONTENT_TYPES:
+            return Response({"error": "Send CSV (Content-Type: text/csv) with a header line."}, status=415)
+        if not request.stream:
+            return Response({"error": "Empty body."}, status=400)
+        # Read from the raw stream as the response goes, one batch at a time
+        try:
+            reader = onboarding.open_csv(request.stream)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"error": str(e)}, status=400)
+        return _streaming_response(request, onboarding.stream(reader), 'application/x-ndjson')
+
+
+class ReportExportView(APIView):
+    """Staff: stream reports as CSV or NDJSON, optionally only those changed since a previous export."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        # ?format= is taken by DRF content negotiation
+        fmt = request.query_params.get('output', 'csv')
+        if fmt not in export.FORMATS:
+            return Response({"error": f"output must be one of: {', '.join(export.FORMATS)}"}, status=400)
+        try:
+            filters = export.parse_filters(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        until = timezone.localtime(filters['until'])
+        response = _streaming_response(request, export.chunks(export.export_rows(**filters), fmt),
+                                       export.FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="reports-{until:%Y%m%d-%H%M%S}.{fmt}"'
+        # Pass this back as ?since= next time to get only what changed
+        response['X-Export-Until'] = until.isoformat()
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class ReportFacetView(ReplicaReadMixin, APIView):
+    """Report counts per status and category for the feed's filters (api/facets.py)."""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            filters = facets.parse_filters(request.query_params, request.user)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        return Response(facets.counts(filters))
+
+
+class MapClusterView(ReplicaReadMixin, APIView):
+    """Report clusters for a map viewport, from the per-zoom grid (api/mapgrid.py)."""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            bbox = mapgrid.parse_bbox(request.query_params.get('bbox'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        try:
+            zoom = int(request.query_params.get('zoom', ''))
+        except ValueError:
+            return Response({"error": "zoom must be an integer"}, status=400)
+        zoom, clusters = mapgrid.clusters(*bbox, zoom)
+        return Response({"zoom": zoom, "clusters": clusters})
 
 # ==========================================
 #  3. AI CHAT VIEW 
@@ -214,6 +350,7 @@ class ReportListCreateView(generics.ListCreateAPIView):
 
 class AIChatView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [throttling.ChatThrottle]
 
     def post(self, request):
         user_message = request.data.get('message', '')
@@ -261,17 +398,15 @@ class AIChatView(APIView):
             if not api_key:
                 return Response({"response": "AI Config Missing"}, status=503)
 
-            client = genai.Client(api_key=api_key)
-            
-            # Use 'gemini-flash-latest' 
-            response = client.models.generate_content(
-                model='gemini-flash-latest', 
-                contents=context
-            )
+            # Use 'gemini-flash-latest' (anonymous chat shares one scheduler queue)
+            with ai_scheduler.job('chat', request.user.pk):
+                response = gemini.generate(api_key, context, model='gemini-flash-latest')
             return Response({"response": response.text})
 
+        except ai_scheduler.DeadlineExceeded:
+            return Response({"response": "I am currently overloaded. Please try again in 1 minute."}, status=200)
         except Exception as e:
-            print(f"CHATBOT ERROR: {e}")
+            logger.error("chat_error", extra={"error": str(e)})
             if "429" in str(e):
                 return Response({"response": "I am currently overloaded. Please try again in 1 minute."}, status=200)
             return Response({"response": "AI Service Unavailable"}, status=503)
@@ -280,24 +415,31 @@ class AIChatView(APIView):
 #  4. GAMIFICATION VIEWSET
 # ==========================================
 
-class GamificationViewSet(viewsets.ViewSet):
+class GamificationViewSet(ReplicaReadMixin, viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_throttles(self):
+        # urls.py maps these actions by hand, so @action(throttle_classes=...) wouldn't apply
+        if self.action == 'submit_proof':
+            return [throttling.ProofSubmitThrottle()]
+        return super().get_throttles()
+
     @action(detail=False, methods=['get'])
     def leaderboard(self, request):
-        top_users = Profile.objects.select_related('user').filter(user__is_staff=False).order_by('-points')[:10]
-        serializer = LeaderboardSerializer(top_users, many=True)
-        return Response(serializer.data)
+        top_users = Profile.objects.filter(user__is_staff=False).order_by('-points')[:10]
+        return Response(rows.leaderboard_rows.serialize(top_users))
 
     @action(detail=False, methods=['get'])
     def missions(self, request):
         all_missions = Mission.objects.all()
-        user_progress = UserMission.objects.filter(user=request.user)
+        # One query for all of the user's progress instead of one per mission
+        user_progress = dict(
+            UserMission.objects.filter(user=request.user).values_list('mission_id', 'status')
+        )
         
         mission_list = []
         for mission in all_missions:
-            progress = user_progress.filter(mission=mission).first()
-            status = progress.status if progress else "available"
+            status = user_progress.get(mission.id, "available")
             mission_list.append({
                 "id": mission.id,
                 "title": mission.title,
@@ -312,9 +454,10 @@ class GamificationViewSet(viewsets.ViewSet):
     def join(self, request, pk=None):
         try:
             mission = Mission.objects.get(pk=pk)
-            user_mission, created = UserMission.objects.get_or_create(
-                user=request.user, mission=mission, defaults={'status': 'pending'}
-            )
+            with history.acting('user', request.user):
+                user_mission, created = UserMission.objects.get_or_create(
+                    user=request.user, mission=mission, defaults={'status': 'pending'}
+                )
             if created:
                 return Response({'status': 'joined', 'message': f'Mission "{mission.title}" started!'})
             else:
@@ -323,6 +466,7 @@ class GamificationViewSet(viewsets.ViewSet):
             return Response({'error': 'Mission not found'}, status=404)
 
     @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    @idempotency.idempotent
     def submit_proof(self, request, pk=None):
         try:
             mission = Mission.objects.get(pk=pk)
@@ -341,26 +485,25 @@ class GamificationViewSet(viewsets.ViewSet):
                 return Response({"error": "Image file size exceeds the 5MB limit. Please upload a smaller file."}, status=400)
 
             # REAL AI LOGIC
-            match, confidence, reason = ai_verify_image(image, mission.description)
+            with ai_scheduler.job('proof', request.user.pk):
+                match, confidence, reason = ai_verify_image(image, mission.description)
+            metrics.ai_outcome('proof', match, confidence)
+
+            user_mission.status = verification.proof_outcome(match, confidence)
 
-            if confidence == 0:
+            if user_mission.status == 'pending':
                 # AI CRASHED / RATE LIMIT: Fallback to Manual Review
-                user_mission.status = 'pending'
                 message = "AI Network Busy. Queued for human review."
                 status_resp = 'pending'
 
-            elif match and confidence >= 70:
+            elif user_mission.status == 'completed':
                 # AI APPROVED: Auto-Accept
-                user_mission.status = 'completed'
-                profile = request.user.profile
-                profile.points += mission.points_reward
-                profile.save()
+                moderation.award_xp({request.user.id: mission.points_reward})
                 message = f'Verified! You earned {mission.points_reward} XP!'
                 status_resp = 'verified'
                 
             else:
                 # AI REJECTED: Hard Reject
-                user_mission.status = 'rejected' 
                 message = f'Proof Rejected by AI: {reason}'
                 status_resp = 'failed'
 
@@ -370,7 +513,9 @@ class GamificationViewSet(viewsets.ViewSet):
             # This will overwrite their previous image with the newest one
             user_mission.proof_image = image
             user_mission.ai_analysis = reason
-            user_mission.save()
+            user_mission.ai_confidence = confidence
+            with history.acting('ai'):
+                user_mission.save()
             
             return Response({'status': status_resp, 'message': message, 'confidence': confidence})
             
@@ -382,12 +527,15 @@ class GamificationViewSet(viewsets.ViewSet):
 #  5. NOTICES 
 # ==========================================
 
-class NoticeListCreateView(generics.ListCreateAPIView):
+class NoticeListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
     serializer_class = NoticeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        return Notice.objects.all().order_by('-is_pinned', '-created_at')
+        return Notice.objects.select_related('author').order_by('-is_pinned', '-created_at')
+
+    def list(self, request, *args, **kwargs):
+        return Response(rows.notice_rows.serialize(self.get_queryset(), request))
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)       
@@ -399,6 +547,124 @@ class ReportDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return Report.objects.filter(user=self.request.user)
 
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Old resolved/rejected reports live in the archive (read-only)
+            archived = ReportArchive.objects.select_related('user').filter(user=request.user, pk=kwargs['pk']).first()
+            if archived is None:
+                raise
+            return Response(ArchivedReportSerializer(archived, context={'request': request}).data)
+
+class ReportHistoryView(APIView):
+    """Status transitions of one report, oldest first (owner or staff)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        events = history.for_object('report', pk).select_related('actor')
+        if not request.user.is_staff:
+            events = events.filter(user=request.user)
+        return Response(StatusEventSerializer(events, many=True).data)
+
+class StatusEventFeedView(APIView):
+    """Changes since a cursor across all reports/proofs (own ones unless staff).
+
+    ?since_id=<last id seen> and/or ?since=<ISO time>, ?kind=report|proof, ?limit=
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            since_id = int(params.get('since_id', 0))
+            limit = min(max(int(params.get('limit', 100)), 1), 500)
+        except ValueError:
+            return Response({'error': 'since_id and limit must be integers'}, status=400)
+        since_time = None
+        if params.get('since'):
+            since_time = parse_datetime(params['since'])
+            if since_time is None:
+                return Response({'error': 'since must be an ISO 8601 datetime'}, status=400)
+        events = list(history.since(
+            since_id=since_id,
+            since_time=since_time,
+            user=None if request.user.is_staff else request.user,
+            kind=params.get('kind'),
+            limit=limit,
+        ).select_related('actor'))
+        return Response({
+            'results': StatusEventSerializer(events, many=True).data,
+            'next_since_id': events[-1].id if events else since_id,
+        })
+
+class SyncView(APIView):
+    """Delta sync for offline clients: reports, notices and the user's mission
+    progress changed or deleted since ?token=<sync_token> (omit it for a full
+    sync). Keep calling with the returned sync_token while has_more is true.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 200)), 1), 1000)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=400)
+        try:
+            changed, token, has_more = sync.changes(request.user, request.query_params.get('token'), limit)
+        except sync.TokenExpired:
+            return Response({'error': 'Sync token expired, start a full sync.', 'resync': True}, status=410)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        deleted = {stream: [] for stream in sync.TOMBSTONE_KINDS.values()}
+        for tombstone in changed['deleted']:
+            deleted[sync.TOMBSTONE_KINDS[tombstone.kind]].append(tombstone.object_id)
+        context = {'request': request}
+        return Response({
+            'reports': {
+                'changed': ReportSerializer(changed['reports'], many=True, context=context).data,
+                'deleted': deleted['reports'],
+            },
+            'notices': {
+                'changed': NoticeSerializer(changed['notices'], many=True, context=context).data,
+                'deleted': deleted['notices'],
+            },
+            'missions': {
+                'changed': UserMissionSerializer(changed['missions'], many=True, context=context).data,
+                'deleted': deleted['missions'],
+            },
+            'sync_token': token,
+            'has_more': has_more,
+        })
+
+class ArchivedReportListView(ReplicaReadMixin, generics.ListAPIView):
+    """Search archived reports: ?q=, category, status, mine=1; page with before_id."""
+    serializer_class = ArchivedReportSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        params = self.request.query_params
+        try:
+            limit = min(int(params.get('limit', 50)), 200)
+            before_id = int(params['before_id']) if params.get('before_id') else None
+        except ValueError:
+            raise ValidationError({"error": "limit and before_id must be integers"})
+        mine = params.get('mine') == '1' and self.request.user.is_authenticated
+        return archive.search(
+            q=params.get('q'),
+            user=self.request.user if mine else None,
+            category=params.get('category'),
+            status=params.get('status'),
+            before_id=before_id,
+            limit=max(limit, 1),
+        )
+
+class ArchivedReportDetailView(ReplicaReadMixin, generics.RetrieveAPIView):
+    serializer_class = ArchivedReportSerializer
+    permission_classes = [AllowAny]
+    queryset = ReportArchive.objects.select_related('user')
+
 class ReportDeleteView(generics.DestroyAPIView):
     serializer_class = ReportSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -409,4 +675,184 @@ class ReportDeleteView(generics.DestroyAPIView):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def ping_server(request):
-    return Response({"message": "PULSE backend is awake!"})
\ No newline at end of file
+    return Response({"message": "PULSE backend is awake!"})
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def ready_check(request):
+    # Kicks off the warm-up if the entry point didn't (runserver, WARMUP_ON_BOOT off)
+    warmup.start_background_warmup()
+    state = warmup.status()
+    return Response(state, status=200 if state['ready'] else 503)
+
+# ==========================================
+#  6. REALTIME PUSH (SSE)
+# ==========================================
+
+def _stream_token(request):
+    # EventSource cannot set headers, so the JWT may also come as ?token=
+    header = JWTAuthentication().get_header(request)
+    if header:
+        return JWTAuthentication().get_raw_token(header)
+    return request.GET.get('token')
+
+def _stream_user(raw_token):
+    auth = JWTAuthentication()
+    return auth.get_user(auth.get_validated_token(raw_token))
+
+async def event_stream(request):
+    user = None
+    raw_token = _stream_token(request)
+    if raw_token:
+        try:
+            user = await sync_to_async(_stream_user, thread_sensitive=False)(raw_token)
+        except (InvalidToken, TokenError):
+            return JsonResponse({'error': 'Invalid token'}, status=401)
+
+    channels = {realtime.NOTICES_CHANNEL}
+    if user is not None:
+        channels.add(realtime.user_channel(user.id))
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    keepalive = getattr(settings, 'REALTIME_KEEPALIVE_SECONDS', 15)
+    realtime.backend.start()
+
+    async def stream():
+        sub, backlog, complete = realtime.broker.subscribe(
+            channels, asyncio.get_running_loop(), last_event_id
+        )
+        try:
+            yield "retry: 3000\n\n"
+            if not complete:
+                # History no longer covers the gap: tell the client to refetch
+                yield "event: reset\ndata: {}\n\n"
+            for message in backlog:
+                yield realtime.format_sse(message)
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(sub.queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield realtime.format_sse(message)
+                if sub.overflowed and sub.queue.empty():
+                    break
+        finally:
+            realtime.broker.unsubscribe(sub)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+# ==========================================
+#  7. METRICS (Prometheus scrape target)
+# ==========================================
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return JsonResponse({'error': 'Not found'}, status=404)
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+    return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# ==========================================
+#  8. MODERATION QUEUE (staff)
+# ==========================================
+
+class ModerationQueueViewSet(viewsets.ViewSet):
+    permission_classes = [permissions.IsAdminUser]
+
+    def _kind(self, kind):
+        if kind not in moderation.QUEUE_KINDS:
+            raise ValidationError({"error": f"Unknown kind '{kind}'."})
+        return kind
+
+    def list(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 25)), 100)
+            cursor = request.query_params.get('cursor')
+            cursor = moderation.decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return Response({'error': 'Invalid limit or cursor'}, status=400)
+        kind = request.query_params.get('kind')
+        items, next_cursor = moderation.queue_page(
+            request.user,
+            limit=max(limit, 1),
+            cursor=cursor,
+            kinds=[self._kind(kind)] if kind else None,
+            include_claimed=request.query_params.get('include_claimed') == '1',
+        )
+        return Response({'results': items, 'next_cursor': next_cursor})
+
+    @action(detail=False, methods=['post'])
+    def claim_next(self, request):
+        try:
+            count = min(max(int(request.data.get('count', 1)), 1), 50)
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid count'}, status=400)
+        kind = request.data.get('kind')
+        items = moderation.claim_next(request.user, count, kinds=[self._kind(kind)] if kind else None)
+        return Response({'results': items, 'lease_seconds': moderation.lease_seconds()})
+
+    @action(detail=True, methods=['post'])
+    def claim(self, request, kind=None, pk=None):
+        expires = moderation.claim(self._kind(kind), pk, request.user)
+        if expires is None:
+            return Response({'error': 'Already claimed or no longer pending'}, status=409)
+        return Response({'status': 'claimed', 'claim_expires_at': expires})
+
+    @action(detail=True, methods=['post'])
+    def release(self, request, kind=None, pk=None):
+        if not moderation.release(self._kind(kind), pk, request.user):
+            return Response({'error': 'You do not hold this item'}, status=409)
+        return Response({'status': 'released'})
+
+    @action(detail=True, methods=['post'])
+    def decide(self, request, kind=None, pk=None):
+        decision = request.data.get('decision')
+        if decision not in ('approve', 'reject'):
+            return Response({'error': "decision must be 'approve' or 'reject'"}, status=400)
+        if not moderation.decide(self._kind(kind), pk, request.user, decision == 'approve'):
+            return Response({'error': 'Claim expired, not yours, or item already decided'}, status=409)
+        return Response({'status': 'decided', 'decision': decision})
+
+
+
+# ==========================================
+#  9. HOTSPOTS (staff)
+# ==========================================
+
+class HotspotView(APIView):
+    """Latest manage.py detect_hotspots results for one window (api/hotspots.py)."""
+    permission_classes = [permissions.IsAdminUser]
+
+    FIELDS = ('category', 'latitude', 'longitude', 'west', 'south', 'east', 'north',
+              'count', 'baseline', 'score', 'rising', 'categories')
+
+    def get(self, request):
+        windows = sorted(set(settings.HOTSPOT_WINDOWS_DAYS))
+        try:
+            window = int(request.query_params.get('window', windows[0]))
+        except ValueError:
+            return Response({"error": "window must be a number of days"}, status=400)
+        if window not in windows:
+            return Response({"error": f"window must be one of: {', '.join(map(str, windows))}"}, status=400)
+
+        qs = Hotspot.objects.filter(window_days=window, category=request.query_params.get('category', ''))
+        if request.query_params.get('rising') in ('1', 'true'):
+            qs = qs.filter(rising=True)
+        return Response({
+            "window_days": window,
+            "computed_at": Hotspot.objects.values_list('computed_at', flat=True).first(),
+            "hotspots": list(qs.order_by('-rising', '-score').values(*self.FIELDS)),
+        })
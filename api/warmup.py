@@ -0,0 +1,53 @@
+import logging
+import threading
+import time
+
+from . import gemini, imaging, sms
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+#  BACKGROUND WARM-UP
+# ==========================================
+# The SDK adapters import lazily so a cold worker can answer /api/ping/ right
+# away. After boot we import them on a daemon thread; /api/ready/ reports 503
+# until that has finished, so a load balancer can wait for a warm worker.
+
+ADAPTERS = {
+    'gemini': gemini.warm,
+    'sms': sms.warm,
+    'imaging': imaging.warm,
+}
+
+_state = {'started': False, 'done': False, 'adapters': {}}
+_lock = threading.Lock()
+
+
+def _run():
+    started = time.perf_counter()
+    for name, warm in ADAPTERS.items():
+        t0 = time.perf_counter()
+        try:
+            warm()
+            _state['adapters'][name] = {'ok': True, 'ms': round((time.perf_counter() - t0) * 1000, 1)}
+        except Exception as e:
+            _state['adapters'][name] = {'ok': False, 'error': str(e)}
+            logger.warning("warmup_failed", extra={"adapter": name, "error": str(e)})
+    _state['done'] = True
+    logger.info("warmup_done", extra={"ms": round((time.perf_counter() - started) * 1000, 1)})
+
+
+def start_background_warmup():
+    with _lock:
+        if _state['started']:
+            return
+        _state['started'] = True
+    threading.Thread(target=_run, name='adapter-warmup', daemon=True).start()
+
+
+def status():
+    return {
+        'ready': _state['done'],
+        'started': _state['started'],
+        'adapters': dict(_state['adapters']),
+    }
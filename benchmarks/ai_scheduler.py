@@ -0,0 +1,147 @@
+"""
+AI scheduler under a mixed, overloaded workload: plain FIFO vs weighted
+classes with per-user fair queuing (api/ai_scheduler.py).
+
+Starts the fake Gemini server in process and drives gemini.generate() from
+many threads with Poisson arrivals: a chat flood, one power user uploading
+reports nonstop, ordinary users' reports, and mission proofs. Together they
+offer several times what AI_MAX_CONCURRENCY slots can serve at the fake's
+latency. For each mode it reports, per group, how many calls were served or
+fell back at their deadline, and the latency of the served ones.
+
+    python benchmarks/ai_scheduler.py --duration 20 --capacity 4 --latency-ms 400
+
+The fair mode should serve ordinary reports and proofs quickly while chat and
+the power user absorb the overload. Exits non-zero if, in fair mode, any
+ordinary report or proof misses its deadline.
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+
+from common import setup_django, summarize, write_results
+from fakes import FakeConfig, serve
+
+# group -> (class, arrivals per second, user ids to pick from; None = anonymous)
+WORKLOAD = {
+    "chat": ("chat", 15, [None] + list(range(1000, 1200))),
+    "power user reports": ("report", 8, [1]),
+    "other reports": ("report", 2, list(range(2, 102))),
+    "proofs": ("proof", 1, list(range(2, 102))),
+}
+
+
+def run_mode(mode, args, classes):
+    from api import ai_scheduler, gemini
+
+    if mode == "fifo":
+        # One queue, one flow: first come, first served (same deadlines)
+        ai_scheduler._scheduler = ai_scheduler.Scheduler(args.capacity, {"fifo": {"weight": 1}})
+    else:
+        ai_scheduler._scheduler = ai_scheduler.Scheduler(args.capacity, classes)
+
+    latencies, fallbacks, lock = defaultdict(list), defaultdict(int), threading.Lock()
+    threads = []
+
+    def call(group, priority, user):
+        deadline = classes[priority]["deadline"]
+        started = time.monotonic()
+        try:
+            if mode == "fifo":
+                priority, user = "fifo", None
+            with ai_scheduler.job(priority, user, deadline):
+                gemini.generate("fake", "How do I earn XP?")
+        except ai_scheduler.DeadlineExceeded:
+            with lock:
+                fallbacks[group] += 1
+            return
+        with lock:
+            latencies[group].append(time.monotonic() - started)
+
+    def arrivals(group, priority, rate, users, seed):
+        rng = random.Random(seed)
+        next_at = time.monotonic()
+        while True:
+            next_at += rng.expovariate(rate)
+            if next_at >= stop_at:
+                return
+            time.sleep(max(0, next_at - time.monotonic()))
+            thread = threading.Thread(target=call, args=(group, priority, rng.choice(users)), daemon=True)
+            thread.start()
+            with lock:
+                threads.append(thread)
+
+    stop_at = time.monotonic() + args.duration
+    generators = [
+        threading.Thread(target=arrivals, args=(group, priority, rate * args.load, users, args.seed + i))
+        for i, (group, (priority, rate, users)) in enumerate(WORKLOAD.items())
+    ]
+    for thread in generators:
+        thread.start()
+    for thread in generators:
+        thread.join()
+    for thread in threads:
+        thread.join()
+
+    results = {}
+    for group in WORKLOAD:
+        summary = summarize(latencies[group])
+        summary["submitted"] = summary["count"] + fallbacks[group]
+        summary["fell_back"] = fallbacks[group]
+        results[group] = summary
+    return results
+
+
+def main(args):
+    server = serve(0, FakeConfig(args.latency_ms, args.jitter_ms, seed=args.seed))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("LOG_LEVEL", "ERROR")  # one log line per call otherwise
+    # This measures the per-process scheduler, not the shared quota bucket
+    os.environ.setdefault("AI_QUOTA_RATE", "")
+    setup_django()
+    from django.conf import settings
+    from api import gemini
+
+    classes = settings.AI_SCHEDULER_CLASSES
+    gemini.get_client("fake")
+    offered = sum(rate for _, rate, _ in WORKLOAD.values()) * args.load
+    capacity = args.capacity / (args.latency_ms / 1000)
+    print(f"Offered {offered:.0f} calls/s against ~{capacity:.0f}/s of capacity "
+          f"({args.capacity} slots x {args.latency_ms}ms)\n")
+
+    results, failed = {}, False
+    for mode in ("fifo", "fair"):
+        results[mode] = run_mode(mode, args, classes)
+        print(f"{mode}")
+        print(f"  {'':<20}  " + "  ".join(f"{c:>9}" for c in ("submitted", "served", "fell_back", "p50_ms", "p95_ms")))
+        for group, row in results[mode].items():
+            print(f"  {group:<20}  " + "  ".join(
+                f"{row[c]:>9}" for c in ("submitted", "count", "fell_back", "p50_ms", "p95_ms")))
+        print()
+
+    for group in ("other reports", "proofs"):
+        if results["fair"][group]["fell_back"]:
+            failed = True
+            print(f"FAIL: {results['fair'][group]['fell_back']} {group} missed their deadline in fair mode")
+
+    write_results(args.output, "ai_scheduler", results, duration=args.duration, capacity=args.capacity,
+                  latency_ms=args.latency_ms, load=args.load)
+    server.shutdown()
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20, help="seconds of arrivals per mode")
+    parser.add_argument("--capacity", type=int, default=4, help="AI_MAX_CONCURRENCY to simulate")
+    parser.add_argument("--latency-ms", type=float, default=400, help="fake Gemini latency")
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--load", type=float, default=1.0, help="multiply every arrival rate")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results here")
+    main(parser.parse_args())
@@ -0,0 +1,120 @@
+"""
+Partner bulk ingest throughput: POST /api/reports/bulk/ with NDJSON.
+
+Creates (or reuses) a partner account with the bulk ingest permission, sends
+--rows synthetic sensor reports in requests of --batch rows from
+--concurrency threads, and reports rows per second. It then re-sends the
+same rows to check that every one comes back as a duplicate, and with
+--cleanup deletes what it created.
+
+    python benchmarks/bulk_ingest.py --base-url http://127.0.0.1:8000 --rows 20000 --batch 2000
+
+Run it with the same environment (DATABASE_URL, SECRET_KEY) as the server:
+it writes the partner account directly. Exits non-zero if a row is lost,
+rejected, or not recognized as a duplicate on the second pass.
+"""
+import argparse
+import json
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from common import setup_django, write_results
+from run import Client
+
+PARTNER = "bench_partner"
+
+
+def partner_token():
+    from django.contrib.auth.models import Permission, User
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user, _ = User.objects.get_or_create(username=PARTNER)
+    user.user_permissions.add(Permission.objects.get(codename="bulk_ingest_report"))
+    return user, str(AccessToken.for_user(user))
+
+
+def make_rows(count, run_id, image_url):
+    rows = []
+    for i in range(count):
+        row = {
+            "external_id": f"{run_id}-{i}",
+            "title": "Sensor: pothole detected",
+            "description": f"Road surface sensor {i % 500} detected a pothole",
+            "category": "Pothole",
+            "location": f"Sensor {i % 500}",
+            "latitude": 12.9 + (i % 1000) / 10000,
+            "longitude": 77.5 + (i % 997) / 10000,
+        }
+        if image_url:
+            row["image_url"] = image_url
+        rows.append(json.dumps(row).encode())
+    return rows
+
+
+def send_all(client, token, rows, batch, concurrency):
+    chunks = [b"\n".join(rows[i:i + batch]) for i in range(0, len(rows), batch)]
+    statuses = Counter()
+
+    def post(body):
+        status, content = client.call("POST", "/api/reports/bulk/", token=token, body=body,
+                                      content_type="application/x-ndjson")
+        if status != 200:
+            return Counter({f"http_{status}": body.count(b"\n") + 1})
+        counts = Counter()
+        for line in content.splitlines():
+            result = json.loads(line)
+            if "status" in result:
+                counts[result["status"]] += 1
+        return counts
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for counts in pool.map(post, chunks):
+            statuses.update(counts)
+    return statuses, time.perf_counter() - started
+
+
+def main(args):
+    setup_django()
+    from api.models import Report
+
+    user, token = partner_token()
+    client = Client(args.base_url, args.timeout)
+    run_id = uuid.uuid4().hex[:8]
+    rows = make_rows(args.rows, run_id, args.image_url)
+
+    first, first_s = send_all(client, token, rows, args.batch, args.concurrency)
+    second, second_s = send_all(client, token, rows, args.batch, args.concurrency)
+    results = {
+        "insert": {**first, "seconds": round(first_s, 2), "rows_per_s": round(args.rows / first_s)},
+        "resend": {**second, "seconds": round(second_s, 2), "rows_per_s": round(args.rows / second_s)},
+    }
+    for name, row in results.items():
+        counts = ", ".join(f"{k}={v}" for k, v in row.items() if k not in ("seconds", "rows_per_s"))
+        print(f"{name:<7} {args.rows} rows in {row['seconds']}s = {row['rows_per_s']} rows/s ({counts})")
+
+    stored = Report.objects.filter(user=user, external_id__startswith=f"{run_id}-").count()
+    print(f"stored: {stored}")
+    write_results(args.output, "bulk_ingest", results, rows=args.rows, batch=args.batch, concurrency=args.concurrency)
+
+    if args.cleanup:
+        Report.objects.filter(user=user, external_id__startswith=f"{run_id}-").delete()
+
+    if first["created"] != args.rows or second["duplicate"] != args.rows or stored != args.rows:
+        raise SystemExit("FAIL: rows were lost, rejected or duplicated")
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=2000, help="rows per request")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--image-url", help="image reference to attach to every row (queued for verification)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--cleanup", action="store_true", help="delete the created reports afterwards")
+    parser.add_argument("--output", help="write JSON results here")
+    main(parser.parse_args())
@@ -0,0 +1,76 @@
+"""Shared helpers for the benchmark scripts: percentiles, result files, Django setup."""
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors=0, elapsed=None):
+    """Latency summary in milliseconds, plus throughput when elapsed is given."""
+    values = sorted(latencies)
+    summary = {
+        "count": len(values),
+        "errors": errors,
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+    }
+    if elapsed:
+        summary["throughput_rps"] = round(len(values) / elapsed, 2)
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(path, name, results, **meta):
+    payload = {
+        "benchmark": name,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "meta": meta,
+        "results": results,
+    }
+    text = json.dumps(payload, indent=2)
+    if path == "-":
+        print(text)
+    elif path:
+        Path(path).write_text(text + "\n")
+        print(f"Results written to {path}")
+    return payload
+
+
+def print_table(results):
+    columns = ["count", "errors", "p50_ms", "p95_ms", "p99_ms", "throughput_rps"]
+    width = max([len(k) for k in results] + [8])
+    print(f"{'':<{width}}  " + "  ".join(f"{c:>14}" for c in columns))
+    for name, row in results.items():
+        print(f"{name:<{width}}  " + "  ".join(f"{row.get(c, ''):>14}" for c in columns))
+
+
+def setup_django():
+    """For in-process benchmarks: make the project importable and configure Django."""
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
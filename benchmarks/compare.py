@@ -0,0 +1,47 @@
+"""
+Compare two benchmark result files (e.g. from two commits).
+
+    python benchmarks/compare.py before.json after.json
+
+Latency columns show after vs before; negative is better. Throughput and
+rows-per-second style metrics are compared the other way round.
+"""
+import json
+import sys
+
+LOWER_IS_BETTER = ("_ms", "_seconds", "_mb", "errors")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def change(before, after, key):
+    if not isinstance(before, (int, float)) or not isinstance(after, (int, float)):
+        return ""
+    if before == 0:
+        return "" if after == 0 else "new"
+    pct = (after - before) / before * 100
+    better = pct < 0 if key.endswith(LOWER_IS_BETTER) else pct > 0
+    return f"{pct:+.1f}%{' ✓' if better and abs(pct) >= 2 else ''}"
+
+
+def main(before_path, after_path):
+    before, after = load(before_path), load(after_path)
+    print(f"{before['benchmark']}: {before['commit']} -> {after['commit']}")
+    for name, row in after["results"].items():
+        old = before["results"].get(name)
+        if old is None:
+            print(f"\n{name}: (new)")
+            continue
+        print(f"\n{name}")
+        for key, value in row.items():
+            if key in old:
+                print(f"  {key:<18} {old[key]!s:>12} -> {value!s:>12}  {change(old[key], value, key)}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        raise SystemExit(__doc__)
+    main(sys.argv[1], sys.argv[2])
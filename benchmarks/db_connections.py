@@ -0,0 +1,78 @@
+"""
+Per-request database connection overhead, in process.
+
+Simulates request/response cycles (firing Django's request_started and
+request_finished signals, which is where connections are closed or returned
+to the pool) with one small query each, from several worker threads.
+Run it once per DB_CONNECTION_MODE against the real database and compare:
+
+    DB_CONNECTION_MODE=none       python benchmarks/db_connections.py --output none.json
+    DB_CONNECTION_MODE=persistent python benchmarks/db_connections.py --output persistent.json
+    DB_CONNECTION_MODE=pool       python benchmarks/db_connections.py --output pool.json
+    python benchmarks/compare.py none.json pool.json
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import print_table, setup_django, summarize, write_results
+
+
+def main(args):
+    setup_django()
+    from django.conf import settings
+    from django.core.signals import request_finished, request_started
+    from django.db import connection, connections
+    from django.db.backends.signals import connection_created
+
+    new_connections = 0
+    lock = threading.Lock()
+
+    def count_connection(sender, **kwargs):
+        nonlocal new_connections
+        with lock:
+            new_connections += 1
+
+    connection_created.connect(count_connection)
+
+    latencies = []
+
+    def worker(n):
+        local = []
+        for _ in range(n):
+            started = time.perf_counter()
+            request_started.send(sender=None)
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+            finally:
+                request_finished.send(sender=None)
+            local.append(time.perf_counter() - started)
+        connections.close_all()
+        with lock:
+            latencies.extend(local)
+
+    per_thread = args.requests // args.threads
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(worker, [per_thread] * args.threads))
+    elapsed = time.perf_counter() - started
+
+    mode = settings.DB_CONNECTION_MODE
+    row = summarize(latencies, elapsed=elapsed)
+    row["new_connections"] = new_connections
+    results = {"request cycle": row}
+    print_table(results)
+    print(f"new connections opened: {new_connections} for {len(latencies)} requests")
+    write_results(args.output, "db_connections", results, mode=mode, threads=args.threads,
+                  engine=settings.DATABASES["default"]["ENGINE"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4, help="concurrent workers (threads)")
+    parser.add_argument("--output")
+    main(parser.parse_args())
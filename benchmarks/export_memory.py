@@ -0,0 +1,144 @@
+"""
+Report export memory: does GET /api/reports/export/ (and manage.py
+export_reports) stay flat as the export grows?
+
+Seeds one synthetic category per --sizes entry (e.g. 1,000 / 10,000 /
+100,000 / 1,000,000 reports) and, for each, exports just that category:
+
+  * through `manage.py export_reports` in a child process, recording its
+    peak RSS, and
+  * through the endpoint, recording time to first byte, rows/s and (with
+    --server-pid) the server's highest RSS sampled while the body streams.
+
+    python benchmarks/export_memory.py --base-url http://127.0.0.1:8000 --server-pid $(cat server.pid)
+
+Run it with the same environment (DATABASE_URL, SECRET_KEY) as the server.
+Seeded rows are kept between runs (re-seeding only what is missing) until
+--cleanup. Exits non-zero if an export comes back short.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from common import ROOT, setup_django, write_results
+
+OWNER = "bench_export"
+STAFF = "bench_export_staff"
+
+
+def category(size):
+    return f"BenchExport-{size}"
+
+
+def seed(user, size, batch=5000):
+    from api.models import Report
+
+    have = Report.objects.filter(category=category(size)).count()
+    for start in range(have, size, batch):
+        Report.objects.bulk_create([
+            Report(user=user, title=f"Export bench {i}", description="Synthetic row for the export benchmark",
+                   category=category(size), location=f"Block {i % 977}", status="pending",
+                   latitude=12.9 + (i % 1000) / 10000, longitude=77.5 + (i % 997) / 10000, xp_awarded=True)
+            for i in range(start, min(size, start + batch))
+        ])
+
+
+def rss_kb(pid, field="VmRSS"):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def run_command(size, until):
+    process = subprocess.Popen(
+        [sys.executable, "manage.py", "export_reports", "--category", category(size), "--until", until,
+         "--output", os.devnull],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    started = time.perf_counter()
+    _, status, usage = os.wait4(process.pid, 0)
+    if status:
+        raise SystemExit(f"export_reports failed for {size} rows")
+    # ru_maxrss is in KB on Linux
+    return {"seconds": round(time.perf_counter() - started, 2), "peak_rss_mb": round(usage.ru_maxrss / 1024, 1)}
+
+
+def fetch(base_url, token, size, until, server_pid, timeout):
+    query = urlencode({"output": "csv", "category": category(size), "until": until})
+    request = Request(f"{base_url.rstrip('/')}/api/reports/export/?{query}",
+                      headers={"Authorization": f"Bearer {token}"})
+    started = time.perf_counter()
+    first_byte, lines, peak = None, 0, 0
+    with urlopen(request, timeout=timeout) as response:
+        while chunk := response.read(64 * 1024):
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            lines += chunk.count(b"\n")
+            if server_pid:
+                peak = max(peak, rss_kb(server_pid) or 0)
+    elapsed = time.perf_counter() - started
+    result = {
+        "rows": lines - 1,  # header
+        "ttfb_ms": round((first_byte or elapsed) * 1000, 1),
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round((lines - 1) / elapsed),
+    }
+    if server_pid:
+        result["server_rss_mb"] = round(peak / 1024, 1)
+    return result
+
+
+def main(args):
+    setup_django()
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+    from api.models import Report
+
+    owner, _ = User.objects.get_or_create(username=OWNER)
+    staff, _ = User.objects.get_or_create(username=STAFF, defaults={"is_staff": True})
+    token = str(AccessToken.for_user(staff))
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+
+    results, short = {}, False
+    for size in sizes:
+        started = time.perf_counter()
+        seed(owner, size)
+        print(f"{size:>9} rows seeded ({time.perf_counter() - started:.1f}s)")
+        # Explicit cut-off: the default one (now minus SYNC_LAG_SECONDS) would skip rows seeded just now
+        until = datetime.now(timezone.utc).isoformat()
+        command = run_command(size, until)
+        endpoint = fetch(args.base_url, token, size, until, args.server_pid, args.timeout)
+        short |= endpoint["rows"] != size
+        results[size] = {"command": command, "endpoint": endpoint}
+        server = f", server RSS {endpoint['server_rss_mb']} MB" if args.server_pid else ""
+        print(f"{'':>9} command: {command['seconds']}s, peak RSS {command['peak_rss_mb']} MB")
+        print(f"{'':>9} endpoint: {endpoint['rows']} rows, first byte {endpoint['ttfb_ms']} ms, "
+              f"{endpoint['rows_per_s']} rows/s{server}")
+
+    write_results(args.output, "export_memory", results, sizes=sizes)
+    if args.cleanup:
+        Report.objects.filter(category__startswith="BenchExport-").delete()
+    if short:
+        raise SystemExit("FAIL: an export came back short")
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated export sizes")
+    parser.add_argument("--server-pid", type=int, help="sample this process's RSS during the endpoint export")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--cleanup", action="store_true", help="delete the seeded reports afterwards")
+    parser.add_argument("--output", help="write JSON results here")
+    main(parser.parse_args())
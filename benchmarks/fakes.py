@@ -0,0 +1,154 @@
+"""
+Local fake Gemini, Twilio and Cloudinary APIs for benchmarks.
+
+One threaded HTTP server answers all three, with configurable latency and
+error rates, so scenario runs never touch (or pay for) the real services:
+
+    python benchmarks/fakes.py --port 9900 --latency-ms 400 --jitter-ms 150 --error-rate 0.05
+
+Then start the app with:
+
+    GEMINI_API_KEY=fake GEMINI_BASE_URL=http://127.0.0.1:9900
+    TWILIO_ACCOUNT_SID=ACfake TWILIO_AUTH_TOKEN=fake TWILIO_PHONE_NUMBER=+15550000000
+    ADMIN_PHONE_NUMBER=+15550000001 TWILIO_BASE_URL=http://127.0.0.1:9900
+    CLOUDINARY_UPLOAD_PREFIX=http://127.0.0.1:9900
+
+GET /_stats returns per-service request and error counts.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeConfig:
+    def __init__(self, latency_ms=300, jitter_ms=100, error_rate=0.0, match_rate=0.85, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.match_rate = match_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def count(self, service, key):
+        with self.lock:
+            entry = self.stats.setdefault(service, {"requests": 0, "errors": 0})
+            entry[key] += 1
+
+    def delay(self):
+        with self.lock:
+            seconds = max(0.0, self.rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        time.sleep(seconds)
+
+    def should_fail(self):
+        with self.lock:
+            return self.rng.random() < self.error_rate
+
+    def verdict(self):
+        with self.lock:
+            match = self.rng.random() < self.match_rate
+            confidence = self.rng.randint(70, 98) if match else self.rng.randint(60, 95)
+        return match, confidence
+
+
+def make_handler(cfg):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _drain(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+
+        def do_GET(self):
+            if self.path == "/_stats":
+                with cfg.lock:
+                    return self._send(200, cfg.stats)
+            self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            self._drain()
+            if ":generateContent" in self.path:
+                return self._gemini()
+            if self.path.endswith("/Messages.json"):
+                return self._twilio()
+            if "/upload" in self.path or "/destroy" in self.path:
+                return self._cloudinary()
+            self._send(404, {"error": "not found"})
+
+        def _gemini(self):
+            cfg.count("gemini", "requests")
+            cfg.delay()
+            if cfg.should_fail():
+                cfg.count("gemini", "errors")
+                return self._send(429, {"error": {"code": 429, "message": "Resource exhausted (fake)", "status": "RESOURCE_EXHAUSTED"}})
+            match, confidence = cfg.verdict()
+            text = json.dumps({"match": match, "confidence": confidence, "reason": "Fake verdict from benchmark server."})
+            self._send(200, {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+                "usageMetadata": {"promptTokenCount": 1, "candidatesTokenCount": 1, "totalTokenCount": 2},
+            })
+
+        def _twilio(self):
+            cfg.count("twilio", "requests")
+            cfg.delay()
+            if cfg.should_fail():
+                cfg.count("twilio", "errors")
+                return self._send(503, {"code": 20503, "message": "Service unavailable (fake)", "status": 503})
+            self._send(201, {"sid": "SM" + uuid.uuid4().hex, "status": "queued"})
+
+        def _cloudinary(self):
+            cfg.count("cloudinary", "requests")
+            cfg.delay()
+            if cfg.should_fail():
+                cfg.count("cloudinary", "errors")
+                return self._send(500, {"error": {"message": "Upload failed (fake)"}})
+            if "/destroy" in self.path:
+                return self._send(200, {"result": "ok"})
+            public_id = f"media/bench/{uuid.uuid4().hex}"
+            self._send(200, {
+                "public_id": public_id,
+                "version": 1,
+                "resource_type": "image",
+                "format": "png",
+                "url": f"http://res.cloudinary.com/fake/image/upload/v1/{public_id}.png",
+                "secure_url": f"https://res.cloudinary.com/fake/image/upload/v1/{public_id}.png",
+            })
+
+    return Handler
+
+
+def serve(port, cfg):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(cfg))
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9900)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--match-rate", type=float, default=0.85)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    cfg = FakeConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.match_rate, args.seed)
+    print(f"Fake Gemini/Twilio/Cloudinary listening on http://127.0.0.1:{args.port}")
+    serve(args.port, cfg).serve_forever()
@@ -0,0 +1,139 @@
+"""
+Hotspot detection at scale: how long does `manage.py detect_hotspots` take
+on --reports reports, and does it find a planted spike?
+
+Seeds --reports synthetic reports (default 1,000,000) spread over the last
+210 days around a few dozen neighbourhoods of the synthetic city, plus a
+burst of --spike "Water Leak" reports within ~200m in the last 12 hours.
+It then times hotspots.detect() (load and analysis separately, from the
+log line) and checks that the burst is flagged as rising in the 1-day window.
+
+    DATABASE_URL=sqlite:////tmp/hotspots.sqlite3 python manage.py migrate
+    DATABASE_URL=sqlite:////tmp/hotspots.sqlite3 python benchmarks/hotspots.py
+
+Use a scratch database: the seeded rows are inserted with bulk_create (no
+signals, counters or map grid) and left in place, so later runs reuse them.
+"""
+import argparse
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from common import setup_django, write_results
+
+OWNER = "bench_hotspots"
+SPAN_DAYS = 210
+NEIGHBOURHOODS = 40
+CATEGORIES = ["Infrastructure", "Garbage", "Streetlight", "Water Leak", "Pothole", "Safety"]
+# Planted spike, ~3km north-east of the synthetic city centre
+SPIKE_OFFSET = (0.021, 0.024)
+
+
+def seed(user, count, spike, rng):
+    from django.utils import timezone
+    from api.management.commands.seed_synthetic import CENTER_LAT, CENTER_LNG
+    from api.models import Report
+
+    now = timezone.now()
+    centres = np.column_stack([
+        CENTER_LAT + rng.normal(0, 0.05, NEIGHBOURHOODS),
+        CENTER_LNG + rng.normal(0, 0.05, NEIGHBOURHOODS),
+    ])
+    home = rng.integers(0, NEIGHBOURHOODS, count)
+    lat = centres[home, 0] + rng.normal(0, 0.01, count)
+    lng = centres[home, 1] + rng.normal(0, 0.01, count)
+    age = rng.uniform(0, SPAN_DAYS * 86400, count)
+    category = rng.integers(0, len(CATEGORIES), count)
+
+    spike_lat = CENTER_LAT + SPIKE_OFFSET[0] + rng.normal(0, 0.001, spike)
+    spike_lng = CENTER_LNG + SPIKE_OFFSET[1] + rng.normal(0, 0.001, spike)
+    spike_age = rng.uniform(0, 12 * 3600, spike)
+
+    rows = [(a, b, c, CATEGORIES[d]) for a, b, c, d in zip(lat, lng, age, category)]
+    rows += [(a, b, c, "Water Leak") for a, b, c in zip(spike_lat, spike_lng, spike_age)]
+
+    # auto_now_add would overwrite the backdated created_at on insert
+    field = Report._meta.get_field("created_at")
+    field.auto_now_add = False
+    try:
+        for start in range(0, len(rows), 10000):
+            Report.objects.bulk_create([
+                Report(user=user, title="Hotspot bench", description="Synthetic", location="Bench",
+                       category=cat, latitude=float(a), longitude=float(b), status="pending", xp_awarded=True,
+                       created_at=now - timedelta(seconds=float(age)))
+                for a, b, age, cat in rows[start:start + 10000]
+            ])
+    finally:
+        field.auto_now_add = True
+
+
+def main(args):
+    setup_django()
+    import logging
+
+    from django.contrib.auth.models import User
+    from django.db.models import Max
+    from api import hotspots
+    from api.management.commands.seed_synthetic import CENTER_LAT, CENTER_LNG
+    from api.models import Report
+
+    user, _ = User.objects.get_or_create(username=OWNER)
+    have = Report.objects.filter(user=user).count()
+    if have < args.reports + args.spike:
+        started = time.perf_counter()
+        Report.objects.filter(user=user).delete()
+        seed(user, args.reports, args.spike, np.random.default_rng(args.seed))
+        print(f"seeded {args.reports + args.spike} reports in {time.perf_counter() - started:.0f}s")
+    # Analyse as of the seeding time, so re-runs later see the same spike
+    now = Report.objects.filter(user=user).aggregate(Max("created_at"))["created_at__max"] + timedelta(minutes=5)
+
+    timings = {}
+
+    class Timings(logging.Handler):
+        def emit(self, record):
+            timings.update(load_s=record.load_seconds, analyze_s=record.analyze_seconds, reports=record.reports)
+
+    logging.getLogger("api.hotspots").addHandler(Timings())
+    logging.getLogger("api.hotspots").setLevel(logging.INFO)
+
+    runs = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        found = hotspots.detect(now=now)
+        runs.append(time.perf_counter() - started)
+
+    spike_lat, spike_lng = CENTER_LAT + SPIKE_OFFSET[0], CENTER_LNG + SPIKE_OFFSET[1]
+    rising = [h for h in found if h.rising and h.window_days == min(h.window_days for h in found)]
+    caught = [h for h in rising if h.south - 0.003 <= spike_lat <= h.north + 0.003
+              and h.west - 0.003 <= spike_lng <= h.east + 0.003]
+    results = {
+        "reports": timings.get("reports"),
+        "best_s": round(min(runs), 2),
+        "load_s": timings.get("load_s"),
+        "analyze_s": timings.get("analyze_s"),
+        "hotspots": len(found),
+        "rising_1d": len(rising),
+        "spike_cells": len(caught),
+        "other_rising_1d": len(rising) - len(caught),
+    }
+    print(f"{results['reports']} reports: best {results['best_s']}s "
+          f"(load {results['load_s']}s, analysis {results['analyze_s']}s)")
+    print(f"{len(found)} hotspots stored, {len(rising)} rising in the shortest window, "
+          f"{len(caught)} of them at the planted spike")
+    for h in caught:
+        print(f"  {h.category or 'all':<12} {h.count} reports vs baseline {h.baseline:.1f}, score {h.score:.1f}")
+    write_results(args.output, "hotspots", results, repeat=args.repeat)
+    if not caught:
+        raise SystemExit("FAIL: the planted spike was not flagged")
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--spike", type=int, default=40, help="reports in the planted burst")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3, help="timed detect() runs")
+    parser.add_argument("--output", help="write JSON results here")
+    main(parser.parse_args())
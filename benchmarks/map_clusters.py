@@ -0,0 +1,96 @@
+"""
+Map clusters: GET /api/map/clusters/ latency and payload size per zoom.
+
+For a phone-sized and a desktop-sized viewport centred on the synthetic city
+(manage.py seed_synthetic), at each zoom in --zooms, it times --requests
+calls and reports clusters, response bytes and how many reports (pins) the
+box holds, i.e. what a client clustering on its own would have to download.
+
+    python manage.py seed_synthetic --users 50000
+    python manage.py rebuild_map_grid
+    python benchmarks/map_clusters.py --base-url http://127.0.0.1:8000
+
+Run it with the same environment as the server (it counts pins in the
+database). Exits non-zero if a response has more than MAP_CLUSTER_MAX_CELLS
+clusters or its counts do not add up to the reports in the cells it covers.
+"""
+import argparse
+import json
+import math
+import time
+
+from common import setup_django, summarize, write_results
+from run import Client
+
+VIEWPORTS = {"phone": (400, 800), "desktop": (1920, 1080)}
+
+
+def viewport_bbox(lat, lng, zoom, width, height):
+    """west, south, east, north of a width x height px map centred on (lat, lng)."""
+    size = 256 * 2 ** zoom
+    cx = (lng + 180) / 360 * size
+    cy = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * size
+
+    def to_lat(y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / size))))
+
+    def to_lng(x):
+        return x / size * 360 - 180
+
+    return (to_lng(cx - width / 2), to_lat(cy + height / 2), to_lng(cx + width / 2), to_lat(cy - height / 2))
+
+
+def main(args):
+    setup_django()
+    from django.conf import settings
+    from api.management.commands.seed_synthetic import CENTER_LAT, CENTER_LNG
+    from api.models import Report
+
+    client = Client(args.base_url, args.timeout)
+    zooms = [int(z) for z in args.zooms.split(",")]
+    results, failed = {}, False
+    print(f"{'viewport':<8} {'zoom':>4} {'used':>4} {'clusters':>8} {'bytes':>8} {'pins':>8} {'p50 ms':>7} {'p95 ms':>7}")
+    for name, (width, height) in VIEWPORTS.items():
+        for zoom in zooms:
+            west, south, east, north = viewport_bbox(CENTER_LAT, CENTER_LNG, zoom, width, height)
+            path = f"/api/map/clusters/?bbox={west:.6f},{south:.6f},{east:.6f},{north:.6f}&zoom={zoom}"
+            latencies, body = [], b""
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                status, body = client.call("GET", path)
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    raise SystemExit(f"{path}: HTTP {status} {body[:200]!r}")
+            payload = json.loads(body)
+            clusters = payload["clusters"]
+            pins = Report.objects.filter(latitude__range=(south, north), longitude__range=(west, east)).count()
+            row = {
+                **summarize(latencies),
+                "zoom_used": payload["zoom"],
+                "clusters": len(clusters),
+                "bytes": len(body),
+                "reports_in_clusters": sum(c["count"] for c in clusters),
+                "pins_in_box": pins,
+            }
+            results[f"{name}_z{zoom}"] = row
+            print(f"{name:<8} {zoom:>4} {payload['zoom']:>4} {len(clusters):>8} {len(body):>8} {pins:>8} "
+                  f"{row['p50_ms']:>7} {row['p95_ms']:>7}")
+            # Clusters cover whole cells, so they can hold a few more reports than the box
+            if len(clusters) > settings.MAP_CLUSTER_MAX_CELLS or row["reports_in_clusters"] < pins:
+                failed = True
+
+    write_results(args.output, "map_clusters", results, zooms=zooms, requests=args.requests,
+                  reports=Report.objects.count())
+    if failed:
+        raise SystemExit("FAIL: too many clusters, or clusters missing reports")
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--zooms", default="8,10,12,14,16")
+    parser.add_argument("--requests", type=int, default=50, help="timed calls per viewport and zoom")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="write JSON results here")
+    main(parser.parse_args())
@@ -0,0 +1,175 @@
+"""
+Moderation queue at a large backlog, in process.
+
+Creates a synthetic backlog of pending reports and mission proofs (default
+10^5 items, owned by the seed_synthetic users), then measures:
+
+- first page      queue_page() for a fresh moderator
+- deep pages      walking the cursor through --pages consecutive pages
+- claim_next      several moderators leasing batches concurrently; every item
+                  must be leased by exactly one of them
+- decide          approving leased items
+
+    python manage.py seed_synthetic --users 1000
+    python benchmarks/moderation_queue.py --items 100000 --output queue.json
+
+The backlog is deleted afterwards unless --keep is given (a kept backlog is
+reused on the next run). Run against Postgres for meaningful contention
+numbers; SQLite serializes the concurrent claims.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from common import print_table, setup_django, summarize, write_results
+
+MARKER = "bench_queue"
+
+
+def build_backlog(items, proof_share, batch_size):
+    from django.contrib.auth.models import User
+    from api.management.commands.seed_synthetic import SYNTHETIC_PREFIX
+    from api.models import Mission, Report, UserMission
+
+    existing = Report.objects.filter(title__startswith=MARKER).count() + \
+        UserMission.objects.filter(ai_analysis=MARKER).count()
+    if existing >= items:
+        print(f"reusing backlog of {existing} items")
+        return
+    users = list(User.objects.filter(username__startswith=SYNTHETIC_PREFIX).values_list("id", flat=True))
+    missions = list(Mission.objects.values_list("id", flat=True))
+    if not users or not missions:
+        raise SystemExit("No synthetic users/missions; run `python manage.py seed_synthetic` first.")
+
+    rng = random.Random(7)
+
+    def confidence():
+        # Roughly a third AI fallbacks, the rest low-confidence matches
+        return 0 if rng.random() < 0.35 else rng.randint(1, 69)
+
+    proofs = int((items - existing) * proof_share)
+    reports = items - existing - proofs
+    started = time.perf_counter()
+    Report.objects.bulk_create(
+        (Report(user_id=rng.choice(users), title=f"{MARKER} {i}", description="Synthetic queue item",
+                location="Bench", status="pending", ai_confidence=confidence(), ai_analysis="bench")
+         for i in range(reports)),
+        batch_size=batch_size,
+    )
+    UserMission.objects.bulk_create(
+        (UserMission(user_id=rng.choice(users), mission_id=rng.choice(missions), status="pending",
+                     proof_image="mission_proofs/bench.jpg", ai_confidence=confidence(), ai_analysis=MARKER)
+         for _ in range(proofs)),
+        batch_size=batch_size,
+    )
+    print(f"created {reports} reports and {proofs} proofs in {time.perf_counter() - started:.1f}s")
+
+
+def clear_backlog():
+    from api.models import Report, UserMission
+
+    Report.objects.filter(title__startswith=MARKER).delete()
+    UserMission.objects.filter(ai_analysis=MARKER).delete()
+
+
+def moderators(n):
+    from django.contrib.auth.models import User
+
+    staff = []
+    for i in range(n):
+        user, _ = User.objects.get_or_create(username=f"bench_moderator_{i}", defaults={"is_staff": True})
+        staff.append(user)
+    return staff
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def main(args):
+    setup_django()
+    from django.db import connections
+    from api import moderation
+    from api.models import Report, UserMission
+
+    build_backlog(args.items, args.proof_share, args.batch_size)
+    staff = moderators(args.moderators)
+    # Start from a clean slate of leases
+    Report.objects.filter(title__startswith=MARKER).update(claimed_by=None, claim_expires_at=None)
+    UserMission.objects.filter(ai_analysis=MARKER).update(claimed_by=None, claim_expires_at=None)
+    results = {}
+
+    # First page
+    latencies = [timed(moderation.queue_page, staff[0], limit=args.page_size)[0] for _ in range(args.repeat)]
+    results["first page"] = summarize(latencies)
+
+    # Deep pagination
+    latencies, cursor, seen = [], None, 0
+    for _ in range(args.pages):
+        elapsed, (items, next_cursor) = timed(moderation.queue_page, staff[0], limit=args.page_size, cursor=cursor)
+        latencies.append(elapsed)
+        seen += len(items)
+        if not next_cursor:
+            break
+        cursor = moderation.decode_cursor(next_cursor)
+    results["deep pages"] = summarize(latencies)
+
+    # Concurrent claim_next
+    claimed, lock, claim_latencies = Counter(), threading.Lock(), []
+
+    def work(user):
+        local = []
+        try:
+            for _ in range(args.claims):
+                elapsed, items = timed(moderation.claim_next, user, args.claim_batch)
+                local.append((elapsed, items))
+        finally:
+            connections.close_all()
+        with lock:
+            for elapsed, items in local:
+                claim_latencies.append(elapsed)
+                for item in items:
+                    claimed[(item["kind"], item["id"], user.pk)] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(len(staff)) as pool:
+        list(pool.map(work, staff))
+    results["claim_next"] = summarize(claim_latencies, elapsed=time.perf_counter() - started)
+    per_item = Counter((kind, pk) for kind, pk, _ in claimed)
+    collisions = sum(1 for n in per_item.values() if n > 1)
+
+    # Decide on what the first moderator holds
+    held = [(kind, pk) for kind, pk, owner in claimed if owner == staff[0].pk]
+    latencies = [timed(moderation.decide, kind, pk, staff[0], True)[0] for kind, pk in held]
+    results["decide"] = summarize(latencies)
+
+    print_table(results)
+    print(f"\nbacklog {args.items}, walked {seen} items, leased {len(per_item)} items, collisions: {collisions}")
+    write_results(args.output, "moderation_queue", results, items=args.items, moderators=len(staff),
+                  page_size=args.page_size, collisions=collisions)
+
+    if not args.keep:
+        clear_backlog()
+    if collisions:
+        raise SystemExit("FAIL: an item was leased by more than one moderator")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--proof-share", type=float, default=0.3, help="fraction of the backlog that is mission proofs")
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--pages", type=int, default=40, help="consecutive pages to walk")
+    parser.add_argument("--repeat", type=int, default=50, help="first-page samples")
+    parser.add_argument("--moderators", type=int, default=4)
+    parser.add_argument("--claims", type=int, default=20, help="claim_next calls per moderator")
+    parser.add_argument("--claim-batch", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--keep", action="store_true", help="keep the backlog for the next run")
+    parser.add_argument("--output")
+    main(parser.parse_args())
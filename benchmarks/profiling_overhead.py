@@ -0,0 +1,91 @@
+"""
+Request profiling overhead: what the X-Profile flag (api/profiling.py) costs a
+request, and what it costs requests that do not set it.
+
+Calls one endpoint in-process as a staff user, --requests times each:
+
+    off      ProfilingMiddleware removed from MIDDLEWARE
+    no flag  middleware installed, no X-Profile header (every normal request)
+    sample   X-Profile: sample
+    trace    X-Profile: trace
+
+    python benchmarks/profiling_overhead.py --path /api/reports/ --requests 200
+
+The runs are interleaved so drift in the database cache hits all of them
+alike. Profiles the script creates are deleted afterwards. Exits non-zero if
+a flagged request did not come back with an X-Profile-Id, or if "no flag" is
+more than --max-overhead-ms slower than "off" at the median.
+"""
+import argparse
+import time
+
+from common import print_table, setup_django, summarize, write_results
+
+USERNAME = "bench_profiler"
+MIDDLEWARE = "api.middleware.ProfilingMiddleware"
+
+
+def staff_client(path, without_middleware):
+    from django.contrib.auth.models import User
+    from django.test import Client, modify_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user, _ = User.objects.get_or_create(username=USERNAME, defaults={"is_staff": True})
+    client = Client(HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    if without_middleware:
+        # The handler loads MIDDLEWARE on its first request and keeps it
+        with modify_settings(MIDDLEWARE={"remove": MIDDLEWARE}):
+            client.get(path)
+    return client
+
+
+def main(args):
+    setup_django()
+    from django.contrib.auth.models import User
+    from api.models import RequestProfile
+
+    first_profile = (RequestProfile.objects.order_by("-id").values_list("id", flat=True).first() or 0) + 1
+    clients = {"off": staff_client(args.path, True), "no flag": staff_client(args.path, False)}
+    runs = {
+        "off": (clients["off"], {}),
+        "no flag": (clients["no flag"], {}),
+        "sample": (clients["no flag"], {"HTTP_X_PROFILE": "sample"}),
+        "trace": (clients["no flag"], {"HTTP_X_PROFILE": "trace"}),
+    }
+    latencies = {name: [] for name in runs}
+    missing = 0
+    try:
+        for name, (client, headers) in runs.items():
+            client.get(args.path, **headers)  # warm up
+        for _ in range(args.requests):
+            for name, (client, headers) in runs.items():
+                started = time.perf_counter()
+                response = client.get(args.path, **headers)
+                latencies[name].append(time.perf_counter() - started)
+                if headers and not response.has_header("X-Profile-Id"):
+                    missing += 1
+    finally:
+        RequestProfile.objects.filter(id__gte=first_profile).delete()
+        User.objects.filter(username=USERNAME).delete()
+
+    results = {name: summarize(values) for name, values in latencies.items()}
+    print_table(results)
+    overhead = results["no flag"]["p50_ms"] - results["off"]["p50_ms"]
+    print(f"no flag vs off at p50: {overhead:+.2f} ms; sample x{results['sample']['p50_ms'] / results['off']['p50_ms']:.2f}, "
+          f"trace x{results['trace']['p50_ms'] / results['off']['p50_ms']:.2f}")
+
+    write_results(args.output, "profiling_overhead", results, endpoint=args.path, requests=args.requests)
+    if missing:
+        raise SystemExit(f"FAIL: {missing} profiled request(s) came back without X-Profile-Id")
+    if overhead > args.max_overhead_ms:
+        raise SystemExit(f"FAIL: the middleware adds {overhead:.2f} ms to requests without the flag")
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/api/reports/")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--max-overhead-ms", type=float, default=0.5)
+    parser.add_argument("--output", help="write JSON results here")
+    main(parser.parse_args())
@@ -0,0 +1,138 @@
+"""
+Report filters and facet counts at scale: GET /api/reports/facets/ and the
+filtered feed (api/facets.py) on --reports reports.
+
+Seeds --reports synthetic reports (default 1,000,000) across --users users,
+the four statuses and a dozen categories over the last year. For a few
+filter sets typical of the filter UI it then times:
+
+    compute   facet counts straight from the database (a cache miss)
+    cached    GET /api/reports/facets/ answered from the cache
+    feed      the filtered GET /api/reports/ query (ids only, so the
+              serializer does not dominate)
+
+    DATABASE_URL=sqlite:////tmp/facets.sqlite3 python manage.py migrate
+    DATABASE_URL=sqlite:////tmp/facets.sqlite3 python benchmarks/report_facets.py
+
+Use a scratch database: the seeded rows are inserted with bulk_create (no
+signals, counters or map grid) and left in place, so later runs reuse them.
+Exits non-zero if a facet count differs from a plain COUNT(*).
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from common import setup_django, summarize, write_results
+
+OWNER_PREFIX = "bench_facets_"
+CATEGORIES = ["Infrastructure", "Garbage", "Streetlight", "Water Leak", "Pothole", "Safety",
+              "Noise", "Drainage", "Traffic", "Parks", "Stray Animals", "Encroachment"]
+STATUS_WEIGHTS = {"pending": 20, "verified": 55, "rejected": 10, "resolved": 15}
+
+
+def seed(count, users, rng):
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from api.models import Report
+
+    owners = list(User.objects.filter(username__startswith=OWNER_PREFIX).values_list("id", flat=True))
+    if len(owners) < users:
+        User.objects.bulk_create([User(username=f"{OWNER_PREFIX}{i}") for i in range(len(owners), users)])
+        owners = list(User.objects.filter(username__startswith=OWNER_PREFIX).values_list("id", flat=True))
+    existing = Report.objects.filter(user_id__in=owners).count()
+    if existing >= count:
+        return owners
+
+    now = timezone.now()
+    statuses, weights = zip(*STATUS_WEIGHTS.items())
+    # auto_now_add would overwrite the backdated created_at on insert
+    field = Report._meta.get_field("created_at")
+    field.auto_now_add = False
+    try:
+        for start in range(existing, count, 10000):
+            Report.objects.bulk_create([
+                Report(user_id=rng.choice(owners), title="Synthetic report", description="Seeded for benchmarks",
+                       category=rng.choice(CATEGORIES), location="Synthetic city",
+                       status=rng.choices(statuses, weights)[0],
+                       created_at=now - timedelta(seconds=rng.uniform(0, 365 * 86400)))
+                for _ in range(min(10000, count - start))
+            ])
+            print(f"seeded {min(start + 10000, count):,} reports", end="\r", flush=True)
+    finally:
+        field.auto_now_add = True
+    print()
+    return owners
+
+
+def filter_sets(owner):
+    from django.utils import timezone
+
+    month_ago = (timezone.now() - timedelta(days=30)).date()
+    return {
+        "none": "",
+        "status": "status=pending",
+        "status+category": "status=pending,verified&category=Pothole,Garbage",
+        "last 30 days": f"created_from={month_ago.isoformat()}",
+        "user": f"user={owner}",
+    }
+
+
+def timed(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+def main(args):
+    setup_django()
+    from django.core.cache import cache
+    from django.http import QueryDict
+    from django.test import Client
+    from api import facets
+    from api.models import Report
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    owners = seed(args.reports, args.users, rng)
+    print(f"{Report.objects.count():,} reports ({time.perf_counter() - started:.1f}s to seed)")
+
+    client = Client(HTTP_HOST="localhost")
+    results, wrong = {}, []
+    for name, query in filter_sets(owners[0]).items():
+        filters = facets.parse_filters(QueryDict(query))
+        counts = facets.compute(filters)
+        expected = facets.apply(Report.objects.all(), filters).count()
+        if counts["total"] != expected:
+            wrong.append(f"{name}: total {counts['total']} != COUNT(*) {expected}")
+
+        cache.clear()
+        client.get(f"/api/reports/facets/?{query}")
+        results[name] = {
+            "matching": expected,
+            "compute": timed(lambda: facets.compute(filters), args.repeat),
+            "cached": timed(lambda: client.get(f"/api/reports/facets/?{query}"), args.repeat * 10),
+            "feed": timed(lambda: list(facets.apply(Report.objects.order_by("-created_at"), filters)
+                                       .values_list("id", flat=True)), args.repeat),
+        }
+        row = results[name]
+        print(f"{name:<17} {expected:>10,} rows  compute p50 {row['compute']['p50_ms']:>9} ms  "
+              f"cached p50 {row['cached']['p50_ms']:>6} ms  feed p50 {row['feed']['p50_ms']:>9} ms")
+
+    write_results(args.output, "report_facets", results, reports=Report.objects.count())
+    if wrong:
+        raise SystemExit("FAIL: " + "; ".join(wrong))
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write JSON results here")
+    main(parser.parse_args())
@@ -0,0 +1,198 @@
+"""
+End-to-end load scenarios against a running PULSE server.
+
+Seed data first (python manage.py seed_synthetic --users 1000), start the
+fake services (benchmarks/fakes.py) and the app pointed at them, then:
+
+    python benchmarks/run.py --mix feed=60,leaderboard=15,report=10,proof=5,chat=10 \
+        --concurrency 32 --duration 60 --output before.json
+
+Compare two runs with benchmarks/compare.py before.json after.json.
+"""
+import argparse
+import json
+import random
+import struct
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from common import print_table, summarize, write_results
+
+SYNTHETIC_PREFIX = "bench_"
+SYNTHETIC_PASSWORD = "bench-pass-123"
+
+
+def tiny_png(size=64):
+    """A small valid RGB PNG built without Pillow."""
+    rows = b"".join(b"\x00" + b"".join(bytes([(x * 4) % 256, (y * 4) % 256, 128]) for x in range(size)) for y in range(size))
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content, ctype) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {ctype}\r\n\r\n".encode() + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class Client:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def call(self, method, path, token=None, json_body=None, body=None, content_type=None):
+        headers = {}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            content_type = "application/json"
+        if content_type:
+            headers["Content-Type"] = content_type
+        request = Request(self.base_url + path, data=body, method=method, headers=headers)
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except HTTPError as e:
+            return e.code, e.read()
+        except (URLError, OSError) as e:
+            return 0, str(e).encode()
+
+
+class Scenarios:
+    """Each scenario is a list of timed steps run by one virtual user."""
+
+    def __init__(self, client, tokens, missions):
+        self.client = client
+        self.tokens = tokens
+        self.missions = missions
+        self.image = tiny_png()
+
+    def feed(self, rng, timed):
+        timed("GET /reports/", "GET", "/api/reports/")
+        timed("GET /notices/", "GET", "/api/notices/")
+
+    def leaderboard(self, rng, timed):
+        timed("GET /leaderboard/", "GET", "/api/leaderboard/", token=rng.choice(self.tokens))
+
+    def report(self, rng, timed):
+        body, ctype = multipart(
+            {
+                "title": "Benchmark pothole",
+                "description": "Pothole near the market",
+                "category": "Pothole",
+                "location": "Bench Ward",
+                "latitude": 28.6 + rng.random() / 10,
+                "longitude": 77.2 + rng.random() / 10,
+            },
+            {"image": ("issue.png", self.image, "image/png")},
+        )
+        timed("POST /reports/", "POST", "/api/reports/", token=rng.choice(self.tokens), body=body, content_type=ctype)
+
+    def proof(self, rng, timed):
+        token = rng.choice(self.tokens)
+        mission = rng.choice(self.missions)
+        timed("POST /missions/join/", "POST", f"/api/missions/{mission}/join/", token=token)
+        body, ctype = multipart({}, {"image": ("proof.png", self.image, "image/png")})
+        timed("POST /missions/submit_proof/", "POST", f"/api/missions/{mission}/submit_proof/", token=token, body=body, content_type=ctype)
+
+    def chat(self, rng, timed):
+        timed("POST /ai-chat/", "POST", "/api/ai-chat/", json_body={"message": "How do I earn XP?"})
+
+
+def login(client, users):
+    tokens = []
+    for i in range(users):
+        status, body = client.call(
+            "POST", "/api/token/", json_body={"username": f"{SYNTHETIC_PREFIX}{i}", "password": SYNTHETIC_PASSWORD}
+        )
+        if status == 200:
+            tokens.append(json.loads(body)["access"])
+    if not tokens:
+        raise SystemExit("Could not log in any synthetic user; run `manage.py seed_synthetic` first.")
+    return tokens
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main(args):
+    client = Client(args.base_url, args.timeout)
+    tokens = login(client, args.users)
+    status, body = client.call("GET", "/api/missions/", token=tokens[0])
+    missions = [m["id"] for m in json.loads(body)] if status == 200 else []
+
+    scenarios = Scenarios(client, tokens, missions)
+    mix = parse_mix(args.mix)
+    if "proof" in mix and not missions:
+        del mix["proof"]
+    names, weights = list(mix), list(mix.values())
+
+    lock = threading.Lock()
+    samples = {}
+    errors = {}
+    deadline = time.monotonic() + args.duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+
+        def timed(label, method, path, **kwargs):
+            started = time.perf_counter()
+            status, _ = client.call(method, path, **kwargs)
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples.setdefault(label, []).append(elapsed)
+                if not 200 <= status < 400:
+                    errors[label] = errors.get(label, 0) + 1
+
+        while time.monotonic() < deadline:
+            getattr(scenarios, rng.choices(names, weights)[0])(rng, timed)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        for i in range(args.concurrency):
+            pool.submit(worker, args.seed + i)
+    elapsed = time.monotonic() - started
+
+    results = {label: summarize(values, errors.get(label, 0), elapsed) for label, values in sorted(samples.items())}
+    everything = [v for values in samples.values() for v in values]
+    results["TOTAL"] = summarize(everything, sum(errors.values()), elapsed)
+
+    print_table(results)
+    write_results(args.output, "scenarios", results, mix=args.mix, concurrency=args.concurrency, duration=args.duration)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--mix", default="feed=60,leaderboard=15,report=10,proof=5,chat=10",
+                        help="comma separated scenario=weight (feed, leaderboard, report, proof, chat)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--users", type=int, default=50, help="synthetic users to log in as")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results here (compare with compare.py)")
+    main(parser.parse_args())
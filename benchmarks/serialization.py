@@ -0,0 +1,143 @@
+"""
+List serialization: DRF ModelSerializer + stdlib JSON vs the values() fast
+path (api/rows.py) + orjson / msgpack, in process against the current data.
+
+For each list endpoint (report feed, notices, leaderboard) every variant
+fetches the rows, serializes and renders them --repeat times, and reports
+rows per second and milliseconds per full response. It also checks that the
+fast path returns the same fields and values as the DRF serializer, and shows
+the response size with gzip and brotli.
+
+    python manage.py seed_synthetic          # something to serialize
+    python benchmarks/serialization.py --repeat 20 --output serialization.json
+
+Exits non-zero if the fast path output differs from the DRF serializer's.
+"""
+import argparse
+import gzip
+import json
+import time
+
+from common import setup_django, write_results
+
+
+def endpoints(limit):
+    from api import rows
+    from api.models import Notice, Profile, Report
+    from api.serializers import LeaderboardSerializer, NoticeSerializer, ReportSerializer
+
+    reports = Report.objects.all().order_by("-created_at")
+    if limit:
+        reports = reports[:limit]
+    return {
+        "reports": (reports, ReportSerializer, rows.report_rows, True),
+        "notices": (Notice.objects.select_related("author").order_by("-is_pinned", "-created_at"),
+                    NoticeSerializer, rows.notice_rows, True),
+        "leaderboard": (Profile.objects.select_related("user").filter(user__is_staff=False).order_by("-points")[:10],
+                        LeaderboardSerializer, rows.leaderboard_rows, False),
+    }
+
+
+def timed(fn, repeat):
+    fn()  # warm caches (URL cache, query compilation)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples[len(samples) // 2], body
+
+
+def compare(slow, fast):
+    """Field-by-field differences between DRF output and fast-path output."""
+    problems = []
+    if len(slow) != len(fast):
+        return [f"row count {len(slow)} != {len(fast)}"]
+    for a, b in zip(slow, fast):
+        for key, value in a.items():
+            if b.get(key, object()) != value:
+                problems.append(f"id={a.get('id')} {key}: {value!r} != {b.get(key)!r}")
+    return problems[:5]
+
+
+def main(args):
+    setup_django()
+    import brotli
+    from django.test import RequestFactory
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from api.renderers import MessagePackRenderer, ORJSONRenderer
+
+    request = Request(RequestFactory().get("/api/reports/", HTTP_HOST="localhost"))
+    drf_json, orjson_renderer, msgpack_renderer = JSONRenderer(), ORJSONRenderer(), MessagePackRenderer()
+
+    results, failed = {}, False
+    for name, (queryset, serializer_class, row_serializer, with_request) in endpoints(args.limit).items():
+        context = {"request": request} if with_request else {}
+        fast_request = request if with_request else None
+
+        def drf():
+            return drf_json.render(serializer_class(queryset.all(), many=True, context=context).data)
+
+        def fast_json():
+            return orjson_renderer.render(row_serializer.serialize(queryset.all(), fast_request))
+
+        def fast_msgpack():
+            return msgpack_renderer.render(row_serializer.serialize(queryset.all(), fast_request))
+
+        count = len(serializer_class(queryset.all(), many=True, context=context).data)
+        if not count:
+            print(f"{name}: no rows, skipped")
+            continue
+
+        problems = compare(json.loads(drf()), json.loads(fast_json()))
+        if problems:
+            failed = True
+            print(f"{name}: fast path differs from {serializer_class.__name__}:")
+            for problem in problems:
+                print(f"  {problem}")
+
+        for variant, fn in (("drf+json", drf), ("rows+orjson", fast_json), ("rows+msgpack", fast_msgpack)):
+            seconds, body = timed(fn, args.repeat)
+            results[f"{name} {variant}"] = {
+                "rows": count,
+                "ms": round(seconds * 1000, 2),
+                "rows_per_s": round(count / seconds),
+                "bytes": len(body),
+            }
+
+        body = fast_json()
+        started = time.perf_counter()
+        gz = gzip.compress(body, compresslevel=6)
+        gzip_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        br = brotli.compress(body, quality=args.brotli_quality)
+        br_ms = (time.perf_counter() - started) * 1000
+        results[f"{name} rows+orjson"].update({
+            "gzip_bytes": len(gz), "gzip_ms": round(gzip_ms, 2),
+            "br_bytes": len(br), "br_ms": round(br_ms, 2),
+        })
+
+    width = max(len(k) for k in results) if results else 8
+    columns = ["rows", "ms", "rows_per_s", "bytes", "gzip_bytes", "br_bytes"]
+    print(f"{'':<{width}}  " + "  ".join(f"{c:>11}" for c in columns))
+    for key, row in results.items():
+        print(f"{key:<{width}}  " + "  ".join(f"{row.get(c, ''):>11}" for c in columns))
+    for name in ("reports", "notices", "leaderboard"):
+        slow, fast = results.get(f"{name} drf+json"), results.get(f"{name} rows+orjson")
+        if slow and fast:
+            print(f"{name}: {fast['rows_per_s'] / slow['rows_per_s']:.1f}x rows/s with the fast path")
+
+    write_results(args.output, "serialization", results, repeat=args.repeat, limit=args.limit)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per variant (median is reported)")
+    parser.add_argument("--limit", type=int, default=0, help="cap the report feed at this many rows (0 = all)")
+    parser.add_argument("--brotli-quality", type=int, default=4)
+    parser.add_argument("--output", help="write JSON results here ('-' for stdout)")
+    main(parser.parse_args())
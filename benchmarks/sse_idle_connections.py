@@ -0,0 +1,111 @@
+"""
+Idle SSE connection load test.
+
+Opens N concurrent connections to /api/events/ on a running ASGI server and
+holds them open, counting keepalives and delivered events. Point --pid at the
+server worker to sample its resident memory while the connections are held.
+
+    gunicorn config.asgi:application -k uvicorn_worker.UvicornWorker -w 1 &
+    python benchmarks/sse_idle_connections.py --connections 5000 --hold 60 --pid <worker pid>
+
+Raise the open-file limit first (ulimit -n 65536) on both sides.
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+async def hold_connection(host, port, path, hold, stats):
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats["failed"] += 1
+        return
+
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+
+    try:
+        status_line = await reader.readline()
+        if b" 200 " not in status_line:
+            stats["failed"] += 1
+            return
+        stats["connected"] += 1
+        stats["connect_times"].append(time.perf_counter() - started)
+
+        deadline = time.monotonic() + hold
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                line = await asyncio.wait_for(reader.readline(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if not line:
+                stats["dropped"] += 1
+                return
+            if line.startswith(b": keepalive"):
+                stats["keepalives"] += 1
+            elif line.startswith(b"event:"):
+                stats["events"] += 1
+        stats["held"] += 1
+    finally:
+        writer.close()
+
+
+async def main(args):
+    parts = urlsplit(args.url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    stats = {
+        "connected": 0, "failed": 0, "dropped": 0, "held": 0,
+        "keepalives": 0, "events": 0, "connect_times": [],
+    }
+
+    tasks = []
+    for i in range(args.connections):
+        tasks.append(asyncio.create_task(
+            hold_connection(parts.hostname, parts.port or 80, path, args.hold, stats)
+        ))
+        if args.ramp and i % args.ramp == 0:
+            await asyncio.sleep(0.05)
+
+    # Sample once every connect attempt has resolved (or half the hold passed)
+    settle_deadline = time.monotonic() + args.hold / 2
+    while stats["connected"] + stats["failed"] < args.connections and time.monotonic() < settle_deadline:
+        await asyncio.sleep(0.5)
+    if args.pid:
+        print(f"server RSS with {stats['connected']} open streams: {rss_mb(args.pid):.1f} MB")
+
+    await asyncio.gather(*tasks)
+
+    times = sorted(stats.pop("connect_times"))
+    if times:
+        stats["connect_p50_ms"] = round(times[len(times) // 2] * 1000, 2)
+        stats["connect_p99_ms"] = round(times[int(len(times) * 0.99) - 1] * 1000, 2)
+    for key, value in stats.items():
+        print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api/events/")
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--hold", type=float, default=60, help="seconds to keep each stream open")
+    parser.add_argument("--ramp", type=int, default=200, help="pause briefly every N connects")
+    parser.add_argument("--pid", type=int, help="server worker pid to sample RSS from")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,104 @@
+"""
+Cold-start import cost, with a regression budget.
+
+Runs `django.setup()` plus the URLconf import (which pulls in every view) in a
+fresh interpreter under `python -X importtime`, then reports total import
+time, the slowest top-level packages, and whether any of the heavy SDKs got
+imported at boot. They must stay behind the lazy adapters in api/gemini.py,
+api/sms.py and api/imaging.py.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget-ms 600 --runs 5 --output startup.json
+
+Exits non-zero if a heavy SDK is imported or the median exceeds --budget-ms.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from common import ROOT, print_table, summarize, write_results
+
+# Modules that must not be imported while booting a worker
+HEAVY_MODULES = ("google.genai", "twilio", "PIL")
+
+BOOT = (
+    "import django; django.setup(); "
+    "import config.urls"
+)
+
+
+def parse_importtime(stderr):
+    """-X importtime lines: 'import time: self [us] | cumulative | imported package'."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        modules[name] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us)}
+    return modules
+
+
+def boot_once():
+    env = dict(os.environ, PYTHONPATH=str(ROOT), WARMUP_ON_BOOT="False")
+    env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        sys.exit(proc.stderr.splitlines()[-1] if proc.stderr else "boot failed")
+    return elapsed, parse_importtime(proc.stderr)
+
+
+def main(args):
+    wall, import_totals, modules = [], [], {}
+    for _ in range(args.runs):
+        elapsed, modules = boot_once()
+        wall.append(elapsed)
+        import_totals.append(sum(m["self_us"] for m in modules.values()) / 1000)
+
+    heavy = sorted(
+        name for name in modules
+        if any(name == h or name.startswith(h + ".") for h in HEAVY_MODULES)
+    )
+    top = sorted(
+        ((name, m["cumulative_us"] / 1000) for name, m in modules.items() if "." not in name),
+        key=lambda item: -item[1],
+    )[:args.top]
+
+    median_ms = round(statistics.median(import_totals), 1)
+    results = {"boot (wall)": summarize(wall)}
+    print_table(results)
+    print(f"\nimport time (median of {args.runs}): {median_ms} ms, budget {args.budget_ms} ms")
+    print("slowest top-level imports:")
+    for name, ms in top:
+        print(f"  {ms:>8.1f} ms  {name}")
+
+    results["imports"] = {"median_ms": median_ms, "runs_ms": [round(t, 1) for t in import_totals]}
+    write_results(args.output, "startup", results, budget_ms=args.budget_ms,
+                  heavy_imported=heavy, top=dict(top))
+
+    failed = False
+    if heavy:
+        print(f"\nFAIL: heavy SDKs imported at boot: {', '.join(heavy[:10])}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\nFAIL: import time {median_ms} ms is over the {args.budget_ms} ms budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=800, help="max median import time")
+    parser.add_argument("--top", type=int, default=10, help="how many top-level packages to list")
+    parser.add_argument("--output")
+    main(parser.parse_args())
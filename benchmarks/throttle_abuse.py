@@ -0,0 +1,159 @@
+"""
+Abusive traffic against the throttled endpoints, checking that Gemini spend
+stays capped.
+
+Floods anonymous AI chat from --ips client addresses (sent as
+X-Forwarded-For, which the app trusts with NUM_PROXIES=1), plus signed-in
+chat, report uploads and proof submissions from --users accounts, as fast as
+--concurrency threads allow. Then it compares the Gemini calls the fake server
+received with what the token buckets should allow:
+sum over clients of (burst + refill rate x duration).
+
+Start the fakes and the app as in benchmarks/README.md, with the throttle
+rates you want to test (the defaults are fine), then:
+
+    python benchmarks/throttle_abuse.py --duration 30 --ips 20 --users 10
+
+The rates are read from the local settings, so run this with the same
+environment as the server. Exits non-zero if Gemini calls exceed the cap or a
+429 comes back without Retry-After.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from common import setup_django, write_results
+from run import Client, login, multipart, tiny_png
+
+# scenario -> throttle scope; every allowed request makes one Gemini call
+SCOPES = {"chat_anon": "chat_anon", "chat_user": "chat_user", "report": "report_create", "proof": "proof_submit"}
+
+
+def send(base_url, method, path, headers, body=None, timeout=30):
+    request = Request(base_url + path, data=body, method=method, headers=headers)
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status, response.headers
+    except HTTPError as e:
+        e.read()
+        return e.code, e.headers
+    except (URLError, OSError):
+        return 0, {}
+
+
+def gemini_calls(fakes_url):
+    with urlopen(fakes_url.rstrip("/") + "/_stats", timeout=5) as response:
+        return json.loads(response.read()).get("gemini", {}).get("requests", 0)
+
+
+def main(args):
+    setup_django()
+    from rest_framework.settings import api_settings
+    from api.throttling import parse_rate
+
+    rates = {scope: parse_rate(api_settings.DEFAULT_THROTTLE_RATES[scope]) for scope in set(SCOPES.values())}
+    base_url = args.base_url.rstrip("/")
+    client = Client(base_url, args.timeout)
+    tokens = login(client, args.users)
+    status, body = client.call("GET", "/api/missions/", token=tokens[0])
+    missions = [m["id"] for m in json.loads(body)] if status == 200 else []
+    for i, token in enumerate(tokens):
+        # Joining is not throttled and costs no Gemini call
+        if missions:
+            client.call("POST", f"/api/missions/{missions[i % len(missions)]}/join/", token=token)
+
+    image = tiny_png()
+    ips = [f"203.0.113.{i + 1}" for i in range(args.ips)]
+    scenarios = ["chat_anon", "chat_user", "report"] + (["proof"] if missions else [])
+    tally = {name: Counter() for name in scenarios}
+    lock = threading.Lock()
+
+    def attack(name, rng):
+        headers = {}
+        if name == "chat_anon":
+            headers["X-Forwarded-For"] = rng.choice(ips)
+            return send(base_url, "POST", "/api/ai-chat/", dict(headers, **{"Content-Type": "application/json"}),
+                        json.dumps({"message": "How do I earn XP?"}).encode(), args.timeout)
+        i = rng.randrange(len(tokens))
+        headers["Authorization"] = f"Bearer {tokens[i]}"
+        if name == "chat_user":
+            return send(base_url, "POST", "/api/ai-chat/", dict(headers, **{"Content-Type": "application/json"}),
+                        json.dumps({"message": "How do I earn XP?"}).encode(), args.timeout)
+        if name == "report":
+            body, ctype = multipart({"title": "Abuse", "description": "Pothole", "category": "Pothole",
+                                     "location": "Bench Ward"}, {"image": ("a.png", image, "image/png")})
+            return send(base_url, "POST", "/api/reports/", dict(headers, **{"Content-Type": ctype}), body, args.timeout)
+        body, ctype = multipart({}, {"image": ("p.png", image, "image/png")})
+        mission = missions[i % len(missions)]
+        return send(base_url, "POST", f"/api/missions/{mission}/submit_proof/",
+                    dict(headers, **{"Content-Type": ctype}), body, args.timeout)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            name = rng.choice(scenarios)
+            status, headers = attack(name, rng)
+            with lock:
+                counts = tally[name]
+                counts["sent"] += 1
+                if 200 <= status < 300:
+                    counts["allowed"] += 1
+                elif status == 429:
+                    counts["throttled"] += 1
+                    if not headers.get("Retry-After"):
+                        counts["no_retry_after"] += 1
+                else:
+                    counts[f"status_{status}"] += 1
+
+    before = gemini_calls(args.fakes_url)
+    started = time.monotonic()
+    deadline = started + args.duration
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        for i in range(args.concurrency):
+            pool.submit(worker, args.seed + i)
+    elapsed = time.monotonic() - started
+    spent = gemini_calls(args.fakes_url) - before
+
+    clients = {"chat_anon": args.ips, "chat_user": len(tokens), "report": len(tokens), "proof": len(tokens)}
+    cap = 0
+    results = {}
+    for name in scenarios:
+        num, period = rates[SCOPES[name]]
+        scope_cap = clients[name] * (num + num * elapsed / period)
+        cap += scope_cap
+        results[name] = dict(tally[name], cap=round(scope_cap, 1))
+
+    print(f"{'':<10}  " + "  ".join(f"{c:>10}" for c in ("sent", "allowed", "throttled", "cap")))
+    for name, row in results.items():
+        print(f"{name:<10}  " + "  ".join(f"{row.get(c, 0):>10}" for c in ("sent", "allowed", "throttled", "cap")))
+    sent = sum(row["sent"] for row in results.values())
+    print(f"\n{sent} requests in {elapsed:.1f}s; Gemini calls: {spent} (cap {cap:.0f}, "
+          f"{sent} without throttling)")
+
+    write_results(args.output, "throttle_abuse", {"scenarios": results, "gemini_calls": spent, "cap": round(cap, 1)},
+                  duration=args.duration, concurrency=args.concurrency, ips=args.ips, users=len(tokens))
+    missing = sum(row.get("no_retry_after", 0) for row in results.values())
+    if spent > cap or missing:
+        raise SystemExit(f"FAIL: {spent} Gemini calls (cap {cap:.0f}), {missing} 429s without Retry-After")
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--fakes-url", default="http://127.0.0.1:9900")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--ips", type=int, default=20, help="distinct anonymous client addresses")
+    parser.add_argument("--users", type=int, default=10, help="synthetic users to attack with")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results here")
+    main(parser.parse_args())
@@ -0,0 +1,120 @@
+"""
+Bulk user import: rows per second of manage.py import_users / POST
+/api/users/import/ (api/onboarding.py) against registering users one by one
+through RegisterSerializer, as /api/user/register/ does.
+
+Builds a CSV of --rows citizens (username, email, phone, password) and
+imports it in-process with each --workers count, then registers
+--baseline-rows of them one at a time. Both are run with passwords and
+without (no password column), which isolates the per-row insert and
+post_save cost from the hashing cost.
+
+    python benchmarks/user_import.py --rows 2000 --workers 1,4,8
+
+Password hashing is CPU bound, so the pool only helps with as many workers
+as there are cores. Seeded users are deleted after each run. Exits non-zero
+if an import does not create every row with its profile and phone number.
+"""
+import argparse
+import io
+import os
+import time
+
+from common import setup_django, write_results
+
+PREFIX = "bench_import_"
+
+
+def build_csv(rows, passwords):
+    lines = ["username,email,phone_number" + (",password" if passwords else "")]
+    for i in range(rows):
+        line = f"{PREFIX}{i},{PREFIX}{i}@example.com,0 98{i:08d}"
+        lines.append(line + (f",secret-{i}" if passwords else ""))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def cleanup():
+    from django.contrib.auth.models import User
+
+    User.objects.filter(username__startswith=PREFIX).delete()
+
+
+def run_import(body, workers):
+    from collections import Counter
+    from api import onboarding
+
+    started = time.perf_counter()
+    totals = Counter()
+    with onboarding.hashing_pool(workers) as pool:
+        for batch in onboarding.batches(onboarding.open_csv(io.BytesIO(body)), pool):
+            totals.update(result["status"] for result in batch)
+    return onboarding.summary(totals, time.perf_counter() - started)
+
+
+def run_register(rows, passwords):
+    from api.serializers import RegisterSerializer
+
+    started = time.perf_counter()
+    for i in range(rows):
+        data = {"username": f"{PREFIX}{i}", "email": f"{PREFIX}{i}@example.com", "phone_number": f"98{i:08d}",
+                "password": f"secret-{i}"}
+        serializer = RegisterSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        if passwords:
+            serializer.save()
+        else:
+            # The endpoint requires a password; create_user(password=None) is the same path minus hashing
+            serializer.create({**serializer.validated_data, "password": None})
+    seconds = time.perf_counter() - started
+    return {"rows": rows, "seconds": round(seconds, 2), "rows_per_second": round(rows / seconds, 1)}
+
+
+def check(rows, passwords):
+    from django.contrib.auth.models import User
+
+    users = User.objects.filter(username__startswith=PREFIX).select_related("profile")
+    good = sum(1 for u in users if u.profile.phone_number and u.profile.phone_number.startswith("+9198"))
+    sample = users.filter(username=f"{PREFIX}0").first()
+    login = sample.check_password("secret-0") if passwords else not sample.has_usable_password()
+    return good == rows and login
+
+
+def main(args):
+    setup_django()
+    from django.contrib.auth.models import User
+
+    if User.objects.filter(username__startswith=PREFIX).exists():
+        cleanup()
+    worker_counts = [int(w) for w in args.workers.split(",")]
+    results, failed = {}, False
+    print(f"{os.cpu_count()} CPU(s)")
+    for passwords in (True, False):
+        label = "with passwords" if passwords else "no passwords"
+        body = build_csv(args.rows, passwords)
+        for workers in worker_counts:
+            done = run_import(body, workers)
+            ok = done["created"] == args.rows and check(args.rows, passwords)
+            failed |= not ok
+            cleanup()
+            results[f"import_w{workers}_{'pw' if passwords else 'nopw'}"] = done
+            print(f"{label:<15} import, {workers} worker(s): {done['rows_per_second']:>8} rows/s "
+                  f"({done['rows']} rows in {done['seconds']}s){'' if ok else '  FAILED'}")
+        register = run_register(args.baseline_rows, passwords)
+        cleanup()
+        results[f"register_{'pw' if passwords else 'nopw'}"] = register
+        print(f"{label:<15} one by one:           {register['rows_per_second']:>8} rows/s "
+              f"({register['rows']} rows in {register['seconds']}s)")
+
+    write_results(args.output, "user_import", results, rows=args.rows, cpus=os.cpu_count())
+    if failed:
+        raise SystemExit("FAIL: an import did not create every user with a normalized phone number")
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--baseline-rows", type=int, default=100, help="users registered one by one for comparison")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="comma-separated pool sizes")
+    parser.add_argument("--output", help="write JSON results here")
+    main(parser.parse_args())
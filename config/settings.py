@@ -4,9 +4,11 @@ Django settings for config project.
 Updated for Deployment (Render + Neon + Vercel).
 """
 from decouple import config, Csv
+from corsheaders.defaults import default_headers
 import dj_database_url
 from pathlib import Path
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,15 +50,20 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', 
+    'api.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReplicaPinMiddleware',
+    # Last, so the others' process_view runs before a profiled view
+    'api.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -82,12 +89,51 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': dj_database_url.config(
-        default=config('DATABASE_URL')
+# DB_CONNECTION_MODE controls how connections are reused across requests:
+#   "none"       - open and close a connection per request (Django default)
+#   "persistent" - keep one connection per worker thread for DB_CONN_MAX_AGE
+#                  seconds, health-checked before reuse (sync gunicorn workers)
+#   "pool"       - psycopg 3 connection pool per process; safe under both sync
+#                  workers and the ASGI app (Postgres only)
+DB_CONNECTION_MODE = config('DB_CONNECTION_MODE', default='none')
+
+def _database(url):
+    db = dj_database_url.parse(
+        url,
+        conn_max_age=config('DB_CONN_MAX_AGE', default=600, cast=int) if DB_CONNECTION_MODE == 'persistent' else 0,
+        conn_health_checks=DB_CONNECTION_MODE == 'persistent',
     )
+    if DB_CONNECTION_MODE == 'pool' and db['ENGINE'] == 'django.db.backends.postgresql':
+        # Pooled connections must not also be persistent. Health checks make the
+        # pool validate each connection as it is handed out (drops dead sessions).
+        db['CONN_MAX_AGE'] = 0
+        db['CONN_HEALTH_CHECKS'] = True
+        db.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        }
+    return db
+
+
+DATABASES = {
+    'default': _database(config('DATABASE_URL')),
 }
 
+# READ REPLICAS
+# Comma-separated replica URLs become replica_0, replica_1, ... The report
+# feed, notices, leaderboard and missions catalog read from them on GET
+# (api.db_router); a user who just wrote stays on the primary for
+# REPLICA_PIN_SECONDS. Tests mirror the replicas onto the default database.
+DATABASE_REPLICA_URLS = config('DATABASE_REPLICA_URLS', default='', cast=Csv())
+for _i, _url in enumerate(DATABASE_REPLICA_URLS):
+    DATABASES[f'replica_{_i}'] = _database(_url)
+    DATABASES[f'replica_{_i}']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -146,8 +192,47 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Token buckets per scope (api/throttling.py): "N/period" = bursts of N,
+    # refilled at N per period
+    'DEFAULT_THROTTLE_RATES': {
+        'chat_anon': config('THROTTLE_RATE_CHAT_ANON', default='10/hour'),
+        'chat_user': config('THROTTLE_RATE_CHAT_USER', default='60/hour'),
+        'report_create': config('THROTTLE_RATE_REPORT_CREATE', default='20/hour'),
+        'proof_submit': config('THROTTLE_RATE_PROOF_SUBMIT', default='20/hour'),
+    },
+    # Proxies in front of the app. 0 uses the socket address and ignores
+    # X-Forwarded-For, which the client controls when nothing sits in front.
+    # Set it per deployment (Render: 1). None would trust the whole header.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # orjson first (clients sending Accept: */* get JSON); msgpack on request
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+# CACHE
+# Throttle buckets and replica pins must be shared by every worker, so
+# production sets REDIS_URL. Without it each process has its own memory cache.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+
+# How often a throttled client's tally is written to ThrottleHit (admin)
+THROTTLE_LOG_SECONDS = config('THROTTLE_LOG_SECONDS', default=60, cast=int)
+
+# RESPONSE COMPRESSION (api.middleware.CompressionMiddleware)
+# Bodies smaller than this go out as-is; brotli quality 0-11 (4 is fast and
+# still beats gzip on JSON).
+COMPRESSION_MIN_BYTES = config('COMPRESSION_MIN_BYTES', default=500, cast=int)
+BROTLI_QUALITY = config('BROTLI_QUALITY', default=4, cast=int)
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -160,6 +245,186 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000", # Allows local React app
     "https://pulse-v2-frontend-l7k9.vercel.app", 
 ]
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'x-profile')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed', 'Retry-After', 'X-Export-Until', 'Content-Disposition', 'X-Profile-Id']
+
+# REALTIME PUSH (SSE at /api/events/)
+# "local" keeps pub/sub inside one process; "postgres" fans events out to
+# every worker through LISTEN/NOTIFY.
+REALTIME_BACKEND = config('REALTIME_BACKEND', default='local')
+REALTIME_QUEUE_SIZE = config('REALTIME_QUEUE_SIZE', default=100, cast=int)
+REALTIME_HISTORY_SIZE = config('REALTIME_HISTORY_SIZE', default=1000, cast=int)
+REALTIME_KEEPALIVE_SECONDS = config('REALTIME_KEEPALIVE_SECONDS', default=15, cast=int)
+
+# OBSERVABILITY
+# Prometheus scrapes /api/metrics/ with "Authorization: Bearer <METRICS_TOKEN>".
+# Without a token the endpoint is only served when DEBUG is on.
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Structured JSON logs, written by a background thread so logging never
+# blocks a request. Records are dropped (and counted) if the queue fills up.
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'queue': {
+            '()': 'api.log.NonBlockingQueueHandler',
+            'maxsize': config('LOG_QUEUE_SIZE', default=10000, cast=int),
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# LEADERBOARD RANK (GET /api/user/dashboard/, api/counters.py)
+# Ranks come from a cached points distribution, rebuilt at most this often
+RANK_CACHE_SECONDS = config('RANK_CACHE_SECONDS', default=60, cast=int)
+
+# MODERATION QUEUE
+# How long a moderator's claim on a queue item lasts before others can take it
+MODERATION_LEASE_SECONDS = config('MODERATION_LEASE_SECONDS', default=300, cast=int)
+
+# REPORT ARCHIVE
+# manage.py archive_reports moves resolved/rejected reports older than this
+REPORT_ARCHIVE_AFTER_DAYS = config('REPORT_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+
+# DELTA SYNC (/api/sync/)
+# Cursors stay this far behind "now" so rows committed late are not skipped.
+# Tombstones are kept SYNC_TOMBSTONE_DAYS (manage.py purge_tombstones); older
+# sync tokens get 410 and the client does a full sync.
+SYNC_LAG_SECONDS = config('SYNC_LAG_SECONDS', default=5, cast=int)
+SYNC_TOMBSTONE_DAYS = config('SYNC_TOMBSTONE_DAYS', default=30, cast=int)
+
+# IDEMPOTENCY KEYS (Idempotency-Key header on report / proof POSTs)
+# Stored responses are replayed for this long; manage.py purge_idempotency_keys
+# deletes expired ones. A duplicate waits up to WAIT seconds for the original;
+# an in-progress key older than LOCK seconds is assumed dead and taken over.
+IDEMPOTENCY_TTL_HOURS = config('IDEMPOTENCY_TTL_HOURS', default=24, cast=int)
+IDEMPOTENCY_WAIT_SECONDS = config('IDEMPOTENCY_WAIT_SECONDS', default=15, cast=float)
+IDEMPOTENCY_LOCK_SECONDS = config('IDEMPOTENCY_LOCK_SECONDS', default=120, cast=int)
+
+# AI FALLBACK SWEEPER (python manage.py reverify_fallbacks, run from cron)
+# Re-checks items left pending because Gemini was busy. The window is local
+# time (TIME_ZONE); outside it the command exits without calling Gemini.
+AI_SWEEP_WINDOW = config('AI_SWEEP_WINDOW', default='01:00-06:00')
+AI_SWEEP_RATE_PER_MINUTE = config('AI_SWEEP_RATE_PER_MINUTE', default=10, cast=float)
+AI_SWEEP_CONCURRENCY = config('AI_SWEEP_CONCURRENCY', default=2, cast=int)
+
+# PARTNER BULK INGEST (POST /api/reports/bulk/, api/ingest.py)
+# Rows are validated and inserted this many at a time. Images are fetched
+# later by manage.py verify_ingested_reports, over http(s) and only from
+# INGEST_IMAGE_HOSTS at public addresses. While it is empty no image is
+# fetched, and those reports are left for moderators.
+BULK_INGEST_BATCH_SIZE = config('BULK_INGEST_BATCH_SIZE', default=500, cast=int)
+BULK_INGEST_MAX_BYTES = config('BULK_INGEST_MAX_BYTES', default=20 * 1024 * 1024, cast=int)
+INGEST_IMAGE_HOSTS = config('INGEST_IMAGE_HOSTS', default='', cast=Csv())
+INGEST_IMAGE_TIMEOUT = config('INGEST_IMAGE_TIMEOUT', default=10, cast=float)
+AI_INGEST_RATE_PER_MINUTE = config('AI_INGEST_RATE_PER_MINUTE', default=60, cast=float)
+AI_INGEST_CONCURRENCY = config('AI_INGEST_CONCURRENCY', default=4, cast=int)
+
+# MAP CLUSTERS (GET /api/map/clusters/, api/mapgrid.py)
+# Report counts are kept per grid cell for every zoom in MIN..MAX; a cell is a
+# map tile split CELL_BITS times each way (2 -> 64px cells). Changing these
+# needs manage.py rebuild_map_grid. A response covers at most MAX_CELLS cells,
+# stepping out to coarser zooms for big boxes.
+MAP_GRID_MIN_ZOOM = config('MAP_GRID_MIN_ZOOM', default=0, cast=int)
+MAP_GRID_MAX_ZOOM = config('MAP_GRID_MAX_ZOOM', default=16, cast=int)
+MAP_GRID_CELL_BITS = config('MAP_GRID_CELL_BITS', default=2, cast=int)
+MAP_CLUSTER_MAX_CELLS = config('MAP_CLUSTER_MAX_CELLS', default=640, cast=int)
+
+# BULK USER IMPORT (POST /api/users/import/, manage.py import_users, api/onboarding.py)
+# CSV rows are validated and inserted this many at a time. Passwords are
+# hashed across USER_IMPORT_WORKERS processes (0 = one per CPU).
+USER_IMPORT_BATCH_SIZE = config('USER_IMPORT_BATCH_SIZE', default=200, cast=int)
+USER_IMPORT_WORKERS = config('USER_IMPORT_WORKERS', default=0, cast=int)
+
+# HOTSPOT DETECTION (manage.py detect_hotspots, api/hotspots.py)
+# Reports are binned into map grid cells at HOTSPOT_GRID_ZOOM (14 -> cells of
+# roughly 500m). For each window (days) a cell is "rising" when it has at
+# least MIN_REPORTS reports and its count is MIN_SCORE standard deviations
+# above its mean over the previous BASELINE_PERIODS windows. TOP_CELLS densest
+# cells per window are kept as well. Every cell and category is tested, so a
+# lower MIN_SCORE flags noise (on 1M synthetic reports, noise stayed under 5).
+HOTSPOT_GRID_ZOOM = config('HOTSPOT_GRID_ZOOM', default=14, cast=int)
+HOTSPOT_WINDOWS_DAYS = config('HOTSPOT_WINDOWS_DAYS', default='1,7,30', cast=Csv(int))
+HOTSPOT_BASELINE_PERIODS = config('HOTSPOT_BASELINE_PERIODS', default=6, cast=int)
+HOTSPOT_MIN_REPORTS = config('HOTSPOT_MIN_REPORTS', default=5, cast=int)
+HOTSPOT_MIN_SCORE = config('HOTSPOT_MIN_SCORE', default=5.0, cast=float)
+HOTSPOT_TOP_CELLS = config('HOTSPOT_TOP_CELLS', default=50, cast=int)
+
+# AI SCHEDULER (api.ai_scheduler)
+# Gemini calls in flight per worker process. When they are all busy, waiting
+# calls get turns in proportion to their class weight (and round robin across
+# users within a class); a call still waiting after its class deadline
+# (seconds) falls back to manual review / "overloaded".
+AI_MAX_CONCURRENCY = config('AI_MAX_CONCURRENCY', default=4, cast=int)
+AI_SCHEDULER_CLASSES = {
+    'report': {'weight': 4, 'deadline': config('AI_DEADLINE_REPORT', default=20, cast=float)},
+    'proof': {'weight': 4, 'deadline': config('AI_DEADLINE_PROOF', default=20, cast=float)},
+    'chat': {'weight': 2, 'deadline': config('AI_DEADLINE_CHAT', default=10, cast=float)},
+    # reverify_fallbacks and anything else not tagged with a class
+    'background': {'weight': 1, 'deadline': config('AI_DEADLINE_BACKGROUND', default=60, cast=float)},
+}
+# Gemini calls allowed across all workers and cron jobs (shared cache bucket;
+# set it to the API quota). Background work waits for what live requests
+# leave; empty = no shared limit.
+AI_QUOTA_RATE = config('AI_QUOTA_RATE', default='60/min')
+
+# COLD START
+# Gemini/Twilio/Pillow are imported lazily. With WARMUP_ON_BOOT the WSGI/ASGI
+# entry points import them on a background thread right after boot, and
+# /api/ready/ answers 503 until that has finished.
+WARMUP_ON_BOOT = config('WARMUP_ON_BOOT', default=True, cast=bool)
+
+# REQUEST PROFILING (X-Profile header / ?_profile=, staff only; api/profiling.py)
+# Sampling reads the view's stack every PROFILE_SAMPLE_INTERVAL_MS. Only the
+# latest PROFILE_KEEP profiles are kept (admin: Request profiles).
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILE_SAMPLE_INTERVAL_MS = config('PROFILE_SAMPLE_INTERVAL_MS', default=1.0, cast=float)
+PROFILE_KEEP = config('PROFILE_KEEP', default=200, cast=int)
+
+# REPORT FACETS (GET /api/reports/facets/, api/facets.py)
+# Counts per filter set are cached this long, then served stale for up to
+# FACET_STALE_SECONDS more while one request recomputes them.
+FACET_CACHE_SECONDS = config('FACET_CACHE_SECONDS', default=30, cast=int)
+FACET_STALE_SECONDS = config('FACET_STALE_SECONDS', default=300, cast=int)
+
+# QUERY BUDGETS & N+1 DETECTION
+# The inspector middleware records every request's queries, flags repeated
+# query shapes, and checks the per-endpoint budgets below ("METHOD view-name"
+# or just "view-name"). The test suite runs it in strict mode, so a request
+# over budget fails the test instead of only logging a warning.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+QUERY_INSPECTOR = config('QUERY_INSPECTOR', default=TESTING, cast=bool)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=TESTING, cast=bool)
+NPLUSONE_THRESHOLD = config('NPLUSONE_THRESHOLD', default=3, cast=int)
+QUERY_BUDGETS = {
+    'GET report-list-create': 2,
+    'GET report-facets': 3,
+    # A report that is not live is looked up in the archive (a third query)
+    'GET report-detail': 3,
+    'GET notice-list': 2,
+    'GET leaderboard': 2,
+    'GET missions': 3,
+    'GET user-profile': 2,
+    # Plus the rank table when its cache entry has expired
+    'GET user-dashboard': 3,
+    'GET sync': 5,
+}
+
+if QUERY_INSPECTOR:
+    MIDDLEWARE.insert(1, 'api.middleware.QueryInspectorMiddleware')
 
 # MEDIA FILES (User Uploads)
 MEDIA_URL = '/media/'
@@ -173,9 +438,12 @@ CLOUDINARY_STORAGE = {
     'API_SECRET': config('CLOUDINARY_API_SECRET'),
 }
 
+# Overrides the Cloudinary upload API host (benchmarks use a local fake)
+CLOUDINARY_UPLOAD_PREFIX = config('CLOUDINARY_UPLOAD_PREFIX', default='')
+
 STORAGES = {
     "default": {
-        "BACKEND": "cloudinary_storage.storage.MediaCloudinaryStorage",
+        "BACKEND": "api.storage.InstrumentedMediaCloudinaryStorage",
     },
     "staticfiles": {
         # Collects files but does NOT compress them.
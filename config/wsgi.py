@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Import the heavy SDKs (Gemini, Twilio, Pillow) off the request path
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_BOOT:
+    from api.warmup import start_background_warmup
+
+    start_background_warmup()